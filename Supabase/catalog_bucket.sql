@@ -0,0 +1,32 @@
+-- =============================================
+-- Supabase Storage: 'catalog' bucket for the precompiled browse bundles
+-- Written by automation_scripts/publish_catalog.py:
+--   catalog/manifest.json                  short cache, overwritten every publish
+--   catalog/<DEPT>.<version>.json.gz|.br   immutable, cached for a year
+-- Run this in the Supabase SQL Editor
+-- =============================================
+
+-- 1. Create the 'catalog' bucket
+INSERT INTO storage.buckets (id, name, public, file_size_limit, allowed_mime_types)
+VALUES (
+  'catalog',
+  'catalog',
+  true,
+  5242880, -- 5MB
+  ARRAY['application/json', 'application/gzip', 'application/x-brotli']
+)
+ON CONFLICT (id) DO NOTHING;
+
+-- 2. RLS Policies for 'catalog'
+DROP POLICY IF EXISTS "Public Read Catalog" ON storage.objects;
+CREATE POLICY "Public Read Catalog" ON storage.objects FOR SELECT TO public USING (bucket_id = 'catalog');
+
+DROP POLICY IF EXISTS "Admin Upload Catalog" ON storage.objects;
+CREATE POLICY "Admin Upload Catalog" ON storage.objects FOR INSERT TO anon, authenticated WITH CHECK (bucket_id = 'catalog');
+
+-- The manifest is upserted in place
+DROP POLICY IF EXISTS "Admin Update Catalog" ON storage.objects;
+CREATE POLICY "Admin Update Catalog" ON storage.objects FOR UPDATE TO anon, authenticated USING (bucket_id = 'catalog');
+
+DROP POLICY IF EXISTS "Admin Delete Catalog" ON storage.objects;
+CREATE POLICY "Admin Delete Catalog" ON storage.objects FOR DELETE TO anon, authenticated USING (bucket_id = 'catalog');
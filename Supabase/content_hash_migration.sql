@@ -0,0 +1,18 @@
+-- =============================================
+-- Content hash + size for uploaded PDFs
+-- Filled in by the Python uploaders while streaming each file
+-- Run this in the Supabase SQL Editor
+-- =============================================
+
+ALTER TABLE public.pyq ADD COLUMN IF NOT EXISTS content_hash TEXT;      -- hex SHA-256 of the PDF bytes
+ALTER TABLE public.pyq ADD COLUMN IF NOT EXISTS file_size BIGINT;       -- bytes
+
+ALTER TABLE public.syllabus ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE public.syllabus ADD COLUMN IF NOT EXISTS file_size BIGINT;
+
+-- Lookups by hash (duplicate detection, skip-if-unchanged)
+CREATE INDEX IF NOT EXISTS idx_pyq_content_hash ON public.pyq (content_hash);
+CREATE INDEX IF NOT EXISTS idx_syllabus_content_hash ON public.syllabus (content_hash);
+
+-- Notify PostgREST to reload the schema cache
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,63 @@
+-- =============================================
+-- updated_at on the content tables
+-- uploaded_at is only set on insert, so rows changed in place (subject renames,
+-- preview / content-hash PATCHes) never moved the incremental sync watermark of
+-- automation_scripts/supabase_mirror.py. updated_at is bumped on every UPDATE,
+-- like mock_test_questions.updated_at. subjects_bundle gets one too: its
+-- paper_code / pricing columns are updated in place and copied into the
+-- published catalog (automation_scripts/pipeline.py fingerprints on it).
+--
+-- Existing rows all take the migration's now(): the first mirror sync
+-- afterwards re-pulls each table once, keyset-paging the tie by id.
+-- Run this in the Supabase SQL Editor
+-- =============================================
+
+-- 1. Columns
+ALTER TABLE public.pyq ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
+ALTER TABLE public.syllabus ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
+ALTER TABLE public.notes ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
+ALTER TABLE public.important_questions ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
+ALTER TABLE public.subjects_bundle ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ DEFAULT now();
+
+-- 2. Updated_at trigger
+CREATE OR REPLACE FUNCTION public.touch_content_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.updated_at = now();
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_pyq_updated_at ON public.pyq;
+CREATE TRIGGER trg_pyq_updated_at
+  BEFORE UPDATE ON public.pyq
+  FOR EACH ROW EXECUTE FUNCTION public.touch_content_updated_at();
+
+DROP TRIGGER IF EXISTS trg_syllabus_updated_at ON public.syllabus;
+CREATE TRIGGER trg_syllabus_updated_at
+  BEFORE UPDATE ON public.syllabus
+  FOR EACH ROW EXECUTE FUNCTION public.touch_content_updated_at();
+
+DROP TRIGGER IF EXISTS trg_notes_updated_at ON public.notes;
+CREATE TRIGGER trg_notes_updated_at
+  BEFORE UPDATE ON public.notes
+  FOR EACH ROW EXECUTE FUNCTION public.touch_content_updated_at();
+
+DROP TRIGGER IF EXISTS trg_important_questions_updated_at ON public.important_questions;
+CREATE TRIGGER trg_important_questions_updated_at
+  BEFORE UPDATE ON public.important_questions
+  FOR EACH ROW EXECUTE FUNCTION public.touch_content_updated_at();
+
+DROP TRIGGER IF EXISTS trg_subjects_bundle_updated_at ON public.subjects_bundle;
+CREATE TRIGGER trg_subjects_bundle_updated_at
+  BEFORE UPDATE ON public.subjects_bundle
+  FOR EACH ROW EXECUTE FUNCTION public.touch_content_updated_at();
+
+-- 3. The mirror pages through `updated_at >= watermark order by updated_at, id`
+CREATE INDEX IF NOT EXISTS idx_pyq_updated_at ON public.pyq (updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_syllabus_updated_at ON public.syllabus (updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_notes_updated_at ON public.notes (updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_important_questions_updated_at ON public.important_questions (updated_at, id);
+
+-- Notify PostgREST to reload the schema cache
+NOTIFY pgrst, 'reload schema';
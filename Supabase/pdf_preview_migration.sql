@@ -0,0 +1,29 @@
+-- =============================================
+-- First-page previews + page counts for PDFs
+-- Filled in by automation_scripts/pdf_previews.py; list screens can show
+-- preview_url (a few KB) instead of downloading file_url
+-- Run this in the Supabase SQL Editor
+-- =============================================
+
+ALTER TABLE public.pyq ADD COLUMN IF NOT EXISTS preview_url TEXT;       -- public URL of the first-page image
+ALTER TABLE public.pyq ADD COLUMN IF NOT EXISTS page_count INTEGER;
+
+ALTER TABLE public.syllabus ADD COLUMN IF NOT EXISTS preview_url TEXT;
+ALTER TABLE public.syllabus ADD COLUMN IF NOT EXISTS page_count INTEGER;
+
+ALTER TABLE public.notes ADD COLUMN IF NOT EXISTS preview_url TEXT;
+ALTER TABLE public.notes ADD COLUMN IF NOT EXISTS page_count INTEGER;
+
+-- notes had no hash yet; the renderer fills it in so identical files are rendered once
+ALTER TABLE public.notes ADD COLUMN IF NOT EXISTS content_hash TEXT;
+ALTER TABLE public.notes ADD COLUMN IF NOT EXISTS file_size BIGINT;
+CREATE INDEX IF NOT EXISTS idx_notes_content_hash ON public.notes (content_hash);
+
+-- Previews are stored next to their PDF (<name>.<hash>.preview.webp|png|jpg), but the
+-- syllabus and notes buckets only accepted PDFs (pyqs_pdf has no type restriction)
+UPDATE storage.buckets
+SET allowed_mime_types = ARRAY['application/pdf', 'image/webp', 'image/png', 'image/jpeg']
+WHERE id IN ('syllabus_pdf', 'notes_pdf');
+
+-- Notify PostgREST to reload the schema cache
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,76 @@
+-- =============================================
+-- Question-level rows segmented out of the PYQ PDFs
+-- Filled in by automation_scripts/question_segmenter.py --upload
+-- Run this in the Supabase SQL Editor
+-- =============================================
+
+-- 1. Create pyq_questions table
+CREATE TABLE IF NOT EXISTS public.pyq_questions (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    department TEXT NOT NULL,
+    semester INTEGER NOT NULL,
+    subject TEXT NOT NULL,
+    year TEXT,
+    content_hash TEXT NOT NULL,          -- SHA-256 of the source PDF (pyq.content_hash)
+    question_group TEXT NOT NULL DEFAULT '', -- 'A', 'B', 'C' ... ('' when the paper has no groups)
+    question_type TEXT,                  -- 'mcq', 'short', 'long' or NULL
+    number INTEGER NOT NULL,             -- question number on the paper
+    part TEXT NOT NULL DEFAULT '',       -- MCQ item (i, ii, ...) within the number
+    marks NUMERIC,
+    question_text TEXT NOT NULL,
+    options TEXT[],                      -- MCQ options, in order
+    page INTEGER,                        -- 1-based page the question starts on
+    created_at TIMESTAMPTZ DEFAULT now(),
+    -- Groups may each restart their numbering at 1
+    CONSTRAINT pyq_questions_question_key UNIQUE (department, semester, subject, content_hash, question_group, number, part)
+);
+
+-- 1b. Tables created before question_group was part of the key
+UPDATE public.pyq_questions SET question_group = '' WHERE question_group IS NULL;
+ALTER TABLE public.pyq_questions ALTER COLUMN question_group SET DEFAULT '';
+ALTER TABLE public.pyq_questions ALTER COLUMN question_group SET NOT NULL;
+DO $$
+DECLARE c record;
+BEGIN
+  FOR c IN SELECT conname FROM pg_constraint
+           WHERE conrelid = 'public.pyq_questions'::regclass AND contype = 'u' AND conname <> 'pyq_questions_question_key'
+  LOOP
+    EXECUTE format('ALTER TABLE public.pyq_questions DROP CONSTRAINT %I', c.conname);
+  END LOOP;
+  IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'pyq_questions_question_key') THEN
+    ALTER TABLE public.pyq_questions ADD CONSTRAINT pyq_questions_question_key
+      UNIQUE (department, semester, subject, content_hash, question_group, number, part);
+  END IF;
+END $$;
+
+-- 2. Enable RLS
+ALTER TABLE public.pyq_questions ENABLE ROW LEVEL SECURITY;
+
+-- 3. RLS Policies
+-- Anyone can read
+DROP POLICY IF EXISTS "Anyone can view pyq_questions" ON public.pyq_questions;
+CREATE POLICY "Anyone can view pyq_questions"
+ON public.pyq_questions FOR SELECT
+TO public
+USING (true);
+
+-- The upload scripts use the anon key and upsert (insert + update)
+DROP POLICY IF EXISTS "Anyone can insert pyq_questions" ON public.pyq_questions;
+CREATE POLICY "Anyone can insert pyq_questions"
+ON public.pyq_questions FOR INSERT
+TO anon, authenticated
+WITH CHECK (true);
+
+DROP POLICY IF EXISTS "Anyone can update pyq_questions" ON public.pyq_questions;
+CREATE POLICY "Anyone can update pyq_questions"
+ON public.pyq_questions FOR UPDATE
+TO anon, authenticated
+USING (true)
+WITH CHECK (true);
+
+-- 4. Indexes
+CREATE INDEX IF NOT EXISTS idx_pyq_questions_lookup ON public.pyq_questions (department, semester, subject);
+CREATE INDEX IF NOT EXISTS idx_pyq_questions_hash ON public.pyq_questions (content_hash);
+
+-- Notify PostgREST to reload the schema cache
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,12 @@
+-- =============================================
+-- Let the automation scripts move objects inside pyqs_pdf
+-- Storage's object/move endpoint renames the storage.objects row, so it needs
+-- an UPDATE policy on top of the SELECT / INSERT / DELETE ones in
+-- pyq_setup.sql. Used by automation_scripts/subject_name_matcher.py --apply.
+-- Run this in the Supabase SQL Editor (after pyq_setup.sql)
+-- =============================================
+
+DROP POLICY IF EXISTS "PYQ Public Move" ON storage.objects;
+CREATE POLICY "PYQ Public Move" ON storage.objects FOR UPDATE TO anon, authenticated
+  USING (bucket_id = 'pyqs_pdf')
+  WITH CHECK (bucket_id = 'pyqs_pdf');
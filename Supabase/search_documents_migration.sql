@@ -0,0 +1,78 @@
+-- =============================================
+-- search_documents: one row per notes / syllabus / pyq / important_questions row,
+-- with normalised subject, title, paper code and aliases behind trigram indexes,
+-- so the app's `ilike '%query%'` search no longer scans the content tables.
+--
+-- Written by automation_scripts/search_index.py (`sync` for a full reconcile, and
+-- incrementally by the uploaders). Normalisation happens there:
+--   search_text      lower-case, every run of non [a-z0-9] folded to one space:
+--                    subject + title + aliases ("operating system os pcc cs502 cs502 ...")
+--   paper_code_norm  paper code with separators removed ("pcccs502")
+-- Queries must normalise the search term the same way before matching.
+--
+-- Run this in the Supabase SQL Editor, then: python search_index.py sync
+-- =============================================
+
+-- 1. Trigram operator classes (ships with Supabase, enable once)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 2. The denormalised table
+CREATE TABLE IF NOT EXISTS public.search_documents (
+  source_table    TEXT NOT NULL CHECK (source_table IN ('notes', 'syllabus', 'pyq', 'important_questions')),
+  source_id       UUID NOT NULL,
+  department      TEXT NOT NULL,
+  semester        INT  NOT NULL,
+  subject         TEXT NOT NULL,
+  title           TEXT,
+  paper_code      TEXT,
+  aliases         TEXT[] NOT NULL DEFAULT '{}',
+  search_text     TEXT NOT NULL,
+  paper_code_norm TEXT,
+  payload         JSONB NOT NULL,     -- the source row, so results render without a second query
+  doc_hash        TEXT NOT NULL,      -- lets the sync skip documents that didn't change
+  updated_at      TIMESTAMPTZ DEFAULT now(),
+  PRIMARY KEY (source_table, source_id)
+);
+
+-- 3. Indexes
+-- Leading-wildcard ilike is only indexable through trigrams (needs >= 3 characters of query)
+CREATE INDEX IF NOT EXISTS idx_search_documents_text
+  ON public.search_documents USING gin (search_text gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_search_documents_paper_code
+  ON public.search_documents USING gin (paper_code_norm gin_trgm_ops);
+
+-- Department-scoped filtering and the per-type tabs
+CREATE INDEX IF NOT EXISTS idx_search_documents_dept
+  ON public.search_documents (department, source_table);
+
+-- 4. RLS
+ALTER TABLE public.search_documents ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Anyone can view search_documents" ON public.search_documents;
+CREATE POLICY "Anyone can view search_documents"
+ON public.search_documents FOR SELECT
+TO public
+USING (true);
+
+-- The automation scripts write with the anon key, like the content tables
+DROP POLICY IF EXISTS "Anyone can insert search_documents" ON public.search_documents;
+CREATE POLICY "Anyone can insert search_documents"
+ON public.search_documents FOR INSERT
+TO anon, authenticated
+WITH CHECK (true);
+
+DROP POLICY IF EXISTS "Anyone can update search_documents" ON public.search_documents;
+CREATE POLICY "Anyone can update search_documents"
+ON public.search_documents FOR UPDATE
+TO anon, authenticated
+USING (true);
+
+DROP POLICY IF EXISTS "Anyone can delete search_documents" ON public.search_documents;
+CREATE POLICY "Anyone can delete search_documents"
+ON public.search_documents FOR DELETE
+TO anon, authenticated
+USING (true);
+
+-- Notify PostgREST to reload the schema cache
+NOTIFY pgrst, 'reload schema';
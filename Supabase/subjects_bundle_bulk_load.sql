@@ -0,0 +1,144 @@
+-- =============================================
+-- Bulk-load mode for subjects_bundle
+--
+-- sync_subjects_bundle() runs once per inserted / updated / deleted row of
+-- syllabus, pyq and notes. During an import of thousands of rows that is one
+-- upsert (or three NOT EXISTS probes) per row, all contending on the
+-- (department, semester, subject) unique index.
+--
+-- Writers can now defer the per-row sync and rebuild once at the end:
+--   PostgREST   send the header  X-Bulk-Load: 1   (supabase_client: bulk_load.py)
+--   SQL         SET makaut.bulk_load = 'on';
+-- then
+--   SELECT * FROM public.rebuild_subjects_bundle(ARRAY['CSE'], false);
+--   SELECT * FROM public.verify_subjects_bundle(ARRAY['CSE']);
+--
+-- The rebuild is a single set-based statement. It only inserts missing keys and
+-- fills in paper codes; existing rows keep their id, subject_price and
+-- semester_bundle_id. With p_prune it also deletes rows of the given
+-- departments that no syllabus / pyq / notes row backs any more (after bulk
+-- deletes) - including rows added by hand before any content was uploaded.
+--
+-- Run this in the Supabase SQL Editor (after rename_to_subjects_bundle.sql)
+-- =============================================
+
+-- 1. The trigger reads NEW.paper_code on all three tables
+ALTER TABLE public.syllabus ADD COLUMN IF NOT EXISTS paper_code TEXT;
+
+-- 2. Is this statement part of a bulk load?
+CREATE OR REPLACE FUNCTION public.subjects_bundle_sync_deferred()
+RETURNS BOOLEAN AS $$
+  SELECT CASE
+    WHEN current_setting('makaut.bulk_load', true) = 'on' THEN true
+    WHEN COALESCE(current_setting('request.headers', true), '') = '' THEN false
+    ELSE COALESCE(current_setting('request.headers', true)::json ->> 'x-bulk-load' = '1', false)
+  END;
+$$ LANGUAGE sql STABLE;
+
+-- 3. Same trigger function, with the early return
+CREATE OR REPLACE FUNCTION public.sync_subjects_bundle()
+RETURNS TRIGGER AS $$
+BEGIN
+  -- 0. Bulk loads call rebuild_subjects_bundle() once instead
+  IF public.subjects_bundle_sync_deferred() THEN
+    RETURN COALESCE(NEW, OLD);
+  END IF;
+
+  -- 1. Handle Insertion of NEW subject (on INSERT or subject-changing UPDATE)
+  IF (TG_OP = 'INSERT') OR (TG_OP = 'UPDATE' AND (NEW.subject <> OLD.subject OR NEW.semester <> OLD.semester OR NEW.department <> OLD.department OR COALESCE(NEW.paper_code, '') <> COALESCE(OLD.paper_code, ''))) THEN
+    INSERT INTO public.subjects_bundle (department, semester, subject, paper_code, source)
+    VALUES (NEW.department, NEW.semester, NEW.subject, NEW.paper_code, TG_TABLE_NAME)
+    ON CONFLICT (department, semester, subject) DO UPDATE
+    SET paper_code = EXCLUDED.paper_code;
+  END IF;
+
+  -- 2. Handle Removal of OLD subject (on DELETE or subject-changing UPDATE)
+  IF (TG_OP = 'DELETE') OR (TG_OP = 'UPDATE' AND (NEW.subject <> OLD.subject OR NEW.semester <> OLD.semester OR NEW.department <> OLD.department)) THEN
+    -- Only delete from lookup if it no longer exists in ANY source table
+    IF NOT EXISTS (SELECT 1 FROM public.syllabus WHERE department = OLD.department AND semester = OLD.semester AND subject = OLD.subject)
+       AND NOT EXISTS (SELECT 1 FROM public.pyq WHERE department = OLD.department AND semester = OLD.semester AND subject = OLD.subject)
+       AND NOT EXISTS (SELECT 1 FROM public.notes WHERE department = OLD.department AND semester = OLD.semester AND subject = OLD.subject)
+    THEN
+      DELETE FROM public.subjects_bundle
+      WHERE department = OLD.department AND semester = OLD.semester AND subject = OLD.subject;
+    END IF;
+  END IF;
+
+  RETURN COALESCE(NEW, OLD);
+END;
+$$ LANGUAGE plpgsql;
+
+-- 4. Set-based rebuild (p_departments NULL = every department)
+-- Paper code per key: the syllabus's, else the newest pyq's, else the newest
+-- notes'. A NULL never overwrites a known code (the per-row sync lets the last
+-- row written win, NULL included).
+CREATE OR REPLACE FUNCTION public.rebuild_subjects_bundle(p_departments TEXT[] DEFAULT NULL, p_prune BOOLEAN DEFAULT false)
+RETURNS TABLE (inserted BIGINT, updated BIGINT, deleted BIGINT) AS $$
+  WITH content AS (
+    SELECT department, semester, subject, paper_code, uploaded_at, 'syllabus' AS source, 1 AS rank FROM public.syllabus
+    UNION ALL
+    SELECT department, semester, subject, paper_code, uploaded_at, 'pyq', 2 FROM public.pyq
+    UNION ALL
+    SELECT department, semester, subject, paper_code, uploaded_at, 'notes', 3 FROM public.notes
+  ),
+  src AS (
+    SELECT department, semester, subject,
+           (array_agg(paper_code ORDER BY rank, uploaded_at DESC NULLS LAST) FILTER (WHERE paper_code IS NOT NULL))[1] AS paper_code,
+           (array_agg(source ORDER BY rank, uploaded_at))[1] AS source
+    FROM content
+    WHERE department IS NOT NULL AND semester IS NOT NULL AND subject IS NOT NULL
+      AND (p_departments IS NULL OR department = ANY (p_departments))
+    GROUP BY department, semester, subject
+  ),
+  ins AS (
+    INSERT INTO public.subjects_bundle AS b (department, semester, subject, paper_code, source)
+    SELECT department, semester, subject, paper_code, source FROM src
+    ON CONFLICT (department, semester, subject) DO UPDATE
+    SET paper_code = EXCLUDED.paper_code
+    WHERE EXCLUDED.paper_code IS NOT NULL AND b.paper_code IS DISTINCT FROM EXCLUDED.paper_code
+    RETURNING (xmax = 0) AS is_new
+  ),
+  del AS (
+    DELETE FROM public.subjects_bundle b
+    WHERE p_prune
+      AND (p_departments IS NULL OR b.department = ANY (p_departments))
+      AND NOT EXISTS (SELECT 1 FROM src
+                      WHERE src.department = b.department AND src.semester = b.semester AND src.subject = b.subject)
+    RETURNING 1
+  )
+  SELECT (SELECT count(*) FROM ins WHERE is_new),
+         (SELECT count(*) FROM ins WHERE NOT is_new),
+         (SELECT count(*) FROM del);
+$$ LANGUAGE sql;
+
+-- 5. Check: every content key has a bundle row; count bundle rows nothing backs
+CREATE OR REPLACE FUNCTION public.verify_subjects_bundle(p_departments TEXT[] DEFAULT NULL)
+RETURNS TABLE (content_keys BIGINT, bundle_rows BIGINT, missing BIGINT, orphaned BIGINT, missing_sample JSONB) AS $$
+  WITH keys AS (
+    SELECT DISTINCT department, semester, subject FROM (
+      SELECT department, semester, subject FROM public.syllabus
+      UNION ALL SELECT department, semester, subject FROM public.pyq
+      UNION ALL SELECT department, semester, subject FROM public.notes
+    ) c
+    WHERE department IS NOT NULL AND semester IS NOT NULL AND subject IS NOT NULL
+      AND (p_departments IS NULL OR department = ANY (p_departments))
+  ),
+  bundle AS (
+    SELECT department, semester, subject FROM public.subjects_bundle
+    WHERE p_departments IS NULL OR department = ANY (p_departments)
+  ),
+  missing AS (SELECT * FROM keys EXCEPT SELECT * FROM bundle),
+  orphaned AS (SELECT * FROM bundle EXCEPT SELECT * FROM keys)
+  SELECT (SELECT count(*) FROM keys),
+         (SELECT count(*) FROM bundle),
+         (SELECT count(*) FROM missing),
+         (SELECT count(*) FROM orphaned),
+         (SELECT COALESCE(jsonb_agg(to_jsonb(m)), '[]') FROM (SELECT * FROM missing LIMIT 20) m);
+$$ LANGUAGE sql STABLE;
+
+-- 6. The automation scripts call these with the anon key
+GRANT EXECUTE ON FUNCTION public.rebuild_subjects_bundle(TEXT[], BOOLEAN) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.verify_subjects_bundle(TEXT[]) TO anon, authenticated;
+
+-- Notify PostgREST to reload the schema cache
+NOTIFY pgrst, 'reload schema';
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""Offline micro-benchmarks for the matching and parsing hot paths.
+
+Corpora are fixed: subject names recorded in scraped_subjects.json and
+other_depts_syllabus.json, expanded into makaut-style slugs, noisy queries and
+paper-link HTML with a seeded RNG, so every run times the same inputs.
+
+    python bench_hot_paths.py                # run and print
+    python bench_hot_paths.py --save         # run and store as the baseline
+    python bench_hot_paths.py --compare      # fail if anything regressed > 25% (+ its noise)
+    python bench_hot_paths.py -k fuzzy       # only benchmarks matching 'fuzzy'
+
+bench_baseline.json is a committed reference run (machine and Python version
+inside). Timings only compare on similar hardware: re-save it on the machine
+that runs --compare, and commit it again after an intended speed change.
+
+Each benchmark keeps the best and the median of REPEAT runs of ~TARGET_SECONDS.
+The median's distance from the best is its noise: --compare allows the
+threshold plus the larger noise of baseline and now (at most NOISE_CAP more),
+and re-measures anything flagged (RETRIES times, keeping the best) before
+calling it a regression.
+
+Benchmarks whose module can't be imported (e.g. PyMuPDF not installed) are
+reported as skipped rather than failing the run.
+"""
+
+import sys
+import json
+import time
+import timeit
+import random
+import argparse
+import platform
+import importlib
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+BASELINE_PATH = SCRIPTS_DIR / "bench_baseline.json"
+THRESHOLD = 0.25
+REPEAT = 15
+TARGET_SECONDS = 0.5   # per repeat
+RETRIES = 2
+NOISE_CAP = 0.25       # a gate that allows anything is no gate: noise adds at most this
+SEED = 1337
+
+DEPT_CODES = {"CSE": "cse", "IT": "it", "ECE": "ec", "EE": "ee", "ME": "me", "CE": "ce"}
+SLUG_SUFFIXES = ["", "-2019", "-2022", "-V1", "-S2", "-OLD", "-PCC-CS301", "-ESC-301", "-BSM101", "-HSMC-401-2021"]
+PAPER_CODES = ["", " (CS701)", " CS 701", " (PCC-CS502)", " EC-401", " BS PH 101"]
+
+
+# --- CORPORA ---
+
+def load_corpus():
+    scraped = json.loads((SCRIPTS_DIR / "scraped_subjects.json").read_text())
+    syllabus = json.loads((SCRIPTS_DIR / "other_depts_syllabus.json").read_text())
+    syllabus_names = {
+        dept: {sem: [s["subject"] for s in subs] for sem, subs in sems.items()}
+        for dept, sems in syllabus.items()
+    }
+    return scraped, syllabus_names
+
+
+def noisy(rng, name):
+    """A plausible mis-scrape: dropped/duplicated characters, case and spacing noise."""
+    chars = list(name)
+    for _ in range(rng.randint(0, 2)):
+        if len(chars) > 4:
+            i = rng.randrange(len(chars))
+            if rng.random() < 0.5:
+                del chars[i]
+            else:
+                chars.insert(i, chars[i])
+    out = "".join(chars)
+    return out.upper() if rng.random() < 0.3 else out
+
+
+def build_fixtures():
+    rng = random.Random(SEED)
+    scraped, syllabus = load_corpus()
+
+    slugs = []
+    for dept, sems in scraped.items():
+        code = DEPT_CODES.get(dept, dept.lower()).upper()
+        for sem, names in sems.items():
+            for name in names:
+                slugs.append((f"BTECH-{code}-{sem}-SEM-{name.upper().replace(' ', '-')}{rng.choice(SLUG_SUFFIXES)}", sem, code))
+
+    # fuzzy_match: {lower: original} per dept/sem + noisy queries against it
+    fuzzy_cases = []
+    for dept, sems in syllabus.items():
+        for sem, names in sems.items():
+            candidates = {n.lower().strip(): n for n in names}
+            for name in names:
+                fuzzy_cases.append((noisy(rng, name), candidates))
+
+    # find_match: folder names with paper codes vs a department's syllabus set
+    find_cases = []
+    for dept, sems in syllabus.items():
+        dept_subjects = {n for names in sems.values() for n in names}
+        for names in sems.values():
+            for name in names:
+                find_cases.append((noisy(rng, name) + rng.choice(PAPER_CODES), dept_subjects))
+
+    # merge_similar_subjects: one dict per dept/sem of the recorded scraped names
+    merge_cases = [
+        {name: [f"https://www.makaut.com/papers/{i}.pdf"] for i, name in enumerate(names)}
+        for sems in scraped.values() for names in sems.values()
+    ]
+
+    # process_department link parsing: a department page's worth of anchors
+    anchors = []
+    for slug, sem, code in slugs:
+        year = rng.choice(["", "-2018", "-2019", "-2021", "-2023"])
+        href = f"https://www.makaut.com/papers/{slug.lower()}{year}.html"
+        anchors.append(f'<li><a href="{href}">{slug}</a></li>')
+    rng.shuffle(anchors)
+    html = "<html><body><ul>" + "\n".join(anchors) + "</ul></body></html>"
+
+    return {
+        "slugs": slugs,
+        "fuzzy": fuzzy_cases,
+        "find": find_cases,
+        "merge": merge_cases,
+        "html": html,
+        "subjects": [n for sems in syllabus.values() for names in sems.values() for n in names],
+    }
+
+
+def synthetic_pdfs(fitz, subjects, count=20):
+    """First pages shaped like MAKAUT papers, rendered with PyMuPDF itself."""
+    rng = random.Random(SEED)
+    pdfs = []
+    for i in range(count):
+        doc = fitz.open()
+        page = doc.new_page()
+        header = [
+            "MAULANA ABUL KALAM AZAD UNIVERSITY OF TECHNOLOGY, WEST BENGAL",
+            f"Paper Code : CS-{rng.randint(301, 802)}",
+            f"{'Subject' if i % 3 else 'Name of the Paper'} : {rng.choice(subjects)}" if i % 4 else rng.choice(subjects),
+            "Time Allotted : 3 Hours                Full Marks : 70",
+        ]
+        y = 72
+        for line in header + [f"{q}. Answer any five questions." for q in range(1, 30)]:
+            page.insert_text((72, y), line, fontsize=10)
+            y += 14
+        pdfs.append(doc.tobytes())
+        doc.close()
+    return pdfs
+
+
+# --- BENCHMARKS ---
+# Each returns a zero-arg callable that runs the hot path over its whole corpus.
+
+def bench_clean_subject_name_smart(fx):
+    mod = importlib.import_module("smart_download_pyqs")
+    return lambda: [mod.clean_subject_name(slug) for slug, _, _ in fx["slugs"]]
+
+
+def bench_clean_subject_name_download(fx):
+    mod = importlib.import_module("download_pyqs")
+    return lambda: [mod.clean_subject_name(slug, sem, code) for slug, sem, code in fx["slugs"]]
+
+
+def bench_fuzzy_match(fx):
+    mod = importlib.import_module("smart_download_pyqs")
+    return lambda: [mod.fuzzy_match(q, c) for q, c in fx["fuzzy"]]
+
+
+def bench_find_match(fx):
+    mod = importlib.import_module("subject_name_matcher")
+    return lambda: [mod.find_match(q, s) for q, s in fx["find"]]
+
+
+def bench_merge_similar_subjects(fx):
+    mod = importlib.import_module("download_pyqs")
+    return lambda: [mod.merge_similar_subjects(d) for d in fx["merge"]]
+
+
+def bench_parse_paper_links(fx):
+    mod = importlib.import_module("smart_download_pyqs")
+    return lambda: [mod.parse_paper_links(fx["html"], dept) for dept in ("ECE", "IT", "EE")]
+
+
+def bench_extract_subject_from_pdf(fx):
+    mod = importlib.import_module("smart_download_pyqs")
+    pdfs = synthetic_pdfs(importlib.import_module("fitz"), fx["subjects"])
+    return lambda: [mod.extract_subject_from_pdf(p) for p in pdfs]
+
+
+BENCHMARKS = {
+    "clean_subject_name[smart_download]": bench_clean_subject_name_smart,
+    "clean_subject_name[download_pyqs]": bench_clean_subject_name_download,
+    "fuzzy_match": bench_fuzzy_match,
+    "find_match": bench_find_match,
+    "merge_similar_subjects": bench_merge_similar_subjects,
+    "parse_paper_links": bench_parse_paper_links,
+    "extract_subject_from_pdf": bench_extract_subject_from_pdf,
+}
+
+
+def measure(fn):
+    """{"best", "median"} seconds per call over REPEAT runs of ~TARGET_SECONDS each."""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    number = max(number, round(number * TARGET_SECONDS / elapsed))
+    times = sorted(t / number for t in timer.repeat(repeat=REPEAT, number=number))
+    return {"best": times[0], "median": times[len(times) // 2]}
+
+
+def noise(result):
+    # Baselines saved before the median was kept are a bare best time
+    return result["median"] / result["best"] - 1 if isinstance(result, dict) else 0.0
+
+
+def best(result):
+    return result["best"] if isinstance(result, dict) else result
+
+
+def run(selected, fx=None):
+    fx = fx or build_fixtures()
+    results = {}
+    for name in selected:
+        try:
+            fn = BENCHMARKS[name](fx)
+        except ImportError as e:
+            print(f"  {name:<38} skipped ({e.name} not installed)")
+            continue
+        results[name] = measure(fn)
+        print(f"  {name:<38} {results[name]['best'] * 1000:10.3f} ms  (noise {noise(results[name]):.1%})")
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"\n{'Benchmark':<38} {'Baseline':>10} {'Now':>10} {'Change':>8} {'Allowed':>8}")
+    print("-" * 79)
+    for name, now in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"{name:<38} {'-':>10} {best(now) * 1000:9.3f}ms {'new':>8}")
+            continue
+        change = best(now) / best(base) - 1
+        allowed = threshold + min(max(noise(base), noise(now)), NOISE_CAP)
+        flag = ""
+        if change > allowed:
+            regressions.append(name)
+            flag = "  ❌"
+        print(f"{name:<38} {best(base) * 1000:9.3f}ms {best(now) * 1000:9.3f}ms {change:+7.1%} {allowed:7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for matching/parsing hot paths.")
+    parser.add_argument("-k", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--save", action="store_true", help=f"Store results as the baseline ({BASELINE_PATH.name})")
+    parser.add_argument("--compare", action="store_true", help="Compare against the baseline, exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Allowed slowdown before failing (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    selected = [n for n in BENCHMARKS if not args.k or args.k in n]
+    print(f"Running {len(selected)} benchmarks (Python {platform.python_version()})...")
+    fx = build_fixtures()
+    results = run(selected, fx)
+
+    if args.compare:
+        if not BASELINE_PATH.exists():
+            print(f"No baseline at {BASELINE_PATH}; run with --save first.")
+            sys.exit(1)
+        baseline = json.loads(BASELINE_PATH.read_text())
+        regressions = compare(results, baseline, args.threshold)
+        for attempt in range(RETRIES):
+            if not regressions:
+                break
+            # A busy moment can slow one measurement; keep the best of the re-runs
+            print(f"\nRe-measuring {len(regressions)} flagged benchmark(s) ({attempt + 1}/{RETRIES})...")
+            for name, again in run(regressions, fx).items():
+                if again["best"] < results[name]["best"]:
+                    results[name] = again
+            regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%} + noise: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.threshold:.0%} + noise.")
+
+    if args.save:
+        baseline = {
+            "saved_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+            "results": results,
+        }
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2))
+        print(f"\nBaseline saved to {BASELINE_PATH.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""End-to-end throughput benchmark: smart_download_pyqs -> upload_pyqs_to_supabase.
+
+Builds a synthetic makaut.com (department pages + first-year root page linking to
+generated PDFs, a share of them with unreadable slugs so the PDF text fallback
+runs), serves it together with a fake Supabase from http_stub_server.py, and
+runs the real scrape / match / extract / save / inventory / upload / insert code
+against it at several concurrency levels.
+
+Each concurrency level runs in its own subprocess so peak RSS is per run, and
+reports throughput plus p50/p90/p99 latency for every stage.
+
+    python bench_ingest.py                               # 2 depts, concurrency 1 4 8
+    python bench_ingest.py --depts 5 --subjects 8 --concurrency 1 8 16 32
+    python bench_ingest.py --latency 80 --jitter 40 --json ingest_results.json
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from collections import defaultdict
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+
+SCRIPTS_DIR = Path(__file__).parent
+SEED = 1337
+PERCENTILES = (50, 90, 99)
+
+# Order stages are reported in
+STAGES = ["syllabus", "scrape", "fetch", "match", "extract", "verify_save",
+          "inventory", "existing", "storage_put", "insert", "upload_file"]
+
+
+# --- SYNTHETIC SITE ---
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+
+def synthetic_paper(fitz, subject, code, pages):
+    """A MAKAUT-style paper: header block on page 1, filler questions after."""
+    doc = fitz.open()
+    for n in range(pages):
+        page = doc.new_page()
+        lines = [
+            "MAULANA ABUL KALAM AZAD UNIVERSITY OF TECHNOLOGY, WEST BENGAL",
+            f"Paper Code : {code}",
+            f"Subject : {subject}",
+            "Time Allotted : 3 Hours                Full Marks : 70",
+        ] if n == 0 else []
+        lines += [f"{q}. Answer the following question in detail. ({q % 5 + 1} marks)" for q in range(1, 45)]
+        y = 60
+        for line in lines:
+            page.insert_text((60, y), line, fontsize=9)
+            y += 16
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def build_site(site_dir, depts, subjects_per_sem, years, ocr_rate, pages):
+    """Write the synthetic site as replay fixtures. Returns (syllabus rows, summary)."""
+    import fitz
+    from http_fixtures import FixtureStore
+    from smart_download_pyqs import URL_MAP
+
+    rng = random.Random(SEED)
+    store = FixtureStore(Path(site_dir) / "fixtures")
+    syllabus = json.loads((SCRIPTS_DIR / "other_depts_syllabus.json").read_text())
+    rows, pdfs = [], 0
+
+    def add_paper(anchors, prefix, sem, subject, year):
+        nonlocal pdfs
+        # A share of links carry an opaque slug, so only the PDF text identifies them
+        slug = slugify(subject) if rng.random() >= ocr_rate else f"{sem}x-{rng.randint(100, 999)}"
+        href = f"https://www.makaut.com/papers/{prefix}{sem}-sem-{slug}-{year}.html"
+        anchors.append(f'<li><a href="{href}">{slug.upper()}</a></li>')
+        body = synthetic_paper(fitz, subject, f"{prefix.upper()}{sem}{rng.randint(10, 99)}", pages)
+        store.put("GET", href.replace(".html", ".pdf"), 200, {"Content-Type": "application/pdf"}, body)
+        pdfs += 1
+
+    for dept in depts:
+        code = re.search(r'btech-([a-z]+)-question', URL_MAP[dept]).group(1)
+        anchors = []
+        for sem, subs in syllabus[dept].items():
+            rows += [{"department": dept, "semester": int(sem), "subject": s["subject"]} for s in subs]
+            if sem in ("1", "2"):
+                continue  # first year comes from the root page
+            for s in subs[:subjects_per_sem]:
+                for year in years:
+                    add_paper(anchors, f"btech-{code}-", sem, s["subject"], year)
+        store.put("GET", URL_MAP[dept], 200, {"Content-Type": "text/html"},
+                  ("<html><body><ul>" + "\n".join(anchors) + "</ul></body></html>").encode())
+
+    # Root page: common first-year papers, applicable to every department
+    anchors = []
+    first_year = syllabus[depts[0]]
+    for sem in ("1", "2"):
+        for s in first_year.get(sem, [])[:subjects_per_sem]:
+            for year in years:
+                add_paper(anchors, "btech-", sem, s["subject"], year)
+    store.put("GET", "https://www.makaut.com/", 200, {"Content-Type": "text/html"},
+              ("<html><body><ul>" + "\n".join(anchors) + "</ul></body></html>").encode())
+
+    return rows, {"depts": depts, "pdfs": pdfs}
+
+
+# --- WORKER (one concurrency level, own process) ---
+
+def peak_rss_mb():
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024  # bytes on macOS, KB on Linux
+
+
+def timed(samples, stage, fn):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            samples[stage].append(time.perf_counter() - start)
+    return wrapper
+
+
+def run_worker(concurrency, site_dir, out_path):
+    """Download + upload the whole synthetic site with `concurrency` threads per phase.
+    SUPABASE_URL / HTTP_STUB must already point at the stub server."""
+    import urllib.request
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    import corpus_inventory
+    import smart_download_pyqs as smart
+    import upload_pyqs_to_supabase as upload
+
+    site = json.loads((Path(site_dir) / "site.json").read_text())
+    work = Path(site_dir) / f"run_c{concurrency}"
+    base = work / "Departments"
+    base.mkdir(parents=True)
+
+    # Local tree and inventory live in the run directory; syllabus comes from the stub
+    smart.BASE_DIR = corpus_inventory.BASE_DIR = upload.BASE_DIR = base
+    smart.mirror_select = lambda *args, **kwargs: None
+
+    samples = defaultdict(list)
+    smart.get_syllabus_subjects = timed(samples, "syllabus", smart.get_syllabus_subjects)
+    smart.get_html = timed(samples, "scrape", smart.get_html)
+    smart.fuzzy_match = timed(samples, "match", smart.fuzzy_match)
+    smart.extract_subject_from_pdf = timed(samples, "extract", smart.extract_subject_from_pdf)
+    smart.download_and_verify = timed(samples, "verify_save", smart.download_and_verify)
+    urllib.request.urlopen = timed(samples, "fetch", urllib.request.urlopen)  # until headers arrive
+    upload.get_existing_records = timed(samples, "existing", upload.get_existing_records)
+    upload.supabase.upload = timed(samples, "storage_put", upload.supabase.upload)
+    upload.insert_metadata = timed(samples, "insert", upload.insert_metadata)
+    upload.upload_file = timed(samples, "upload_file", upload.upload_file)
+
+    def download(paper):
+        (pdf_url, sem, year, scraped_name), dept = paper
+        return bool(smart.download_and_verify(pdf_url, dept, sem, year, scraped_name, syll_match_map))
+
+    def upload_one(row):
+        file_url, content_hash, file_size = upload.upload_file(base / row['path'], row['path'])
+        if not file_url:
+            return False
+        return upload.insert_metadata(row['dept'], row['sem'], row['subject'], row['year'],
+                                      file_url, content_hash, file_size)
+
+    with redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        syll_match_map = smart.get_syllabus_subjects()
+        papers = []
+        for dept in site["depts"]:
+            html = smart.get_html(smart.URL_MAP[dept]) + smart.get_html("https://www.makaut.com/")
+            papers += [(p, dept) for p in smart.parse_paper_links(html, dept)]
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            saved = sum(pool.map(download, papers))
+        download_done = time.perf_counter()
+
+        conn = corpus_inventory.connect(work / "inventory.sqlite3")
+        timed(samples, "inventory", corpus_inventory.refresh)(conn)
+        existing = upload.get_existing_records()
+        rows = [r for r in corpus_inventory.files(conn)
+                if (r['dept'], r['sem'], r['subject'], r['year']) not in existing]
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            uploaded = sum(pool.map(upload_one, rows))
+        end = time.perf_counter()
+
+    Path(out_path).write_text(json.dumps({
+        "concurrency": concurrency,
+        "links": len(papers),
+        "saved": saved,
+        "files": len(rows),
+        "uploaded": uploaded,
+        "download_s": download_done - start,
+        "upload_s": end - download_done,
+        "total_s": end - start,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": samples,
+    }))
+
+
+# --- REPORT ---
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def summarize(result):
+    per_min = lambda n, s: n / s * 60 if s else 0.0
+    result["download_per_min"] = per_min(result["links"], result["download_s"])
+    result["upload_per_min"] = per_min(result["files"], result["upload_s"])
+    result["end_to_end_per_min"] = per_min(result["uploaded"], result["total_s"])
+    result["latency_ms"] = {
+        stage: {"n": len(v), **{f"p{q}": percentile(v, q) * 1000 for q in PERCENTILES}, "max": max(v) * 1000}
+        for stage, v in result.pop("stages").items() if v
+    }
+    return result
+
+
+def print_report(results):
+    print(f"\n{'='*86}")
+    print(f"{'Conc':>5} {'Links':>6} {'Saved':>6} {'Upl':>6} {'DL/min':>9} {'UL/min':>9} {'E2E/min':>9} {'Total':>8} {'PeakRSS':>9}")
+    print(f"{'-'*86}")
+    for r in results:
+        print(f"{r['concurrency']:>5} {r['links']:>6} {r['saved']:>6} {r['uploaded']:>6} "
+              f"{r['download_per_min']:>9.1f} {r['upload_per_min']:>9.1f} {r['end_to_end_per_min']:>9.1f} "
+              f"{r['total_s']:>7.1f}s {r['peak_rss_mb']:>7.1f}MB")
+
+    for r in results:
+        print(f"\nConcurrency {r['concurrency']} - stage latency (ms)")
+        print(f"  {'Stage':<13} {'n':>6} " + " ".join(f"{'p' + str(q):>9}" for q in PERCENTILES) + f" {'max':>9}")
+        for stage in STAGES:
+            s = r["latency_ms"].get(stage)
+            if s:
+                print(f"  {stage:<13} {s['n']:>6} " + " ".join(f"{s['p' + str(q)]:>9.2f}" for q in PERCENTILES) + f" {s['max']:>9.2f}")
+    print(f"{'='*86}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end PYQ ingestion benchmark against local stubs.")
+    parser.add_argument("--depts", type=int, default=2, help="Departments to generate (from smart_download_pyqs.DEPARTMENTS)")
+    parser.add_argument("--subjects", type=int, default=4, help="Subjects per semester")
+    parser.add_argument("--years", default="2019,2022,2023", help="Comma-separated paper years")
+    parser.add_argument("--ocr-rate", type=float, default=0.2, help="Share of links with opaque slugs (PDF text fallback)")
+    parser.add_argument("--pages", type=int, default=3, help="Pages per synthetic PDF")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="Thread counts to benchmark")
+    parser.add_argument("--latency", type=float, default=20.0, help="Stub latency per request (ms)")
+    parser.add_argument("--jitter", type=float, default=10.0, help="Extra random stub latency, 0..N ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of stub requests answered with 503")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated site, stub storage and run trees")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--site", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.site, args.out)
+        return
+
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    from smart_download_pyqs import DEPARTMENTS
+    from http_stub_server import make_server
+
+    site_dir = Path(tempfile.mkdtemp(prefix="bench_ingest_"))
+    depts = DEPARTMENTS[:args.depts]
+    print(f"Building synthetic site for {', '.join(depts)} in {site_dir}...")
+    syllabus_rows, site = build_site(site_dir, depts, args.subjects, args.years.split(","), args.ocr_rate, args.pages)
+    (site_dir / "site.json").write_text(json.dumps(site))
+    print(f"  {site['pdfs']} PDFs, {len(syllabus_rows)} syllabus rows")
+
+    server, rest, storage = make_server(
+        port=0, storage_dir=site_dir / "storage", fixtures_dir=site_dir / "fixtures",
+        latency_ms=args.latency, jitter_ms=args.jitter, error_rate=args.error_rate,
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub = f"http://127.0.0.1:{server.server_address[1]}"
+    env = {**os.environ, "SUPABASE_URL": stub, "HTTP_STUB": stub}
+
+    results = []
+    for concurrency in args.concurrency:
+        # Fresh Supabase state per run so every level uploads the same work
+        rest.tables = {"syllabus": [dict(r) for r in syllabus_rows]}
+        with storage.lock:
+            storage.objects.clear()
+        out = site_dir / f"result_c{concurrency}.json"
+        print(f"▶ concurrency {concurrency}...")
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", str(concurrency), "--site", str(site_dir), "--out", str(out)],
+            env=env, cwd=SCRIPTS_DIR,
+        )
+        if proc.returncode != 0:
+            print(f"  ❌ run failed ({proc.returncode})")
+            continue
+        results.append(summarize(json.loads(out.read_text())))
+
+    server.shutdown()
+    if not args.keep:
+        shutil.rmtree(site_dir, ignore_errors=True)
+    if results:
+        print_report(results)
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "params": {k: v for k, v in vars(args).items() if k not in ("worker", "site", "out", "json", "keep")},
+            "results": results,
+        }, indent=2))
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Startup-time benchmark for makaut_cli.
+
+Runs `python -X importtime makaut_cli.py <args>` a few times per command,
+reports the best wall time and how much of it is on top of a bare interpreter
+start, and lists the slowest top-level imports. Commands that only print
+metadata (--help, --version, commands) must stay within the budget (measured
+above the bare start, so it doesn't depend on the machine's interpreter
+startup) and must not import any heavy dependency.
+
+    python bench_startup.py                  # budget check for the metadata commands
+    python bench_startup.py --all            # also time `<command> --help` for argparse subcommands
+    python bench_startup.py --budget 40 --top 5
+"""
+
+import re
+import sys
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+CLI = SCRIPTS_DIR / "makaut_cli.py"
+BUDGET_MS = 30
+RUNS = 5
+HEAVY = ("fitz", "pymupdf", "numpy", "requests")
+
+METADATA_COMMANDS = [["--help"], ["--version"], ["commands"]]
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def has_help(module):
+    """Only scripts built on argparse answer --help; the others start working immediately."""
+    return "parse_args(" in (SCRIPTS_DIR / f"{module}.py").read_text()
+
+
+def run_once(argv):
+    """(wall seconds, [(module, cumulative_us, depth)]) for one start."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", *argv], cwd=SCRIPTS_DIR,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall = time.perf_counter() - start
+    imports = []
+    for line in proc.stderr.splitlines():
+        m = IMPORT_LINE.match(line)
+        if m:
+            imports.append((m.group(4), int(m.group(2)), (len(m.group(3)) - 1) // 2))
+    return wall, imports
+
+
+def measure(argv, runs):
+    best, imports = None, []
+    for _ in range(runs):
+        wall, imports = run_once(argv)
+        best = wall if best is None else min(best, wall)
+    return best, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup-time benchmark for the makaut CLI.")
+    parser.add_argument("--all", action="store_true", help="Also time `<command> --help` for subcommands that have one")
+    parser.add_argument("--budget", type=float, default=BUDGET_MS, help="Budget for metadata commands, in ms above a bare start")
+    parser.add_argument("--runs", type=int, default=RUNS, help="Starts per command (best is reported)")
+    parser.add_argument("--top", type=int, default=8, help="Slowest top-level imports to list")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    from makaut_cli import COMMANDS
+
+    bare, _ = measure(["-c", "pass"], args.runs)
+    print(f"Bare interpreter start: {bare * 1000:.1f} ms\n")
+
+    cases = [(argv, True) for argv in METADATA_COMMANDS]
+    if args.all:
+        cases += [([name, "--help"], False) for name, (module, _) in COMMANDS.items() if has_help(module)]
+
+    failures = []
+    print(f"{'Command':<34} {'Best':>9} {'-bare':>9}  Slowest imports")
+    print("-" * 100)
+    for argv, budgeted in cases:
+        wall, imports = measure([str(CLI), *argv], args.runs)
+        top_level = sorted((i for i in imports if i[2] == 0), key=lambda i: -i[1])[:args.top]
+        slowest = ", ".join(f"{name} {us / 1000:.1f}" for name, us, _ in top_level)
+        flag = ""
+        if budgeted:
+            heavy = sorted({name.split(".")[0] for name, _, _ in imports if name.split(".")[0] in HEAVY})
+            if (wall - bare) * 1000 > args.budget:
+                failures.append(f"makaut {' '.join(argv)}: +{(wall - bare) * 1000:.1f} ms > {args.budget:.0f} ms")
+                flag = " ❌"
+            if heavy:
+                failures.append(f"makaut {' '.join(argv)} imports {', '.join(heavy)}")
+                flag = " ❌"
+        print(f"{'makaut ' + ' '.join(argv):<34} {wall * 1000:>7.1f}ms {(wall - bare) * 1000:>7.1f}ms  {slowest}{flag}")
+
+    if failures:
+        print("\n❌ Startup budget exceeded:")
+        for f in failures:
+            print(f"  {f}")
+        sys.exit(1)
+    print(f"\n✅ Metadata commands within +{args.budget:.0f} ms and free of {', '.join(HEAVY)}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""Bulk-load mode: defer the per-row subjects_bundle sync during big imports.
+
+sync_subjects_bundle() fires for every row written to syllabus / pyq / notes,
+so an import of thousands of PYQs pays one bundle upsert per row, all on the
+same unique index. Inside `bulk_load()` every request carries X-Bulk-Load: 1,
+the trigger returns early, and one set-based rebuild_subjects_bundle() runs at
+the end, followed by verify_subjects_bundle():
+
+    from bulk_load import bulk_load
+    with bulk_load(["CSE", "IT"]):
+        ... inserts into pyq / syllabus / notes ...
+
+    python bulk_load.py rebuild [--dept CSE IT] [--prune]   # one-off rebuild + verify
+    python bulk_load.py verify [--dept CSE]
+    python bulk_load.py bench --dsn postgresql://localhost/scratch --rows 10000 50000
+
+`bench` loads the Supabase/*.sql schema into an EMPTY scratch database (like
+index_advisor.py), imports the same rows with the per-row sync and in bulk
+mode, and checks the rebuilt table against the trigger-maintained one. Needs
+the postgres extra (psycopg).
+
+Requires Supabase/subjects_bundle_bulk_load.sql; without it the header is
+ignored, the per-row sync stays on and the rebuild is skipped with a warning.
+"""
+
+import sys
+import time
+import random
+import argparse
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from supabase_client import supabase
+from metrics import count, observe, start_run
+
+HEADER = "X-Bulk-Load"
+MIGRATION = Path(__file__).resolve().parent.parent / "Supabase" / "subjects_bundle_bulk_load.sql"
+BULK_THRESHOLD = 200        # uploaders switch to bulk mode from this many new rows
+
+# bench
+BENCH_SIZES = [10000, 50000]
+BASE_ROWS = 20000           # rows per content table before the import
+WORKERS = 4                 # concurrent uploaders
+INSERT_BATCH = 500          # rows per INSERT, like a batched PostgREST request
+DELETE_BATCH = 200          # ids per DELETE, like the cleanup scripts
+
+
+# --- SUPABASE ---
+
+def scope(departments):
+    return f" ({', '.join(departments)})" if departments else ""
+
+
+def rebuild(departments=None, prune=False):
+    """{inserted, updated, deleted}, or None when the migration isn't installed."""
+    start = time.perf_counter()
+    resp = supabase.rpc("rebuild_subjects_bundle", {"p_departments": departments, "p_prune": prune},
+                        op="bundle_rebuild")
+    if resp.status_code == 404:
+        print(f"  ⚠ rebuild_subjects_bundle() not found - run Supabase/{MIGRATION.name}; "
+              "the per-row sync stayed on")
+        count("bundle_rebuild", outcome="missing")
+        return None
+    if resp.status_code != 200:
+        count("bundle_rebuild", outcome="failed")
+        raise RuntimeError(f"rebuild_subjects_bundle failed: {resp.status_code} {resp.text[:200]}")
+    seconds = time.perf_counter() - start
+    result = resp.json()[0]
+    observe("bundle_rebuild_seconds", seconds, prune=prune)
+    count("bundle_rebuild", outcome="ok")
+    print(f"  🔁 subjects_bundle rebuilt{scope(departments)}: {result['inserted']} added, "
+          f"{result['updated']} paper codes filled, {result['deleted']} pruned ({seconds:.1f}s)")
+    return result
+
+
+def verify(departments=None):
+    """verify_subjects_bundle() result; prints a ❌ when content keys have no bundle row."""
+    resp = supabase.rpc("verify_subjects_bundle", {"p_departments": departments}, op="bundle_verify")
+    if resp.status_code != 200:
+        print(f"  ⚠ verify_subjects_bundle failed: {resp.status_code} {resp.text[:200]}")
+        return None
+    result = resp.json()[0]
+    if result["missing"]:
+        count("bundle_verify", outcome="missing")
+        sample = ", ".join(f"{k['department']} Sem {k['semester']} {k['subject']}" for k in result["missing_sample"][:3])
+        print(f"  ❌ {result['missing']} subjects have content but no subjects_bundle row (e.g. {sample}) - "
+              f"rerun: python bulk_load.py rebuild")
+    else:
+        count("bundle_verify", outcome="ok")
+        orphaned = f", {result['orphaned']} not backed by content" if result["orphaned"] else ""
+        print(f"  ✅ subjects_bundle{scope(departments)}: {result['bundle_rows']} rows cover all "
+              f"{result['content_keys']} subjects{orphaned}")
+    return result
+
+
+@contextmanager
+def bulk_load(departments=None, prune=False):
+    """Writes inside the block skip the per-row sync; rebuild + verify run on exit, also after
+    an error (rows written before it still need their bundle rows)."""
+    supabase.headers[HEADER] = "1"
+    try:
+        yield
+    finally:
+        supabase.headers.pop(HEADER, None)
+        if rebuild(departments, prune) is not None:
+            verify(departments)
+
+
+# --- BENCH ---
+
+def import_rows(subjects, n, rng):
+    """n synthetic pyq rows: mostly existing subjects, ~1% new ones."""
+    from index_advisor import content_rows
+    new = [(d, s, f"{subject} Lab", code) for d, s, subject, code in rng.sample(subjects, min(len(subjects), n // 100))]
+    return content_rows("pyq", subjects + new, n, rng, [])
+
+
+def run_batches(dsn, sql, params, workers, bulk):
+    """(seconds, deadlocks): every params tuple in its own transaction, from `workers` connections.
+    Deadlocked batches are retried."""
+    import psycopg
+
+    queue, lock, deadlocks = list(params), threading.Lock(), [0]
+
+    def worker(_):
+        with psycopg.connect(dsn, autocommit=True) as conn:
+            if bulk:
+                conn.execute("SET makaut.bulk_load = 'on'")
+            while True:
+                with lock:
+                    if not queue:
+                        return
+                    p = queue.pop()
+                while True:
+                    try:
+                        conn.execute(sql, p)
+                        break
+                    except psycopg.errors.DeadlockDetected:
+                        with lock:
+                            deadlocks[0] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(worker, range(workers)))
+    return time.perf_counter() - start, deadlocks[0]
+
+
+def sql_rebuild(conn, departments, prune):
+    start = time.perf_counter()
+    conn.execute("SELECT * FROM public.rebuild_subjects_bundle(%s, %s)", (departments, prune)).fetchone()
+    return time.perf_counter() - start
+
+
+def snapshot(conn):
+    """{(department, semester, subject): (paper_code, subject_price, semester_bundle_id)}"""
+    rows = conn.execute("SELECT department, semester, subject, paper_code, subject_price, semester_bundle_id::text "
+                        "FROM public.subjects_bundle").fetchall()
+    return {(d, s, sub): rest for d, s, sub, *rest in rows}
+
+
+def compare(expected, actual):
+    """Differences between the trigger-maintained and the rebuilt table."""
+    both = expected.keys() & actual.keys()
+    return {
+        "missing": len(expected.keys() - actual.keys()),
+        "extra": len(actual.keys() - expected.keys()),
+        "paper_code": sum(expected[k][0] != actual[k][0] for k in both),
+        "other": sum(expected[k][1:] != actual[k][1:] for k in both),
+    }
+
+
+def restore(conn):
+    conn.execute("DELETE FROM public.subjects_bundle")
+    conn.execute("INSERT INTO public.subjects_bundle SELECT * FROM bench_bundle_base")
+    conn.execute("VACUUM ANALYZE public.pyq, public.subjects_bundle")
+
+
+def bench(dsn, sizes, base_rows, workers):
+    try:
+        import psycopg
+        from psycopg.types.json import Jsonb
+    except ImportError:
+        sys.exit("❌ bench needs psycopg: pip install -e 'automation_scripts[postgres]'")
+    from index_advisor import load_schema, seed, columns_of
+
+    rng = random.Random(1337)
+    results = []
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        print(f"🐘 {conn.execute('SHOW server_version').fetchone()[0]}")
+        if conn.execute("SELECT to_regclass('public.pyq')").fetchone()[0]:
+            sys.exit("❌ public.pyq already exists - point --dsn at an empty scratch database")
+        _, failed = load_schema(conn)
+        if MIGRATION.name in failed or "rename_to_subjects_bundle.sql" in failed:
+            sys.exit("❌ The subjects_bundle schema didn't load")
+        seed(conn, base_rows, 0, False, rng)
+        # Seeded bundle rows without content would be pruned by the rebuild but kept by the trigger
+        conn.execute("SELECT * FROM public.rebuild_subjects_bundle(NULL, true)")
+        conn.execute("DROP TABLE IF EXISTS bench_bundle_base")
+        conn.execute("CREATE TABLE bench_bundle_base AS SELECT * FROM public.subjects_bundle")
+        subjects = conn.execute("SELECT department, semester, subject, paper_code FROM public.subjects_bundle").fetchall()
+        pyq_columns = columns_of(conn, "public", "pyq")
+
+        for n in sizes:
+            rows = import_rows(subjects, n, rng)
+            departments = sorted({r["department"] for r in rows})
+            cols = ", ".join(c for c in rows[0] if c in pyq_columns)
+            insert_sql = (f"INSERT INTO public.pyq ({cols}) SELECT {cols} "
+                          f"FROM jsonb_populate_recordset(NULL::public.pyq, %s)")
+            delete_sql = "DELETE FROM public.pyq WHERE id = ANY(%s::uuid[])"
+            inserts = [(Jsonb(rows[i:i + INSERT_BATCH]),) for i in range(0, n, INSERT_BATCH)]
+            deletes = [([r["id"] for r in rows[i:i + DELETE_BATCH]],) for i in range(0, n, DELETE_BATCH)]
+            print(f"\n⏱  {n} rows, {len(departments)} departments, {workers} workers")
+
+            # Per-row sync: the reference state
+            t_import, dl_import = run_batches(dsn, insert_sql, inserts, workers, bulk=False)
+            after_import = snapshot(conn)
+            t_delete, dl_delete = run_batches(dsn, delete_sql, deletes, workers, bulk=False)
+            after_delete = snapshot(conn)
+            restore(conn)
+            per_row = {"import": t_import, "delete": t_delete, "deadlocks": dl_import + dl_delete}
+            print(f"  per-row  import {t_import:.1f}s, delete {t_delete:.1f}s, {per_row['deadlocks']} deadlocks")
+
+            # Bulk mode + one rebuild
+            t_import, _ = run_batches(dsn, insert_sql, inserts, workers, bulk=True)
+            t_rebuild = sql_rebuild(conn, departments, False)
+            diff_import = compare(after_import, snapshot(conn))
+            t_delete, _ = run_batches(dsn, delete_sql, deletes, workers, bulk=True)
+            t_prune = sql_rebuild(conn, departments, True)
+            diff_delete = compare(after_delete, snapshot(conn))
+            missing = conn.execute("SELECT missing FROM public.verify_subjects_bundle(%s)", (departments,)).fetchone()[0]
+            restore(conn)
+            bulk = {"import": t_import, "rebuild": t_rebuild, "delete": t_delete, "prune": t_prune}
+            print(f"  bulk     import {t_import:.1f}s + rebuild {t_rebuild:.2f}s, "
+                  f"delete {t_delete:.1f}s + prune {t_prune:.2f}s")
+            results.append((n, per_row, bulk, diff_import, diff_delete, missing))
+        conn.execute("DROP TABLE IF EXISTS bench_bundle_base")
+
+    print(f"\n{'rows':>7} {'import per-row':>15} {'bulk+rebuild':>13} {'x':>6} "
+          f"{'delete per-row':>15} {'bulk+prune':>11} {'x':>6} {'deadlocks':>10}")
+    ok = True
+    for n, per_row, bulk, diff_import, diff_delete, missing in results:
+        b_import, b_delete = bulk["import"] + bulk["rebuild"], bulk["delete"] + bulk["prune"]
+        print(f"{n:>7} {per_row['import']:>14.1f}s {b_import:>12.1f}s {per_row['import'] / b_import:>5.1f}x "
+              f"{per_row['delete']:>14.1f}s {b_delete:>10.1f}s {per_row['delete'] / b_delete:>5.1f}x "
+              f"{per_row['deadlocks']:>10}")
+        for phase, diff in (("import", diff_import), ("delete", diff_delete)):
+            if diff["missing"] or diff["extra"] or diff["other"] or missing:
+                ok = False
+                print(f"  ❌ {n} rows, after {phase}: {diff['missing']} keys missing, {diff['extra']} extra, "
+                      f"{diff['other']} with other columns changed, {missing} content keys unbundled")
+            elif diff["paper_code"]:
+                print(f"  ℹ {n} rows, after {phase}: same keys; paper_code differs on {diff['paper_code']} "
+                      f"(per-row: last row written wins, NULL included)")
+    print("\n✅ Rebuilt table matches the trigger-maintained one" if ok else "\n❌ Rebuild diverged, see above")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Set-based subjects_bundle rebuild for bulk imports.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("rebuild", help="Rebuild subjects_bundle from syllabus/pyq/notes, then verify")
+    p.add_argument("--dept", nargs="+", help="Only these departments (default: all)")
+    p.add_argument("--prune", action="store_true", help="Also delete rows no content backs")
+    p = sub.add_parser("verify", help="Check every subject with content has a subjects_bundle row")
+    p.add_argument("--dept", nargs="+")
+    p = sub.add_parser("bench", help="Per-row sync vs bulk mode on a local Postgres")
+    p.add_argument("--dsn", required=True, help="Connection string of an EMPTY scratch database")
+    p.add_argument("--rows", type=int, nargs="+", default=BENCH_SIZES, help="Import sizes")
+    p.add_argument("--base-rows", type=int, default=BASE_ROWS, help="Rows per content table before the import")
+    p.add_argument("--workers", type=int, default=WORKERS, help="Concurrent uploader connections")
+    args = parser.parse_args()
+
+    start_run(f"bulk_load_{args.command}")
+    if args.command == "bench":
+        sys.exit(0 if bench(args.dsn, args.rows, args.base_rows, args.workers) else 1)
+    if args.command == "rebuild" and rebuild(args.dept, args.prune) is None:
+        sys.exit(1)
+    result = verify(args.dept)
+    sys.exit(0 if result and not result["missing"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Persistent inventory of the local PYQ tree (`PYQ questions/Departments`).
+
+Layout on disk is  <DEPT>/<SEMn>/<Subject>/<Subject>-<year>.pdf  and every PDF
+is recorded with its parsed dept/sem/subject/year, size, mtime and (lazily)
+its SHA-256.
+
+Refreshing is incremental: directories are walked in parallel with
+os.scandir, and a directory is only re-listed when its own mtime changed
+(an entry was added, removed or renamed). Files whose size/mtime changed lose
+their hash so it is recomputed on demand. Editing a PDF in place does not
+touch its directory's mtime - use --full after doing that.
+
+    python corpus_inventory.py            # refresh
+    python corpus_inventory.py --full     # re-list every directory
+    python corpus_inventory.py --hash     # refresh + fill in missing hashes
+"""
+
+import os
+import re
+import sqlite3
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from stream_upload import hash_file
+
+# --- CONFIG ---
+BASE_DIR = Path("/Users/ankurbag/Documents/GitHub/Makaut_Scholar/PYQ questions/Departments")
+INVENTORY_PATH = Path(__file__).parent / "corpus_inventory.sqlite3"
+WORKERS = 8
+
+
+def connect(path=INVENTORY_PATH):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS dirs (
+            path     TEXT PRIMARY KEY,     -- relative to BASE_DIR, '' for the root
+            parent   TEXT,
+            name     TEXT NOT NULL,
+            depth    INTEGER NOT NULL,     -- 1 = dept, 2 = semester, 3 = subject
+            mtime_ns INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_dirs_parent ON dirs (parent);
+
+        CREATE TABLE IF NOT EXISTS files (
+            path     TEXT PRIMARY KEY,
+            parent   TEXT NOT NULL,
+            name     TEXT NOT NULL,
+            dept     TEXT,
+            sem_dir  TEXT,
+            sem      INTEGER,
+            subject  TEXT,
+            year     TEXT,
+            size     INTEGER,
+            mtime_ns INTEGER,
+            sha256   TEXT                  -- NULL until hashed / after a change
+        );
+        CREATE INDEX IF NOT EXISTS idx_files_parent ON files (parent);
+        CREATE INDEX IF NOT EXISTS idx_files_lookup ON files (dept, sem, subject);
+        CREATE INDEX IF NOT EXISTS idx_files_sha256 ON files (sha256);
+    """)
+    return conn
+
+
+def parse_attributes(rel_path):
+    """dept / sem_dir / sem / subject / year from a DEPT/SEMn/Subject/file.pdf path."""
+    parts = rel_path.split("/")
+    attrs = {"dept": None, "sem_dir": None, "sem": None, "subject": None, "year": None}
+    if len(parts) != 4:
+        return attrs
+    attrs["dept"], attrs["sem_dir"], attrs["subject"] = parts[:3]
+    m = re.match(r'SEM(\d)', parts[1])
+    if m:
+        attrs["sem"] = int(m.group(1))
+    # Parse year from filename: Subject_Name-2023.pdf
+    year_match = re.search(r'-(\d{4})\.pdf$', parts[3])
+    attrs["year"] = year_match.group(1) if year_match else "Unknown"
+    return attrs
+
+
+def scan_dir(rel, known_mtime, force):
+    """Runs in a worker thread. Returns (rel, mtime_ns, listing) - listing is None when the
+    directory is unchanged, or None mtime when it no longer exists."""
+    abs_path = BASE_DIR / rel if rel else BASE_DIR
+    try:
+        mtime = os.stat(abs_path).st_mtime_ns
+    except FileNotFoundError:
+        return rel, None, None
+    if not force and mtime == known_mtime:
+        return rel, mtime, None
+
+    subdirs, files = [], []
+    with os.scandir(abs_path) as it:
+        for entry in it:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.name)
+            elif entry.name.lower().endswith(".pdf") and entry.is_file():
+                st = entry.stat()
+                files.append((entry.name, st.st_size, st.st_mtime_ns))
+    return rel, mtime, (subdirs, files)
+
+
+def _join(parent, name):
+    return f"{parent}/{name}" if parent else name
+
+
+def _apply_listing(conn, rel, subdirs, files, stats):
+    stored = {r["name"]: r for r in conn.execute("SELECT name, size, mtime_ns FROM files WHERE parent = ?", (rel,))}
+    for name, size, mtime in files:
+        old = stored.pop(name, None)
+        if old and old["size"] == size and old["mtime_ns"] == mtime:
+            continue
+        path = _join(rel, name)
+        attrs = parse_attributes(path)
+        conn.execute(
+            """INSERT OR REPLACE INTO files (path, parent, name, dept, sem_dir, sem, subject, year, size, mtime_ns, sha256)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, NULL)""",
+            (path, rel, name, attrs["dept"], attrs["sem_dir"], attrs["sem"], attrs["subject"], attrs["year"], size, mtime),
+        )
+        stats["changed" if old else "added"] += 1
+    for name in stored:
+        conn.execute("DELETE FROM files WHERE path = ?", (_join(rel, name),))
+        stats["removed"] += 1
+
+    depth = rel.count("/") + 2 if rel else 1
+    for name in subdirs:
+        conn.execute(
+            "INSERT OR IGNORE INTO dirs (path, parent, name, depth, mtime_ns) VALUES (?, ?, ?, ?, NULL)",
+            (_join(rel, name), rel, name, depth),
+        )
+
+
+def refresh(conn=None, full=False, workers=WORKERS):
+    """Bring the inventory up to date with BASE_DIR. Returns counts of file changes."""
+    conn = conn or connect()
+    known = {r["path"]: r["mtime_ns"] for r in conn.execute("SELECT path, mtime_ns FROM dirs")}
+    conn.execute("INSERT OR IGNORE INTO dirs (path, parent, name, depth) VALUES ('', NULL, '', 0)")
+    stats = {"dirs": 0, "rescanned": 0, "added": 0, "changed": 0, "removed": 0}
+    seen = set()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frontier = [""]
+        pending = {}
+        while frontier or pending:
+            while frontier and len(pending) < workers * 2:
+                rel = frontier.pop()
+                pending[pool.submit(scan_dir, rel, known.get(rel), full)] = rel
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                del pending[fut]
+                rel, mtime, listing = fut.result()
+                if mtime is None:
+                    continue  # vanished; pruned below
+                seen.add(rel)
+                stats["dirs"] += 1
+                if listing is None:
+                    children = [r["path"] for r in conn.execute("SELECT path FROM dirs WHERE parent = ?", (rel,))]
+                else:
+                    stats["rescanned"] += 1
+                    subdirs, files = listing
+                    _apply_listing(conn, rel, subdirs, files, stats)
+                    conn.execute("UPDATE dirs SET mtime_ns = ? WHERE path = ?", (mtime, rel))
+                    children = [_join(rel, d) for d in subdirs]
+                frontier.extend(children)
+
+    # Directories that disappeared (and everything recorded under them)
+    gone = [p for (p,) in conn.execute("SELECT path FROM dirs") if p not in seen]
+    for path in gone:
+        conn.execute("DELETE FROM dirs WHERE path = ?", (path,))
+        stats["removed"] += conn.execute("DELETE FROM files WHERE parent = ?", (path,)).rowcount
+    conn.commit()
+    return stats
+
+
+def ensure_hashes(conn, where="1=1", params=(), workers=WORKERS):
+    """Hash every file matching `where` that has no hash yet. Returns how many were hashed."""
+    rows = conn.execute(f"SELECT path FROM files WHERE sha256 IS NULL AND ({where})", params).fetchall()
+    paths = [r["path"] for r in rows]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for path, (sha256, _) in zip(paths, pool.map(lambda p: hash_file(BASE_DIR / p), paths)):
+            conn.execute("UPDATE files SET sha256 = ? WHERE path = ?", (sha256, path))
+    conn.commit()
+    return len(paths)
+
+
+def files(conn, depts=None, sem=None, subject=None):
+    """Inventory rows for PDFs in the standard DEPT/SEMn/Subject layout."""
+    sql = "SELECT * FROM files WHERE sem IS NOT NULL"
+    params = []
+    if depts:
+        sql += f" AND dept IN ({','.join('?' for _ in depts)})"
+        params.extend(depts)
+    if sem is not None:
+        sql += " AND sem = ?"
+        params.append(sem)
+    if subject is not None:
+        sql += " AND subject = ?"
+        params.append(subject)
+    return conn.execute(sql + " ORDER BY path", params).fetchall()
+
+
+def dirs(conn, depth, parent=None):
+    """Directory rows at a given depth (1 dept, 2 semester, 3 subject)."""
+    if parent is None:
+        return conn.execute("SELECT * FROM dirs WHERE depth = ? ORDER BY path", (depth,)).fetchall()
+    return conn.execute("SELECT * FROM dirs WHERE depth = ? AND parent = ? ORDER BY path", (depth, parent)).fetchall()
+
+
+def open_inventory(full=False):
+    """Connect and refresh in one go - what the other scripts call before querying."""
+    conn = connect()
+    stats = refresh(conn, full=full)
+    print(f"Inventory: {stats['dirs']} dirs ({stats['rescanned']} re-listed), "
+          f"+{stats['added']} ~{stats['changed']} -{stats['removed']} files")
+    return conn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the local PYQ corpus inventory.")
+    parser.add_argument("--full", action="store_true", help="Re-list every directory, not just changed ones")
+    parser.add_argument("--hash", action="store_true", help="Compute missing SHA-256 hashes")
+    args = parser.parse_args()
+
+    conn = open_inventory(full=args.full)
+    if args.hash:
+        print(f"Hashed {ensure_hashes(conn)} files.")
+
+    for row in conn.execute("SELECT dept, COUNT(*) AS n, SUM(size) AS bytes FROM files GROUP BY dept ORDER BY dept"):
+        print(f"  {row['dept'] or '(other)':<8} {row['n']:>6} PDFs  {(row['bytes'] or 0) / 1024 / 1024:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Crawl, upload and verification as queued jobs that any number of workers can run.
+
+Job kinds (see job_queue.py for leasing / retries):
+
+    link      scrape one department page + the root page, enqueue a download per paper
+    download  fetch one PDF, match it (PDF text fallback if needed), save it;
+              with --upload, enqueue an upload for the saved file
+    upload    upload one local PDF to storage and insert its pyq row
+    verify    download one pyq PDF and compare its subject with the table's
+
+Coordinator and workers only share the queue file (JOB_QUEUE, e.g. on a shared
+volume) - and for download/upload jobs, the PYQ directory.
+
+    python crawl_queue.py enqueue crawl --dept ECE IT --upload
+    python crawl_queue.py enqueue verify
+    python crawl_queue.py worker --threads 8                 # on every machine
+    python crawl_queue.py worker --kinds verify --exit-when-idle
+    python crawl_queue.py status
+    python crawl_queue.py report verify                      # -> ocr_verification_results.json
+    python crawl_queue.py requeue-dead
+"""
+
+import time
+import argparse
+import threading
+
+from job_queue import (QUEUE_PATH, VISIBILITY, connect, enqueue, enqueue_many, requeue_dead,
+                       results, run_worker, stats)
+from metrics import start_run
+
+DEPARTMENTS = ["ECE", "IT", "ME", "EE", "CE"]   # smart_download_pyqs.DEPARTMENTS
+
+_syllabus = {}
+_syllabus_lock = threading.Lock()
+
+
+def syllabus_map():
+    """The syllabus match map, fetched once per worker process."""
+    with _syllabus_lock:
+        if "map" not in _syllabus:
+            import smart_download_pyqs as smart
+            syll_match_map = smart.get_syllabus_subjects()
+            if not syll_match_map:
+                raise RuntimeError("Syllabus data could not be fetched")
+            _syllabus["map"] = syll_match_map
+        return _syllabus["map"]
+
+
+# --- HANDLERS ---
+
+def handle_link(payload, conn):
+    import smart_download_pyqs as smart
+    dept = payload["dept"]
+    papers = smart.department_papers(dept, smart.URL_MAP[dept])
+    added = enqueue_many(conn, [
+        ("download",
+         {"dept": dept, "pdf_url": pdf_url, "sem": sem, "year": year, "scraped_name": name, "upload": payload.get("upload", False)},
+         f"download:{dept}:{pdf_url}")
+        for pdf_url, sem, year, name in papers
+    ])
+    print(f"  {dept}: {len(papers)} papers, {added} new download jobs")
+    return {"papers": len(papers), "enqueued": added}
+
+
+def handle_download(payload, conn):
+    import smart_download_pyqs as smart
+    path = smart.download_and_verify(payload["pdf_url"], payload["dept"], payload["sem"], payload["year"],
+                                     payload["scraped_name"], syllabus_map(), raise_errors=True)
+    if not path:
+        return {"saved": False}
+    rel = path.relative_to(smart.BASE_DIR).as_posix()
+    if payload.get("upload"):
+        enqueue(conn, "upload", {"path": rel}, key=f"upload:{rel}")
+    return {"saved": True, "path": rel}
+
+
+def handle_upload(payload, conn):
+    import upload_pyqs_to_supabase as upload
+    from corpus_inventory import parse_attributes
+    rel = payload["path"]
+    a = parse_attributes(rel)
+    if a["sem"] is None:
+        return {"skipped": "not in DEPT/SEMn/Subject layout"}
+    if upload.record_exists(a["dept"], a["sem"], a["subject"], a["year"]):
+        return {"skipped": "exists"}
+    file_url, content_hash, file_size = upload.upload_file(upload.BASE_DIR / rel, rel)
+    if not file_url:
+        raise RuntimeError(f"upload failed for {rel}")
+    if not upload.insert_metadata(a["dept"], a["sem"], a["subject"], a["year"], file_url, content_hash, file_size):
+        raise RuntimeError(f"metadata insert failed for {rel}")
+    return {"uploaded": rel}
+
+
+def handle_verify(payload, conn):
+    import pdf_metadata_verifier as verifier
+    return verifier.verify_subject(payload["dept"], payload["subject"], payload["url"], raise_errors=True)
+
+
+HANDLERS = {
+    "link": handle_link,
+    "download": handle_download,
+    "upload": handle_upload,
+    "verify": handle_verify,
+}
+
+
+# --- COORDINATOR ---
+
+def enqueue_crawl(conn, depts, upload, tag):
+    # The tag (a date by default) lets the same department be crawled again on a later run;
+    # download jobs are keyed by URL, so papers already fetched aren't queued twice.
+    return enqueue_many(conn, [("link", {"dept": d, "upload": upload}, f"link:{d}:{tag}") for d in depts])
+
+
+def enqueue_uploads(conn, depts):
+    import upload_pyqs_to_supabase as upload
+    from corpus_inventory import open_inventory, files
+    existing = upload.get_existing_records()
+    rows = [r for r in files(open_inventory(), depts=depts)
+            if (r['dept'], r['sem'], r['subject'], r['year']) not in existing]
+    return enqueue_many(conn, [("upload", {"path": r['path']}, f"upload:{r['path']}") for r in rows])
+
+
+def enqueue_verify(conn, limit):
+    import pdf_metadata_verifier as verifier
+    unique_pyqs = verifier.unique_subjects(verifier.get_data("pyq", "department,subject,file_url"))
+    items = list(unique_pyqs.items())[:limit] if limit else unique_pyqs.items()
+    return enqueue_many(conn, [
+        ("verify", {"dept": dept, "subject": subject, "url": url}, f"verify:{dept}:{subject}:{url}")
+        for (dept, subject), url in items
+    ])
+
+
+def print_status(conn):
+    table = stats(conn)
+    columns = ["queued", "leased", "expired", "done", "dead"]
+    print(f"{'Kind':<10} " + " ".join(f"{c:>8}" for c in columns))
+    for kind in sorted(table):
+        print(f"{kind:<10} " + " ".join(f"{table[kind].get(c, 0):>8}" for c in columns))
+    for row in conn.execute("SELECT kind, key, attempts, error FROM jobs WHERE status = 'dead' ORDER BY updated_at DESC LIMIT 10"):
+        print(f"  dead {row['kind']} {row['key']} ({row['attempts']} attempts): {(row['error'] or '')[:120]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queue-based crawl / upload / verification.")
+    parser.add_argument("--queue", default=str(QUEUE_PATH), help="Queue database (default: $JOB_QUEUE or job_queue.sqlite3)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    enq = sub.add_parser("enqueue", help="Add jobs")
+    enq.add_argument("what", choices=["crawl", "upload", "verify"])
+    enq.add_argument("--dept", nargs="+", help="Departments (crawl: default all; upload: default all)")
+    enq.add_argument("--upload", action="store_true", help="crawl: upload every saved PDF as well")
+    enq.add_argument("--tag", default=time.strftime("%Y-%m-%d"), help="crawl: run tag, one crawl per tag")
+    enq.add_argument("--limit", type=int, help="verify: only the first N subjects")
+
+    work = sub.add_parser("worker", help="Run jobs")
+    work.add_argument("--kinds", nargs="+", choices=list(HANDLERS), help="Job kinds to take (default: all)")
+    work.add_argument("--threads", type=int, default=4)
+    work.add_argument("--visibility", type=int, default=VISIBILITY, help="Lease length in seconds")
+    work.add_argument("--exit-when-idle", action="store_true", help="Stop once nothing is queued or leased")
+
+    sub.add_parser("status", help="Job counts by kind and status")
+    rq = sub.add_parser("requeue-dead", help="Give dead jobs a fresh set of attempts")
+    rq.add_argument("--kinds", nargs="+", choices=list(HANDLERS))
+    rep = sub.add_parser("report", help="Collect finished results")
+    rep.add_argument("what", choices=["verify"])
+    args = parser.parse_args()
+
+    conn = connect(args.queue)
+
+    if args.cmd == "enqueue":
+        if args.what == "crawl":
+            depts = args.dept or DEPARTMENTS
+            unknown = set(depts) - set(DEPARTMENTS)
+            if unknown:
+                parser.error(f"unknown department(s): {', '.join(sorted(unknown))}")
+            added = enqueue_crawl(conn, depts, args.upload, args.tag)
+        elif args.what == "upload":
+            added = enqueue_uploads(conn, args.dept)
+        else:
+            added = enqueue_verify(conn, args.limit)
+        print(f"✅ {added} new {args.what} job(s) in {args.queue}")
+
+    elif args.cmd == "worker":
+        start_run("crawl_worker")
+        threads = [
+            # Daemon threads: on Ctrl-C the process just exits and unfinished leases expire
+            threading.Thread(target=run_worker, args=(HANDLERS, args.queue, i, args.kinds, args.visibility, args.exit_when_idle),
+                             daemon=True)
+            for i in range(args.threads)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        print_status(conn)
+
+    elif args.cmd == "status":
+        print_status(conn)
+
+    elif args.cmd == "requeue-dead":
+        print(f"Requeued {requeue_dead(conn, args.kinds)} dead job(s).")
+
+    elif args.cmd == "report":
+        import pdf_metadata_verifier as verifier
+        verifier.write_report([r for r in results(conn, "verify") if r])
+
+
+if __name__ == "__main__":
+    main()
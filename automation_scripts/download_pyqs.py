@@ -5,6 +5,9 @@ import subprocess
 import difflib
 from pathlib import Path
 
+from http_fixtures import stub_url
+from metrics import count, timer, start_run
+
 # --- CONFIG ---
 BASE_DIR = Path("/Users/ankurbag/Documents/GitHub/Makaut_Scholar/PYQ questions/Departments")
 DEPARTMENTS = ["IT", "ECE", "EE", "ME", "CE"]
@@ -60,21 +63,25 @@ def merge_similar_subjects(subjects_dict):
 
 def download_file(url, target_path):
     if target_path.exists():
+        count("papers", outcome="exists")
         return True
     
     target_path.parent.mkdir(parents=True, exist_ok=True)
     print(f"Downloading {url} to {target_path}")
     try:
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(req) as response, open(target_path, 'wb') as out_file:
+        req = urllib.request.Request(stub_url(url), headers={'User-Agent': 'Mozilla/5.0'})
+        with timer("http_request", target="makaut", op="pdf"), urllib.request.urlopen(req) as response, open(target_path, 'wb') as out_file:
             out_file.write(response.read())
+        count("papers", outcome="saved")
         return True
     except Exception as e:
         print(f"Error downloading {url}: {e}")
+        count("papers", outcome="download_failed")
         return False
 
+@timer("http_request", target="makaut", op="page")
 def get_html(url):
-    cmd = ['curl', '-sL', '--resolve', 'www.makaut.com:443:104.21.14.240', url]
+    cmd = ['curl', '-sL', '--resolve', 'www.makaut.com:443:104.21.14.240', stub_url(url)]
     res = subprocess.run(cmd, capture_output=True, text=True)
     return res.stdout
 
@@ -162,6 +169,8 @@ def scrape_ece_sem_8():
     return final_merged
 
 def main():
+    start_run("download_pyqs")
+
     # 1. Sem 1 & 2
     sem12_data = scrape_sem_1_2()
     for sem in ["1", "2"]:
@@ -2,13 +2,15 @@ import urllib.request
 import re
 import json
 
+from http_fixtures import stub_url
+
 departments = ['cse', 'it', 'ec', 'ee', 'me', 'ce']
 all_subjects = {}
 
 for dept in departments:
     try:
         url = f"https://www.makaut.com/btech-{dept}-question-papers.html"
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+        req = urllib.request.Request(stub_url(url), headers={'User-Agent': 'Mozilla/5.0'})
         html = urllib.request.urlopen(req).read().decode('utf-8')
         
         dept_subs = {str(i): set() for i in range(1, 9)}
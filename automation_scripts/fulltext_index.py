@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""Per-page full-text index (SQLite FTS5) over every PYQ and syllabus PDF.
+
+Documents are keyed by content hash: a PDF is extracted once no matter how
+many rows point at it, and a rebuild only extracts hashes the index hasn't
+seen. Rows are re-read from the tables on every build (cheap), so moved,
+renamed or deleted rows are reflected without touching the page text, and
+documents no row references any more are dropped.
+
+Text is pulled with PyMuPDF in a process pool; PYQs are read from the local
+tree when present, everything else is downloaded from storage. Scanned papers
+without a text layer are indexed with empty pages and listed by `stats`.
+
+    python fulltext_index.py build                 # incremental
+    python fulltext_index.py build --tables pyq --limit 100
+    python fulltext_index.py search "page replacement" --dept CSE
+    python fulltext_index.py stats
+    python fulltext_index.py export fulltext.sqlite3   # compact copy to ship
+"""
+
+import os
+import re
+import time
+import hashlib
+import sqlite3
+import argparse
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from supabase_client import supabase
+from supabase_mirror import fetch_pages
+from corpus_inventory import BASE_DIR
+from metrics import count, observe, start_run
+
+INDEX_PATH = Path(__file__).parent / "fulltext_index.sqlite3"
+
+# table -> (bucket, columns, label column)
+SOURCES = {
+    "pyq": ("pyqs_pdf", "id,department,semester,subject,year,file_url,content_hash", "year"),
+    "syllabus": ("syllabus_pdf", "id,department,semester,subject,title,file_url,content_hash", "title"),
+}
+LOCAL_ROOTS = {"pyqs_pdf": BASE_DIR}   # buckets mirrored on disk, read instead of downloaded
+
+WORKERS = os.cpu_count() or 4
+COMMIT_EVERY = 50
+
+
+def connect(path=INDEX_PATH):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS documents (
+            content_hash TEXT PRIMARY KEY,
+            size         INTEGER,
+            page_count   INTEGER,
+            text_pages   INTEGER,              -- pages with any text; 0 = scanned, needs OCR
+            indexed_at   REAL
+        );
+
+        -- Rows pointing at a document (several rows may share one PDF)
+        CREATE TABLE IF NOT EXISTS sources (
+            table_name   TEXT NOT NULL,
+            row_id       TEXT NOT NULL,
+            content_hash TEXT,                 -- NULL until the PDF was hashed
+            department   TEXT,
+            semester     INTEGER,
+            subject      TEXT,
+            label        TEXT,                 -- pyq year / syllabus title
+            file_url     TEXT,
+            PRIMARY KEY (table_name, row_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_sources_hash ON sources (content_hash);
+        CREATE INDEX IF NOT EXISTS idx_sources_dept ON sources (department, semester);
+
+        CREATE TABLE IF NOT EXISTS pages (
+            id           INTEGER PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            page         INTEGER NOT NULL,     -- 1-based
+            text         TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_pages_hash ON pages (content_hash, page);
+
+        -- External-content FTS over pages.text, kept in sync by triggers
+        CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+            text, content='pages', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        );
+        CREATE TRIGGER IF NOT EXISTS pages_ai AFTER INSERT ON pages BEGIN
+            INSERT INTO pages_fts (rowid, text) VALUES (new.id, new.text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS pages_ad AFTER DELETE ON pages BEGIN
+            INSERT INTO pages_fts (pages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        END;
+    """)
+    return conn
+
+
+# --- EXTRACTION (runs in the worker processes) ---
+
+def normalize(text):
+    # Collapse the layout whitespace PyMuPDF keeps; lines stay separated
+    lines = (re.sub(r'[ \t ]+', ' ', l).strip() for l in text.splitlines())
+    return "\n".join(l for l in lines if l)
+
+
+def extract_pages(task):
+    """task: (url, local_path or None). Returns sha256/size and the text of every page - or an error."""
+    import fitz  # PyMuPDF, imported on first use
+    url, local_path = task
+    start = time.perf_counter()
+    try:
+        if local_path:
+            data = Path(local_path).read_bytes()
+        else:
+            resp = supabase.download(url, op="pdf")
+            if resp.status_code != 200:
+                return {"error": f"download failed: {resp.status_code}"}
+            data = resp.content
+        doc = fitz.open(stream=data, filetype="pdf")
+        pages = [normalize(page.get_text("text")) for page in doc]
+        return {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data), "pages": pages,
+                "seconds": time.perf_counter() - start}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+# --- BUILD ---
+
+def sync_sources(conn, tables):
+    """Replace the source rows of `tables` with the tables' current rows.
+    Hashes learned by earlier builds are kept for rows whose file_url didn't change."""
+    for table in tables:
+        bucket, columns, label = SOURCES[table]
+        known = {(r["row_id"], r["file_url"]): r["content_hash"]
+                 for r in conn.execute("SELECT row_id, file_url, content_hash FROM sources WHERE table_name = ?", (table,))}
+        rows = [row for page in fetch_pages(table, f"select={columns}&order=id.asc") for row in page]
+        conn.execute("DELETE FROM sources WHERE table_name = ?", (table,))
+        conn.executemany(
+            "INSERT INTO sources (table_name, row_id, content_hash, department, semester, subject, label, file_url) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(table, str(r["id"]), r.get("content_hash") or known.get((str(r["id"]), r.get("file_url"))),
+              r.get("department"), r.get("semester"), r.get("subject"), r.get(label), r.get("file_url"))
+             for r in rows],
+        )
+        print(f"  {table}: {len(rows)} rows")
+    conn.commit()
+
+
+def pending_documents(conn, tables):
+    """One job per document not yet indexed: known hashes once, unhashed rows once per file_url."""
+    jobs = {}
+    sql = f"""SELECT s.table_name, s.row_id, s.content_hash, s.file_url FROM sources s
+              LEFT JOIN documents d ON d.content_hash = s.content_hash
+              WHERE d.content_hash IS NULL AND s.table_name IN ({','.join('?' for _ in tables)})"""
+    for r in conn.execute(sql, tables):
+        bucket = SOURCES[r["table_name"]][0]
+        path = supabase.object_path(bucket, r["file_url"])
+        if path is None:
+            continue
+        job = jobs.setdefault(r["content_hash"] or r["file_url"], {"url": r["file_url"], "bucket": bucket, "path": path, "rows": []})
+        job["rows"].append((r["table_name"], r["row_id"]))
+    return list(jobs.values())
+
+
+def store(conn, job, result):
+    sha256, pages = result["sha256"], result["pages"]
+    conn.executemany("UPDATE sources SET content_hash = ? WHERE table_name = ? AND row_id = ?",
+                     [(sha256, t, i) for t, i in job["rows"]])
+    if conn.execute("SELECT 1 FROM documents WHERE content_hash = ?", (sha256,)).fetchone():
+        return False  # another row's file turned out to be the same bytes
+    conn.executemany("INSERT INTO pages (content_hash, page, text) VALUES (?, ?, ?)",
+                     [(sha256, n, text) for n, text in enumerate(pages, 1)])
+    conn.execute("INSERT INTO documents (content_hash, size, page_count, text_pages, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                 (sha256, result["size"], len(pages), sum(1 for t in pages if t), time.time()))
+    return True
+
+
+def prune(conn):
+    """Drop documents (and their pages) that no source row references any more."""
+    gone = [r[0] for r in conn.execute(
+        "SELECT content_hash FROM documents WHERE content_hash NOT IN (SELECT content_hash FROM sources WHERE content_hash IS NOT NULL)")]
+    for h in gone:
+        conn.execute("DELETE FROM pages WHERE content_hash = ?", (h,))
+        conn.execute("DELETE FROM documents WHERE content_hash = ?", (h,))
+    conn.commit()
+    return len(gone)
+
+
+def build(conn, tables, workers=WORKERS, limit=None):
+    start_run("fulltext_index")
+    print("Syncing source rows...")
+    sync_sources(conn, tables)
+    jobs = pending_documents(conn, tables)
+    if limit:
+        jobs = jobs[:limit]
+    print(f"{len(jobs)} documents to extract")
+
+    indexed = failed = 0
+    # spawn, not fork: children must not inherit the parent's pooled HTTP connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {}
+        for job in jobs:
+            local_root = LOCAL_ROOTS.get(job["bucket"])
+            local = local_root / job["path"] if local_root else None
+            futures[pool.submit(extract_pages, (job["url"], str(local) if local and local.is_file() else None))] = job
+        for fut in as_completed(futures):
+            job, result = futures[fut], fut.result()
+            if "error" in result:
+                failed += 1
+                count("fulltext_documents", outcome="failed")
+                print(f"  ❌ {job['path']}: {result['error']}")
+                continue
+            observe("fulltext_extract_seconds", result["seconds"])
+            if store(conn, job, result):
+                indexed += 1
+                count("fulltext_documents", outcome="indexed")
+                count("fulltext_pages", len(result["pages"]))
+            if (indexed + failed) % COMMIT_EVERY == 0:
+                conn.commit()
+                print(f"  {indexed + failed}/{len(jobs)}")
+    conn.commit()
+
+    removed = prune(conn)
+    conn.execute("INSERT INTO pages_fts (pages_fts) VALUES ('optimize')")
+    conn.commit()
+    print(f"✅ Indexed {indexed} documents ({failed} failed), removed {removed} unreferenced.")
+
+
+# --- QUERY ---
+
+def fts_query(text):
+    """Plain words -> an AND of quoted tokens, so user input can't break FTS syntax.
+    A trailing * keeps prefix matching for the last word."""
+    words = re.findall(r'\w+\*?', text)
+    return " ".join(f'"{w.rstrip("*")}"' + ("*" if w.endswith("*") else "") for w in words)
+
+
+def search(conn, text, dept=None, table=None, limit=10, raw=False):
+    filters, params = [], [text if raw else fts_query(text)]
+    if dept:
+        filters.append("s.department = ?")
+        params.append(dept)
+    if table:
+        filters.append("s.table_name = ?")
+        params.append(table)
+    where = "".join(f" AND {f}" for f in filters)
+    # Rank in FTS first (bm25/snippet need the bare MATCH query), then attach rows;
+    # rows sharing a document are collapsed onto one hit per page
+    return conn.execute(f"""
+        WITH hits AS MATERIALIZED (
+            SELECT rowid AS id, bm25(pages_fts) AS score,
+                   snippet(pages_fts, 0, '[', ']', ' … ', 12) AS snippet
+            FROM pages_fts WHERE pages_fts MATCH ?
+        )
+        SELECT p.content_hash, p.page, h.score, h.snippet,
+               s.table_name, s.department, s.semester, s.subject, s.label, s.file_url
+        FROM hits h
+        JOIN pages p ON p.id = h.id
+        JOIN sources s ON s.content_hash = p.content_hash
+        WHERE 1 = 1{where}
+        GROUP BY p.id
+        ORDER BY h.score
+        LIMIT ?
+    """, (*params, limit)).fetchall()
+
+
+def print_stats(conn):
+    docs = conn.execute("SELECT COUNT(*) AS n, COALESCE(SUM(page_count), 0) AS pages, "
+                        "COALESCE(SUM(text_pages), 0) AS text_pages, SUM(text_pages = 0) AS scanned FROM documents").fetchone()
+    print(f"Documents: {docs['n']}  pages: {docs['pages']}  with text: {docs['text_pages']}  "
+          f"scanned (no text layer): {docs['scanned'] or 0}")
+    for r in conn.execute("SELECT table_name, COUNT(*) AS n, COUNT(content_hash) AS hashed FROM sources GROUP BY table_name"):
+        print(f"  {r['table_name']:<10} {r['n']:>6} rows  {r['hashed']:>6} hashed")
+    for r in conn.execute("""SELECT s.department, s.subject, s.label FROM documents d
+                             JOIN sources s ON s.content_hash = d.content_hash
+                             WHERE d.text_pages = 0 GROUP BY d.content_hash LIMIT 10"""):
+        print(f"  needs OCR: {r['department']} {r['subject']} {r['label']}")
+
+
+def export(conn, dest):
+    """Compact standalone copy (VACUUM INTO) for shipping with the app or a CDN."""
+    dest = Path(dest)
+    if dest.exists():
+        dest.unlink()
+    conn.execute("INSERT INTO pages_fts (pages_fts) VALUES ('optimize')")
+    conn.commit()
+    conn.execute("VACUUM INTO ?", (str(dest),))
+    print(f"✅ Exported {dest} ({dest.stat().st_size / 1024 / 1024:.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-page full-text index over the PYQ and syllabus PDFs.")
+    parser.add_argument("--index", default=str(INDEX_PATH), help="Index database")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="Extract new documents and refresh row metadata")
+    b.add_argument("--tables", nargs="+", choices=list(SOURCES), default=list(SOURCES))
+    b.add_argument("--workers", type=int, default=WORKERS, help="Extraction processes")
+    b.add_argument("--limit", type=int, help="Extract at most N new documents")
+
+    s = sub.add_parser("search", help="Query the index")
+    s.add_argument("query")
+    s.add_argument("--dept")
+    s.add_argument("--table", choices=list(SOURCES))
+    s.add_argument("--limit", type=int, default=10)
+    s.add_argument("--raw", action="store_true", help="Pass the query to FTS5 as-is (AND/OR/NEAR, column filters)")
+
+    sub.add_parser("stats", help="Index size and documents without a text layer")
+    e = sub.add_parser("export", help="Write a compact copy of the index")
+    e.add_argument("dest")
+    args = parser.parse_args()
+
+    conn = connect(args.index)
+    if args.cmd == "build":
+        build(conn, args.tables, args.workers, args.limit)
+        supabase.report()
+    elif args.cmd == "search":
+        start = time.perf_counter()
+        hits = search(conn, args.query, args.dept, args.table, args.limit, args.raw)
+        elapsed = (time.perf_counter() - start) * 1000
+        for h in hits:
+            print(f"{h['department']} SEM{h['semester']} {h['subject']} {h['label']} (p.{h['page']}, {h['table_name']})")
+            print(f"    {h['snippet']}")
+        print(f"\n{len(hits)} hit(s) in {elapsed:.1f} ms")
+    elif args.cmd == "stats":
+        print_stats(conn)
+    elif args.cmd == "export":
+        export(conn, args.dest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Recorded HTTP responses for makaut.com / mywbut.com / wbuthelp.com.
+
+Fixtures live under http_fixtures/<host>/<key>.json (+ <key>.bin for the body),
+keyed by method + full URL, so they can be diffed and committed.
+
+Scripts send their scraping requests through `stub_url()`. It returns the URL
+unchanged unless HTTP_STUB is set (e.g. HTTP_STUB=http://127.0.0.1:8765), in which
+case https://www.makaut.com/x.html becomes http://127.0.0.1:8765/www.makaut.com/x.html
+and is answered by http_stub_server.py. Point SUPABASE_URL at the same server to
+stub the Supabase API as well.
+"""
+
+import os
+import json
+import hashlib
+from pathlib import Path
+from urllib.parse import urlsplit
+
+FIXTURES_DIR = Path(__file__).parent / "http_fixtures"
+
+
+def stub_url(url):
+    stub = os.environ.get("HTTP_STUB")
+    if not stub:
+        return url
+    parts = urlsplit(url)
+    rewritten = f"{stub.rstrip('/')}/{parts.netloc}{parts.path}"
+    return rewritten + (f"?{parts.query}" if parts.query else "")
+
+
+def fixture_key(method, url):
+    return hashlib.sha1(f"{method.upper()} {url}".encode()).hexdigest()[:16]
+
+
+class FixtureStore:
+    def __init__(self, root=FIXTURES_DIR):
+        self.root = Path(root)
+
+    def _paths(self, method, url):
+        host = urlsplit(url).netloc or "_"
+        key = fixture_key(method, url)
+        return self.root / host / f"{key}.json", self.root / host / f"{key}.bin"
+
+    def get(self, method, url):
+        """(status, headers, body) for a recorded request, or None."""
+        meta_path, body_path = self._paths(method, url)
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text())
+        body = body_path.read_bytes() if body_path.exists() else b""
+        return meta["status"], meta["headers"], body
+
+    def put(self, method, url, status, headers, body):
+        meta_path, body_path = self._paths(method, url)
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        keep = {k: v for k, v in headers.items() if k.lower() in ("content-type", "last-modified", "etag")}
+        meta_path.write_text(json.dumps({"method": method.upper(), "url": url, "status": status, "headers": keep}, indent=2))
+        body_path.write_bytes(body)
+
+    def __iter__(self):
+        for meta_path in sorted(self.root.glob("*/*.json")):
+            yield json.loads(meta_path.read_text())
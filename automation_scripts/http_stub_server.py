@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+"""Local stand-in for everything the automation scripts talk to.
+
+  /rest/v1/<table>                  PostgREST-style select / insert / upsert / patch / delete
+                                    (eq, neq, gt, gte, lt, lte, like, ilike, is, in filters,
+                                    or= / and(...) groups;
+                                    order, limit/offset, Range and Prefer: count=exact)
+  /storage/v1/object/...            upload, public/authenticated GET + HEAD, list, single
+                                    and bulk (`prefixes`) delete, move, copy
+  /<host>/<path>                    replay of recorded makaut.com / mywbut.com / wbuthelp.com
+                                    responses (see http_fixtures.py); --record fetches and
+                                    stores anything missing
+
+Tables start empty, or are seeded from the SQLite mirror (supabase_mirror.py) or a
+JSON file. Latency and failures can be injected to exercise retry and throughput code.
+
+    python http_stub_server.py --port 8765 --seed-mirror --latency 40 --error-rate 0.02
+    SUPABASE_URL=http://127.0.0.1:8765 HTTP_STUB=http://127.0.0.1:8765 python upload_pyqs_to_supabase.py
+"""
+
+import re
+import json
+import time
+import uuid
+import random
+import sqlite3
+import argparse
+import tempfile
+import threading
+import urllib.request
+from pathlib import Path
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl, unquote
+
+from http_fixtures import FixtureStore
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+# --- REST ---
+
+def _split_in_list(raw):
+    """Values of an `in.(a,"b,c",d)` filter."""
+    return [m.group(1) if m.group(1) is not None else m.group(2)
+            for m in re.finditer(r'"((?:[^"\\]|\\.)*)"|([^,]+)', raw.strip()[1:-1])]
+
+
+def _matches(row, col, expr):
+    negate = expr.startswith("not.")
+    if negate:
+        expr = expr[4:]
+    op, _, val = expr.partition(".")
+    cell = row.get(col)
+    text = None if cell is None else str(cell)
+    if op == "eq":
+        ok = text == val
+    elif op == "neq":
+        ok = text is not None and text != val
+    elif op in ("gt", "gte", "lt", "lte"):
+        if cell is None:
+            ok = False
+        else:
+            a, b = (cell, type(cell)(val)) if isinstance(cell, (int, float)) else (text, val)
+            ok = {"gt": a > b, "gte": a >= b, "lt": a < b, "lte": a <= b}[op]
+    elif op in ("like", "ilike"):
+        pattern = "^" + re.escape(val).replace(r"\*", ".*").replace("%", ".*") + "$"
+        ok = text is not None and re.match(pattern, text, re.I if op == "ilike" else 0) is not None
+    elif op == "is":
+        ok = cell is None if val == "null" else str(cell).lower() == val
+    elif op == "in":
+        ok = text in _split_in_list(val)
+    else:
+        raise ValueError(f"unsupported operator {op}")
+    return ok != negate
+
+
+def _split_top_level(raw):
+    """Items of an `or=(...)` / `and(...)` list, splitting on commas outside parentheses and quotes."""
+    items, depth, quoted, start = [], 0, False, 0
+    for i, ch in enumerate(raw):
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and ch == "," and depth == 0:
+            items.append(raw[start:i])
+            start = i + 1
+    items.append(raw[start:])
+    return [item for item in items if item]
+
+
+def _matches_logical(row, op, raw):
+    """`or` / `and` over a parenthesised list of `col.op.value` and nested `and(...)` / `or(...)`."""
+    results = []
+    for item in _split_top_level(raw.strip()[1:-1]):
+        m = re.match(r"(not\.)?(and|or)(\(.*\))$", item)
+        if m:
+            results.append(_matches_logical(row, m.group(2), m.group(3)) != bool(m.group(1)))
+            continue
+        col, _, expr = item.partition(".")
+        q = re.match(r'((?:not\.)?\w+\.)"(.*)"$', expr)
+        results.append(_matches(row, col, q.group(1) + q.group(2) if q else expr))
+    return any(results) if op == "or" else all(results)
+
+
+def _sort(rows, order):
+    for part in reversed(order.split(",")):
+        bits = part.split(".")
+        col = bits[0]
+        desc = "desc" in bits[1:]
+        nulls_first = "nullsfirst" in bits[1:] or (desc and "nullslast" not in bits[1:])
+        present = [r for r in rows if r.get(col) is not None]
+        missing = [r for r in rows if r.get(col) is None]
+        present.sort(key=lambda r: r[col], reverse=desc)
+        rows = missing + present if nulls_first else present + missing
+    return rows
+
+
+class RestEmulator:
+    RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+    def __init__(self):
+        self.tables = {}
+        self.lock = threading.Lock()
+
+    def seed(self, table, rows):
+        self.tables.setdefault(table, []).extend(rows)
+
+    def _filtered(self, table, params):
+        rows = self.tables.setdefault(table, [])
+        filters = [(k, v) for k, v in params if k not in self.RESERVED]
+        return [r for r in rows if all(_matches_logical(r, k, v) if k in ("or", "and") else _matches(r, k, v)
+                                       for k, v in filters)]
+
+    def select(self, table, params, range_header, prefer):
+        p = dict(params)
+        with self.lock:
+            rows = self._filtered(table, params)
+        if "order" in p:
+            rows = _sort(rows, p["order"])
+        total = len(rows)
+        offset = int(p.get("offset", 0))
+        limit = int(p["limit"]) if "limit" in p else None
+        if range_header:
+            m = re.match(r"(\d+)-(\d*)", range_header)
+            if m:
+                offset = int(m.group(1))
+                if m.group(2):
+                    limit = int(m.group(2)) - offset + 1
+        page = rows[offset:offset + limit if limit is not None else None]
+        cols = p.get("select", "*")
+        if cols != "*":
+            names = [c.strip() for c in cols.split(",")]
+            page = [{c: r.get(c) for c in names} for r in page]
+        headers = {}
+        shown = f"{offset}-{offset + len(page) - 1}" if page else "*"
+        headers["Content-Range"] = f"{shown}/{total if 'count=exact' in prefer else '*'}"
+        status = 206 if range_header and len(page) < total else 200
+        return status, headers, page
+
+    def insert(self, table, params, body, prefer):
+        rows = body if isinstance(body, list) else [body]
+        p = dict(params)
+        conflict = p.get("on_conflict", "id").split(",")
+        merge = "merge-duplicates" in prefer
+        ignore = "ignore-duplicates" in prefer
+        out = []
+        with self.lock:
+            store = self.tables.setdefault(table, [])
+            for row in rows:
+                existing = None
+                if merge or ignore:
+                    key = [str(row.get(c)) for c in conflict]
+                    existing = next((r for r in store if [str(r.get(c)) for c in conflict] == key), None)
+                if existing is not None:
+                    if merge:
+                        existing.update(row, updated_at=now_iso())
+                    out.append(existing)
+                    continue
+                new = {"id": str(uuid.uuid4()), "uploaded_at": now_iso(), "updated_at": now_iso(), **row}
+                store.append(new)
+                out.append(new)
+        return 201, {}, out if "return=representation" in prefer else None
+
+    def update(self, table, params, body, prefer):
+        with self.lock:
+            rows = self._filtered(table, params)
+            for r in rows:
+                r.update(body, updated_at=now_iso())
+        return self._write_result(rows, prefer)
+
+    def delete(self, table, params, prefer):
+        with self.lock:
+            doomed = self._filtered(table, params)
+            ids = {id(r) for r in doomed}
+            self.tables[table] = [r for r in self.tables[table] if id(r) not in ids]
+        return self._write_result(doomed, prefer)
+
+    def _write_result(self, rows, prefer):
+        headers = {}
+        if "count=exact" in prefer:
+            headers["Content-Range"] = f"*/{len(rows)}"
+        if "return=representation" in prefer:
+            return 200, headers, rows
+        return 204, headers, None
+
+
+# --- STORAGE ---
+
+class StorageEmulator:
+    def __init__(self, root):
+        self.root = Path(root)
+        self.objects = {}  # (bucket, path) -> {"id", "size", "created_at", "mimetype"}
+        self.lock = threading.Lock()
+
+    def _file(self, bucket, path):
+        return self.root / bucket / path
+
+    def put(self, bucket, path, stream, length, mimetype, upsert):
+        with self.lock:
+            if (bucket, path) in self.objects and not upsert:
+                return False
+        dest = self._file(bucket, path)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        remaining = length
+        with open(dest, "wb") as f:
+            while remaining > 0:
+                chunk = stream.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+        with self.lock:
+            self.objects[(bucket, path)] = {"id": str(uuid.uuid4()), "size": length - remaining,
+                                            "created_at": now_iso(), "mimetype": mimetype}
+        return True
+
+    def get(self, bucket, path):
+        with self.lock:
+            meta = self.objects.get((bucket, path))
+        return (meta, self._file(bucket, path)) if meta else (None, None)
+
+    def list(self, bucket, prefix, limit, offset):
+        prefix = prefix.strip("/")
+        entries = {}
+        with self.lock:
+            for (b, path), meta in self.objects.items():
+                if b != bucket:
+                    continue
+                if prefix:
+                    if not path.startswith(prefix + "/"):
+                        continue
+                    rest = path[len(prefix) + 1:]
+                else:
+                    rest = path
+                name, sep, _ = rest.partition("/")
+                if sep:
+                    entries.setdefault(name, None)
+                else:
+                    entries[name] = {"id": meta["id"], "name": name, "created_at": meta["created_at"],
+                                     "metadata": {"size": meta["size"], "mimetype": meta["mimetype"]}}
+        listing = [entries[n] or {"id": None, "name": n, "metadata": None} for n in sorted(entries)]
+        return listing[offset:offset + limit]
+
+    def remove(self, bucket, paths):
+        removed = []
+        with self.lock:
+            for path in paths:
+                if self.objects.pop((bucket, path), None) is not None:
+                    removed.append({"bucket_id": bucket, "name": path})
+        for r in removed:
+            self._file(bucket, r["name"]).unlink(missing_ok=True)
+        return removed
+
+    def move(self, bucket, source, destination, copy=False):
+        with self.lock:
+            meta = self.objects.get((bucket, source))
+            if meta is None or (bucket, destination) in self.objects:
+                return False
+            self.objects[(bucket, destination)] = {**meta, "id": str(uuid.uuid4())}
+            if not copy:
+                del self.objects[(bucket, source)]
+        src, dst = self._file(bucket, source), self._file(bucket, destination)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if copy:
+            dst.write_bytes(src.read_bytes())
+        else:
+            src.replace(dst)
+        return True
+
+
+# --- HTTP ---
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "MakautStub/1.0"
+    # headers and body go out in separate writes; with Nagle on, the body waits
+    # ~40 ms for the client's delayed ACK and swamps the configured latency
+    disable_nagle_algorithm = True
+
+    # set by make_server()
+    rest = None
+    storage = None
+    fixtures = None
+    record = False
+    latency_ms = 0.0
+    jitter_ms = 0.0
+    error_rate = 0.0
+    error_codes = (503,)
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    # plumbing
+
+    def _send(self, status, body=None, headers=None, content_type="application/json"):
+        if isinstance(body, (list, dict)):
+            payload = json.dumps(body).encode()
+        elif isinstance(body, str):
+            payload = body.encode()
+        else:
+            payload = body or b""
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        if payload or status not in (204, 304):
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if self.command != "HEAD" and payload:
+            self.wfile.write(payload)
+
+    def _send_file(self, meta, path):
+        self.send_response(200)
+        self.send_header("Content-Type", meta["mimetype"] or "application/octet-stream")
+        self.send_header("Content-Length", str(meta["size"]))
+        self.end_headers()
+        if self.command == "HEAD":
+            return
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                self.wfile.write(chunk)
+
+    def _body_bytes(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _json_body(self):
+        raw = self._body_bytes()
+        return json.loads(raw) if raw else None
+
+    def _inject(self):
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+        if self.error_rate and random.random() < self.error_rate:
+            self._body_bytes()  # keep the connection usable
+            code = random.choice(self.error_codes)
+            self._send(code, {"message": "injected failure", "statusCode": str(code)},
+                       headers={"Retry-After": "1"} if code == 429 else None)
+            return True
+        return False
+
+    def _dispatch(self):
+        if self._inject():
+            return
+        parts = urlsplit(self.path)
+        path = parts.path
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        try:
+            if path.startswith("/rest/v1/"):
+                return self._rest(unquote(path[len("/rest/v1/"):]), params)
+            if path.startswith("/storage/v1/"):
+                return self._storage(path[len("/storage/v1/"):])
+            return self._replay(path, parts.query)
+        except (ValueError, KeyError, json.JSONDecodeError) as e:
+            self._send(400, {"message": str(e)})
+
+    do_GET = do_HEAD = do_POST = do_PATCH = do_DELETE = do_PUT = lambda self: self._dispatch()
+
+    # handlers
+
+    def _rest(self, table, params):
+        prefer = self.headers.get("Prefer", "")
+        if table.startswith("rpc/"):
+            # No database functions here, answer like PostgREST does for an unknown one
+            return self._send(404, {"code": "PGRST202", "message": f"Could not find the function public.{table[4:]}"})
+        if self.command in ("GET", "HEAD"):
+            status, headers, rows = self.rest.select(table, params, self.headers.get("Range"), prefer)
+            return self._send(status, rows, headers)
+        if self.command == "POST":
+            status, headers, rows = self.rest.insert(table, params, self._json_body(), prefer)
+            return self._send(status, rows, headers)
+        if self.command == "PATCH":
+            status, headers, rows = self.rest.update(table, params, self._json_body(), prefer)
+            return self._send(status, rows, headers)
+        if self.command == "DELETE":
+            status, headers, rows = self.rest.delete(table, params, prefer)
+            return self._send(status, rows, headers)
+        self._send(405, {"message": "method not allowed"})
+
+    def _storage(self, path):
+        if path.startswith("object/list/") and self.command == "POST":
+            bucket = unquote(path[len("object/list/"):])
+            body = self._json_body() or {}
+            return self._send(200, self.storage.list(bucket, body.get("prefix", ""),
+                                                     int(body.get("limit", 100)), int(body.get("offset", 0))))
+        if path in ("object/move", "object/copy") and self.command == "POST":
+            body = self._json_body()
+            ok = self.storage.move(body["bucketId"], body["sourceKey"], body["destinationKey"], copy=path.endswith("copy"))
+            if ok:
+                return self._send(200, {"message": "Successfully moved" if path.endswith("move") else "Successfully copied"})
+            return self._send(400, {"statusCode": "409", "error": "Duplicate or not found", "message": "Move failed"})
+
+        m = re.match(r"object/(?:public/|authenticated/)?([^/]+)/?(.*)$", path)
+        if not m:
+            return self._send(404, {"message": "not found"})
+        bucket, key = unquote(m.group(1)), unquote(m.group(2))
+
+        if self.command in ("GET", "HEAD"):
+            meta, file_path = self.storage.get(bucket, key)
+            if not meta:
+                return self._send(404, {"statusCode": "404", "error": "not_found", "message": "Object not found"})
+            return self._send_file(meta, file_path)
+        if self.command in ("POST", "PUT"):
+            if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                return self._send(411, {"message": "Content-Length required"})
+            upsert = self.headers.get("x-upsert", "false").lower() == "true" or self.command == "PUT"
+            length = int(self.headers.get("Content-Length") or 0)
+            ok = self.storage.put(bucket, key, self.rfile, length, self.headers.get("Content-Type"), upsert)
+            if not ok:
+                self.rfile.read(length)
+                return self._send(400, {"statusCode": "409", "error": "Duplicate", "message": "The resource already exists"})
+            return self._send(200, {"Key": f"{bucket}/{key}"})
+        if self.command == "DELETE":
+            if key:
+                removed = self.storage.remove(bucket, [key])
+                if not removed:
+                    return self._send(404, {"statusCode": "404", "message": "Object not found"})
+                return self._send(200, {"message": "Successfully deleted"})
+            body = self._json_body() or {}
+            return self._send(200, self.storage.remove(bucket, body.get("prefixes", [])))
+        self._send(405, {"message": "method not allowed"})
+
+    def _replay(self, path, query):
+        host, _, rest = path.lstrip("/").partition("/")
+        url = f"https://{host}/{rest}" + (f"?{query}" if query else "")
+        hit = self.fixtures.get(self.command if self.command != "HEAD" else "GET", url)
+        if hit is None and self.record:
+            hit = self._fetch_upstream(url)
+        if hit is None:
+            return self._send(404, f"No fixture for {self.command} {url}", content_type="text/plain")
+        status, headers, body = hit
+        self._send(status, body, {k: v for k, v in headers.items() if k.lower() != "content-type"},
+                   content_type=headers.get("content-type") or headers.get("Content-Type") or "application/octet-stream")
+
+    def _fetch_upstream(self, url):
+        req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"}, method="GET")
+        try:
+            with urllib.request.urlopen(req, timeout=30) as resp:
+                status, headers, body = resp.status, dict(resp.headers), resp.read()
+        except urllib.error.HTTPError as e:
+            status, headers, body = e.code, dict(e.headers), e.read()
+        except Exception as e:
+            print(f"  Upstream fetch failed for {url}: {e}")
+            return None
+        self.fixtures.put("GET", url, status, headers, body)
+        print(f"  Recorded {status} {url} ({len(body)} bytes)")
+        return status, headers, body
+
+
+def seed_from_mirror(rest, path):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    tables = [r[0] for r in conn.execute("SELECT table_name FROM _sync_state")]
+    for table in tables:
+        rows = [dict(r) for r in conn.execute(f'SELECT * FROM "{table}"')]
+        rest.seed(table, rows)
+        print(f"  Seeded {table}: {len(rows)} rows")
+    conn.close()
+
+
+def make_server(host="127.0.0.1", port=8765, storage_dir=None, fixtures_dir=None, record=False,
+                latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, error_codes=(503,), verbose=False):
+    """Build (but don't start) a stub server. Returns (server, rest, storage)."""
+    rest = RestEmulator()
+    storage = StorageEmulator(storage_dir or tempfile.mkdtemp(prefix="stub_storage_"))
+    handler = type("Handler", (StubHandler,), {
+        "rest": rest,
+        "storage": storage,
+        "fixtures": FixtureStore(fixtures_dir) if fixtures_dir else FixtureStore(),
+        "record": record,
+        "latency_ms": latency_ms,
+        "jitter_ms": jitter_ms,
+        "error_rate": error_rate,
+        "error_codes": tuple(error_codes),
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.verbose = verbose
+    return server, rest, storage
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Supabase + scraped-site stub server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--storage-dir", help="Where uploaded objects are kept (default: a temp dir)")
+    parser.add_argument("--fixtures-dir", help="Fixture store (default: automation_scripts/http_fixtures)")
+    parser.add_argument("--record", action="store_true", help="Fetch and store site responses that have no fixture yet")
+    parser.add_argument("--seed-mirror", nargs="?", const="supabase_mirror.sqlite3",
+                        help="Seed tables from a supabase_mirror.py SQLite file")
+    parser.add_argument("--seed-json", help="Seed tables from a {table: [rows]} JSON file")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added latency per request (ms)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, 0..N ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an error")
+    parser.add_argument("--error-codes", default="503", help="Comma-separated status codes to inject")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server, rest, storage = make_server(
+        args.host, args.port, args.storage_dir, args.fixtures_dir, args.record,
+        args.latency, args.jitter, args.error_rate, [int(c) for c in args.error_codes.split(",")], args.verbose,
+    )
+    if args.seed_mirror:
+        seed_from_mirror(rest, args.seed_mirror)
+    if args.seed_json:
+        for table, rows in json.loads(Path(args.seed_json).read_text()).items():
+            rest.seed(table, rows)
+
+    base = f"http://{args.host}:{args.port}"
+    print(f"🧪 Stub server on {base}  (storage: {storage.root})")
+    print(f"   SUPABASE_URL={base} HTTP_STUB={base} python <script>.py")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
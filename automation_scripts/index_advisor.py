@@ -0,0 +1,625 @@
+#!/usr/bin/env python3
+"""Recommend missing indexes by replaying the app's queries on a local Postgres.
+
+Indexing across the tables is uneven: syllabus and notes have composite
+lookups, pyq has nothing besides its primary key, mock_test_questions.paper_code
+(used for cross-department syncing) is unindexed. This loads Supabase/*.sql
+into an EMPTY local database (with small stand-ins for Supabase's auth and
+storage schemas), seeds it - content rows from the SQLite mirror when there is
+one, topped up with synthetic rows - and replays the filters and orders the
+app issues (auth_service.dart, search_service.dart, monetization_service.dart,
+...) under EXPLAIN ANALYZE.
+
+For every query that seq-scans or sorts, the index its filter + order calls
+for (trigram GIN for ilike) is created, timed and dropped again. Indexes
+that make a query at least --min-speedup faster are recommended, then built
+together and re-measured, so the reported numbers are for the final set.
+
+    createdb makaut_advisor
+    python index_advisor.py --dsn postgresql://postgres@localhost/makaut_advisor
+    python index_advisor.py --dsn ... --reuse            # schema + data already loaded
+    python index_advisor.py --dsn ... --rows 50000 --users 50000 --synthetic
+
+Needs the postgres extra (psycopg). Writes index_advice.sql (ready to run in
+the SQL editor) and index_advice.json.
+"""
+
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import statistics
+from pathlib import Path
+from datetime import date, datetime, timedelta, timezone
+
+from metrics import observe, start_run
+from search_index import BEFORE_SQL as SEARCH_SQL, bench_subjects, bench_terms
+
+SCRIPTS_DIR = Path(__file__).parent
+SQL_DIR = SCRIPTS_DIR.parent / "Supabase"
+ADVICE_SQL = SCRIPTS_DIR / "index_advice.sql"
+ADVICE_JSON = SCRIPTS_DIR / "index_advice.json"
+
+SAMPLES = 20              # parameter sets per query
+REPEAT = 3                # EXPLAIN ANALYZE runs per parameter set
+MIN_SPEEDUP = 1.5
+CONTENT_TABLES = ["pyq", "syllabus", "notes", "important_questions", "mock_test_questions"]
+
+# Load order; the schema files don't say what they build on
+LOAD_ORDER = [
+    "profile_create.sql", "profiles_schema.sql", "profile_enhancement_cleanup.sql", "avatars_storage.sql",
+    "pyq_setup.sql", "syllabus_schema.sql", "notes_schema.sql", "important_questions_schema.sql",
+    "mock_tests_schema.sql", "add_paper_code_migration.sql", "fix_rls_policy.sql", "fix_notes_rls.sql",
+    "department_subjects_schema.sql", "premium_schema.sql", "monetization_schema.sql", "fix_monetization_rls.sql",
+    "shared_content_updates.sql", "rename_to_subjects_bundle.sql",
+    "unit_prices_schema.sql", "pricing_migration.sql", "fix_orders_rls.sql",
+    "fix_user_purchases_comprehensive.sql", "auto_sync_user_purchases_trigger.sql",
+    "notice_board_schema.sql", "youtube_schema.sql", "remove_youtube.sql",
+    "content_hash_migration.sql", "pdf_preview_migration.sql", "content_updated_at_migration.sql",
+    "pyq_questions_schema.sql",
+    "fix_missing_storage_buckets.sql", "catalog_bucket.sql", "pyq_storage_move_policy.sql", "search_documents_migration.sql",
+    "subjects_bundle_bulk_load.sql",
+]
+SKIPPED = {
+    "notes_schema_backup.sql": "superseded by notes_schema.sql",
+    "physics_mcq_upload.sql": "data",
+    "physics_mcq_upload_v2.sql": "data",
+    "backfill_user_purchases.sql": "one-off data fix",
+    "setup_notification_trigger.sql": "needs pg_net",
+    "auth_settings_reference.sql": "reference only",
+}
+
+# Just enough of Supabase's platform schemas for the files above to load
+PLATFORM_SQL = """
+DO $$ BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN CREATE ROLE anon NOLOGIN; END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN CREATE ROLE authenticated NOLOGIN; END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN CREATE ROLE service_role NOLOGIN; END IF;
+END $$;
+CREATE SCHEMA IF NOT EXISTS auth;
+CREATE TABLE IF NOT EXISTS auth.users (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(), email text, raw_user_meta_data jsonb DEFAULT '{}',
+  created_at timestamptz DEFAULT now()
+);
+CREATE OR REPLACE FUNCTION auth.uid() RETURNS uuid LANGUAGE sql STABLE
+  AS $$ SELECT nullif(current_setting('request.jwt.claim.sub', true), '')::uuid $$;
+CREATE OR REPLACE FUNCTION auth.role() RETURNS text LANGUAGE sql STABLE
+  AS $$ SELECT current_setting('request.jwt.claim.role', true) $$;
+CREATE SCHEMA IF NOT EXISTS storage;
+CREATE TABLE IF NOT EXISTS storage.buckets (
+  id text PRIMARY KEY, name text NOT NULL, owner uuid, public boolean DEFAULT false,
+  file_size_limit bigint, allowed_mime_types text[],
+  created_at timestamptz DEFAULT now(), updated_at timestamptz DEFAULT now()
+);
+CREATE TABLE IF NOT EXISTS storage.objects (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(), bucket_id text REFERENCES storage.buckets (id),
+  name text, owner uuid, metadata jsonb, created_at timestamptz DEFAULT now(), updated_at timestamptz DEFAULT now()
+);
+ALTER TABLE storage.objects ENABLE ROW LEVEL SECURITY;
+CREATE OR REPLACE FUNCTION storage.foldername(name text) RETURNS text[] LANGUAGE sql IMMUTABLE
+  AS $$ SELECT (string_to_array(name, '/'))[1:array_length(string_to_array(name, '/'), 1) - 1] $$;
+"""
+
+
+class Shape:
+    def __init__(self, name, table, sql, eq=(), order=(), like=()):
+        self.name = name            # source.what
+        self.table = table
+        self.sql = sql              # %(dept)s %(sem)s %(subject)s %(code)s %(user)s %(item_type)s %(item_id)s
+                                    # %(bundle_id)s %(order_id)s %(token)s %(like)s %(limit)s
+        self.eq = list(eq)          # equality-filtered columns, in the order the index should have them
+        self.order = list(order)    # ORDER BY columns ("uploaded_at DESC")
+        self.like = list(like)      # ilike '%..%' columns
+
+
+def _eq(table, columns, *filters, order=(), name):
+    where = " AND ".join(f"{f} = %({p})s" for f, p in filters)
+    sql = f"SELECT {columns} FROM public.{table} WHERE {where}"
+    if order:
+        sql += " ORDER BY " + ", ".join(order)
+    return Shape(name, table, sql, eq=[f for f, _ in filters], order=order)
+
+
+DS = (("department", "dept"), ("semester", "sem"))
+DSS = DS + (("subject", "subject"),)
+
+SHAPES = [
+    # auth_service.dart
+    _eq("profiles", "*", ("id", "user"), name="auth.profile"),
+    _eq("subjects_bundle", "subject, paper_code", *DS, name="auth.bundle_subjects"),
+    _eq("subjects_bundle", "semester", ("department", "dept"), name="auth.bundle_semesters"),
+    _eq("notes", "subject", *DS, name="auth.notes_subjects"),
+    _eq("notes", "subject, unit", *DS, name="auth.notes_units"),
+    _eq("notes", "*", *DSS, order=["unit", "uploaded_at DESC"], name="auth.notes_list"),
+    _eq("syllabus", "semester", ("department", "dept"), name="auth.syllabus_semesters"),
+    _eq("syllabus", "*", *DSS, order=["uploaded_at DESC"], name="auth.syllabus_list"),
+    _eq("pyq", "semester", ("department", "dept"), name="auth.pyq_semesters"),
+    _eq("pyq", "subject", *DS, name="auth.pyq_subjects"),
+    _eq("pyq", "subject, year", *DS, name="auth.pyq_years"),
+    _eq("pyq", "*", *DSS, order=["year DESC"], name="auth.pyq_list"),
+    _eq("important_questions", "subject", *DS, name="auth.important_subjects"),
+    _eq("important_questions", "*", *DSS, order=["uploaded_at DESC"], name="auth.important_list"),
+    _eq("mock_test_questions", "subject", *DS, name="auth.mock_subjects"),
+    _eq("mock_test_questions", "*", *DSS, name="auth.mock_questions"),
+    _eq("user_purchases", "item_id", ("user_id", "user"), ("item_type", "item_type"), name="auth.purchases"),
+    _eq("fcm_tokens", "id", ("token", "token"), ("user_id", "user"), name="auth.fcm_token_delete"),
+    # monetization_service.dart
+    _eq("subjects_bundle", "subject_price, semester_bundle_id", *DSS, name="monetization.subject_price"),
+    _eq("semester_bundles", "bundle_price", ("id", "bundle_id"), name="monetization.bundle_price"),
+    _eq("semester_bundles", "bundle_price", *DS, name="monetization.bundle_by_semester"),
+    _eq("user_purchases", "id", ("user_id", "user"), ("item_type", "item_type"), ("item_id", "item_id"),
+        name="monetization.has_purchase"),
+    _eq("app_settings", "setting_value", ("setting_key", "setting_key"), name="monetization.setting"),
+    # billing_repository_impl.dart, notice_board_screen.dart
+    _eq("orders", "item_id, item_type, user_id", ("id", "order_id"), name="billing.order"),
+    Shape("notices.latest", "official_notifications",
+          "SELECT * FROM public.official_notifications ORDER BY date_posted DESC LIMIT 50", order=["date_posted DESC"]),
+    # Cross-department syncing by paper code (mock tests, Supabase/physics_mcq_upload*.sql)
+    _eq("mock_test_questions", "id, department, semester", ("paper_code", "code"), name="sync.mock_by_paper_code"),
+    _eq("subjects_bundle", "department, semester, subject", ("paper_code", "code"), name="sync.bundle_by_paper_code"),
+    # search_service.dart
+    *[Shape(f"search.{t}", t, sql, like=["paper_code", "subject"] + (["title"] if "title ILIKE" in sql else []))
+      for t, sql in SEARCH_SQL.items()],
+]
+
+
+# --- LOAD ---
+
+def load_schema(conn):
+    """Run the platform stand-ins, then every schema file, each in its own transaction."""
+    conn.execute(PLATFORM_SQL)
+    if conn.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'").fetchone():
+        conn.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    files = sorted(p.name for p in SQL_DIR.glob("*.sql"))
+    unknown = [f for f in files if f not in LOAD_ORDER and f not in SKIPPED]
+    loaded, failed = [], {}
+    for name in [f for f in LOAD_ORDER if f in files] + unknown:
+        try:
+            with conn.transaction():
+                conn.execute((SQL_DIR / name).read_text())
+            loaded.append(name)
+        except Exception as e:
+            failed[name] = str(e).splitlines()[0]
+    print(f"📜 Loaded {len(loaded)} SQL files" + (f" ({len(unknown)} not in LOAD_ORDER, appended)" if unknown else ""))
+    for name, error in failed.items():
+        print(f"  ⚠ {name}: {error}")
+    return loaded, failed
+
+
+def columns_of(conn, schema, table):
+    """{column: (data_type, required)} - required = NOT NULL without a default."""
+    rows = conn.execute(
+        "SELECT column_name, data_type, is_nullable = 'NO' AND column_default IS NULL "
+        "FROM information_schema.columns WHERE table_schema = %s AND table_name = %s", (schema, table)).fetchall()
+    return {name: (dtype, required) for name, dtype, required in rows}
+
+
+def filler(dtype, i):
+    """A value of a NOT NULL column the generators don't know about."""
+    if dtype in ("integer", "bigint", "smallint", "numeric", "real", "double precision"):
+        return 0
+    if dtype == "boolean":
+        return False
+    if dtype == "uuid":
+        return str(uuid.uuid4())
+    if dtype.startswith("timestamp") or dtype == "date":
+        return datetime.now(timezone.utc).isoformat()
+    if dtype in ("json", "jsonb"):
+        return {}
+    if dtype == "ARRAY":
+        return []
+    return f"x{i}"
+
+
+def copy_rows(conn, qualified, rows):
+    """COPY rows (dicts) into schema.table, adapting mirror values and filling unknown NOT NULL columns."""
+    from psycopg.types.json import Jsonb
+    schema, table = qualified.split(".")
+    cols = columns_of(conn, schema, table)
+    if not cols:
+        print(f"  ⚠ {qualified} doesn't exist, not seeded")
+        return 0
+    names = [c for c in dict.fromkeys(k for r in rows for k in r) if c in cols]
+    names += [c for c, (_, required) in cols.items() if required and c not in names]
+
+    def value(row, col, i):
+        v = row.get(col)
+        dtype = cols[col][0]
+        if v is None:
+            return filler(dtype, i) if cols[col][1] else None
+        if dtype == "ARRAY" and isinstance(v, str):      # mirror stores arrays as JSON text
+            v = json.loads(v)
+        elif dtype in ("json", "jsonb"):
+            v = Jsonb(json.loads(v) if isinstance(v, str) else v)
+        elif dtype == "boolean":
+            v = bool(v)
+        return v
+
+    try:
+        with conn.transaction():
+            with conn.cursor().copy(f"COPY {qualified} ({', '.join(names)}) FROM STDIN") as copy:
+                for i, row in enumerate(rows):
+                    copy.write_row([value(row, c, i) for c in names])
+    except Exception as e:
+        print(f"  ⚠ {qualified}: {str(e).splitlines()[0]}")
+        return 0
+    return len(rows)
+
+
+# --- SEED ---
+
+def when(rng, days=3 * 365):
+    return (datetime.now(timezone.utc) - timedelta(seconds=rng.randrange(days * 86400))).isoformat()
+
+
+def mirror_rows(table):
+    from supabase_mirror import select
+    return select(table) or []
+
+
+def content_rows(table, subjects, n, rng, real):
+    """real rows first, then synthetic ones for random subjects up to n."""
+    rows = list(real)
+    for _ in range(max(0, n - len(rows))):
+        dept, sem, subject, code = rng.choice(subjects)
+        row = {"id": str(uuid.uuid4()), "department": dept, "semester": sem, "subject": subject,
+               "paper_code": code if rng.random() < 0.6 else None, "uploaded_at": when(rng),
+               "file_url": f"https://example.invalid/{table}/{uuid.uuid4()}.pdf",
+               "content_hash": f"{rng.getrandbits(256):064x}", "file_size": rng.randint(50_000, 5_000_000)}
+        if table == "pyq":
+            row["year"] = str(rng.randint(2010, 2024))
+        elif table == "notes":
+            row["unit"] = rng.randint(1, 6)
+            row["title"] = f"{subject} - Unit {row['unit']}"
+            row["is_premium"] = rng.random() < 0.3
+            row["price"] = 49 if row["is_premium"] else 0
+        elif table == "mock_test_questions":
+            row["question_text"] = f"Question {rng.randrange(10**6)} on {subject}"
+            row["options"] = [f"Option {k}" for k in "ABCD"]
+            row["correct_index"] = rng.randrange(4)
+            row["updated_at"] = row.pop("uploaded_at")
+        else:
+            row["title"] = f"{subject} {'Syllabus' if table == 'syllabus' else 'Important Questions'}"
+        rows.append(row)
+    return rows
+
+
+def seed(conn, rows_per_table, users, use_mirror, rng):
+    """Fill the tables the app reads. Triggers (subjects_bundle sync) are bypassed when allowed."""
+    try:
+        conn.execute("SET session_replication_role = replica")
+    except Exception:
+        print("  ⚠ Not a superuser: triggers fire during seeding (slower)")
+
+    real = {t: mirror_rows(t) if use_mirror else [] for t in CONTENT_TABLES}
+    seen = {}
+    for table in CONTENT_TABLES:
+        for r in real[table]:
+            if r.get("department") and r.get("semester") and r.get("subject"):
+                seen.setdefault((r["department"], int(r["semester"]), r["subject"]), r.get("paper_code"))
+    subjects = [(d, s, sub, code) for (d, s, sub), code in seen.items()] or bench_subjects()
+    print(f"🌱 Seeding: {len(subjects)} subjects, {rows_per_table} rows per content table, {users} users"
+          + (f", {sum(map(len, real.values()))} rows from the mirror" if use_mirror else ""))
+
+    start = time.perf_counter()
+    semesters = sorted({(d, s) for d, s, _, _ in subjects})
+    bundles = [{"id": str(uuid.uuid4()), "department": d, "semester": s, "bundle_price": 199} for d, s in semesters]
+    bundle_ids = {(b["department"], b["semester"]): b["id"] for b in bundles}
+    copy_rows(conn, "public.semester_bundles", bundles)
+    copy_rows(conn, "public.subjects_bundle", [
+        {"id": str(uuid.uuid4()), "department": d, "semester": s, "subject": sub, "paper_code": code,
+         "source": "syllabus", "subject_price": 99, "semester_bundle_id": bundle_ids[(d, s)]}
+        for d, s, sub, code in subjects])
+    for table in CONTENT_TABLES:
+        copy_rows(conn, f"public.{table}", content_rows(table, subjects, rows_per_table, rng, real[table]))
+
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    copy_rows(conn, "auth.users", [{"id": u, "email": f"student{i}@example.invalid"} for i, u in enumerate(user_ids)])
+    copy_rows(conn, "public.profiles", [
+        {"id": u, "name": f"Student {i}", "department": rng.choice(subjects)[0], "created_at": when(rng)}
+        for i, u in enumerate(user_ids)])
+
+    purchases, orders = {}, []
+    for u in user_ids:
+        for _ in range(rng.choice([0, 0, 1, 2, 3, 5])):
+            dept, sem, subject, _ = rng.choice(subjects)
+            item_type, item_id = rng.choice([
+                ("unit", f"unit_{dept}_{sem}_{subject}_{rng.randint(1, 6)}"),
+                ("subject", f"subject_{dept}_{sem}_{subject}"),
+                ("semester_bundle", f"bundle_{dept}_{sem}")])
+            order_id = str(uuid.uuid4())
+            orders.append({"id": order_id, "user_id": u, "amount": 99, "status": "completed",
+                           "gateway_order_id": f"order_{order_id}", "item_type": item_type, "item_id": item_id,
+                           "created_at": when(rng)})
+            purchases.setdefault((u, item_type, item_id, dept), {
+                "user_id": u, "item_type": item_type, "item_id": item_id, "department": dept,
+                "order_id": order_id, "purchase_date": when(rng)})
+    copy_rows(conn, "public.orders", orders)
+    copy_rows(conn, "public.user_purchases", list(purchases.values()))
+    copy_rows(conn, "public.fcm_tokens", [{"user_id": u, "token": f"fcm-{uuid.uuid4()}", "platform": "android"}
+                                          for u in user_ids])
+    copy_rows(conn, "public.official_notifications", [
+        {"title": f"Notice {i}", "link": f"https://example.invalid/notice/{i}",
+         "date_posted": (date.today() - timedelta(days=rng.randrange(2000))).isoformat(), "category": "General"}
+        for i in range(max(1000, users // 10))])
+    conn.execute("RESET session_replication_role")
+    conn.execute("ANALYZE")
+    print(f"  seeded in {time.perf_counter() - start:.1f}s")
+
+
+# --- MEASURE ---
+
+def sample_params(conn, n, rng):
+    """n parameter sets drawn from the seeded data, shared by every query."""
+    subjects = conn.execute("SELECT department, semester, subject, paper_code FROM public.subjects_bundle").fetchall()
+    purchases = conn.execute("SELECT user_id::text, item_type, item_id FROM public.user_purchases "
+                             "ORDER BY random() LIMIT 1000").fetchall()
+    tokens = conn.execute("SELECT token, user_id::text FROM public.fcm_tokens ORDER BY random() LIMIT 1000").fetchall()
+    bundles = [r[0] for r in conn.execute("SELECT id::text FROM public.semester_bundles").fetchall()]
+    orders = [r[0] for r in conn.execute("SELECT id::text FROM public.orders ORDER BY random() LIMIT 1000").fetchall()]
+    if not subjects:
+        sys.exit("❌ subjects_bundle is empty - nothing to draw query parameters from")
+    coded = [tuple(s) for s in subjects if s[3]]
+    terms = bench_terms(coded or bench_subjects(), n, rng)
+    codes = [s[3] for s in coded] or ["PCC-CS502"]
+    out = []
+    for i in range(n):
+        dept, sem, subject, _ = rng.choice(subjects)
+        user, item_type, item_id = rng.choice(purchases) if purchases else (str(uuid.uuid4()), "subject", "-")
+        token, token_user = rng.choice(tokens) if tokens else ("-", user)
+        out.append({"dept": dept, "sem": sem, "subject": subject, "code": rng.choice(codes),
+                    "user": user, "item_type": item_type, "item_id": item_id, "token": token,
+                    "bundle_id": rng.choice(bundles) if bundles else str(uuid.uuid4()),
+                    "order_id": rng.choice(orders) if orders else str(uuid.uuid4()),
+                    "setting_key": "preview_interactions_threshold",
+                    "like": f"%{terms[i][1]}%", "limit": 10})
+        if i % 2:   # half of the fcm lookups hit a token of a different user
+            out[-1]["user"] = token_user
+    return out
+
+
+def plan_nodes(plan):
+    """["Sort", "Seq Scan on pyq", ...] of a JSON plan tree."""
+    node = plan["Node Type"]
+    if plan.get("Index Name"):
+        node += f" using {plan['Index Name']}"
+    elif plan.get("Relation Name"):
+        node += f" on {plan['Relation Name']}"
+    return [node] + [n for child in plan.get("Plans", []) for n in plan_nodes(child)]
+
+
+def measure(conn, shape, params, repeat=REPEAT):
+    """(median execution ms from EXPLAIN ANALYZE, plan nodes of the first run)."""
+    times, nodes = [], None
+    for p in params:
+        for _ in range(repeat):
+            (result,) = conn.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + shape.sql, p).fetchone()
+            if isinstance(result, str):
+                result = json.loads(result)
+            times.append(result[0]["Execution Time"])
+            nodes = nodes or plan_nodes(result[0]["Plan"])
+    return statistics.median(times), nodes
+
+
+def needs_index(shape, nodes):
+    return any(n == f"Seq Scan on {shape.table}" or n.startswith("Sort") or n.startswith("Incremental Sort")
+               for n in nodes)
+
+
+# --- CANDIDATES ---
+
+def existing_indexes(conn, table):
+    """[[(column, desc), ...], ...] for the table's btree indexes."""
+    rows = conn.execute("""
+        SELECT i.indexrelid, a.attname, (i.indoption[k.n - 1] & 1) = 1
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indrelid AND c.relname = %s
+        JOIN pg_namespace ns ON ns.oid = c.relnamespace AND ns.nspname = 'public'
+        JOIN pg_am am ON am.oid = (SELECT relam FROM pg_class WHERE oid = i.indexrelid) AND am.amname = 'btree'
+        CROSS JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, n)
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+        ORDER BY i.indexrelid, k.n""", (table,)).fetchall()
+    out = {}
+    for oid, col, desc in rows:
+        out.setdefault(oid, []).append((col, desc))
+    return list(out.values())
+
+
+def btree_key(shape):
+    key = [(c, False) for c in shape.eq]
+    for o in shape.order:
+        col, _, direction = o.partition(" ")
+        if col not in shape.eq:
+            key.append((col, direction.upper() == "DESC"))
+    return key
+
+
+def covered(shape, existing):
+    """An existing btree leading with the equality columns (any order), then the ORDER BY
+    columns (or all of them reversed), already serves the query."""
+    n = len(shape.eq)
+    order = btree_key(shape)[n:]
+    flipped = [(c, not d) for c, d in order]
+    return any({c for c, _ in idx[:n]} == set(shape.eq) and idx[n:n + len(order)] in (order, flipped)
+               for idx in existing)
+
+
+def index_name(table, parts):
+    return f"idx_{table}_{'_'.join(parts)}"[:63]
+
+
+def candidates(conn, shapes, trgm):
+    """{(table, ddl, ...): [shape names]} - an index group per shape that needs one."""
+    out, existing = {}, {}
+    for shape in shapes:
+        if shape.like:
+            if not trgm:
+                continue
+            ddl = tuple(f"CREATE INDEX {index_name(shape.table, [c, 'trgm'])} ON public.{shape.table} "
+                        f"USING gin ({c} gin_trgm_ops)" for c in shape.like)
+        else:
+            key = btree_key(shape)
+            if shape.table not in existing:
+                existing[shape.table] = existing_indexes(conn, shape.table)
+            if covered(shape, existing[shape.table]):
+                continue
+            cols = [f"{c} DESC" if d else c for c, d in key]
+            ddl = (f"CREATE INDEX {index_name(shape.table, [c for c, _ in key])} ON public.{shape.table} "
+                   f"({', '.join(cols)})",)
+        out.setdefault((shape.table, *ddl), []).append(shape.name)
+    return out
+
+
+def with_indexes(conn, ddls, fn):
+    """Run fn() with the indexes built (and ANALYZEd); drop them afterwards. Returns (fn(), total bytes)."""
+    names = [d.split()[2] for d in ddls]
+    tables = {d.split(" ON ")[1].split()[0] for d in ddls}
+    for d in ddls:
+        conn.execute(d)
+    for t in tables:
+        conn.execute(f"ANALYZE {t}")
+    try:
+        size = sum(conn.execute("SELECT pg_relation_size(%s::regclass)", (f"public.{n}",)).fetchone()[0]
+                   for n in names)
+        return fn(), size
+    finally:
+        for n in names:
+            conn.execute(f"DROP INDEX IF EXISTS public.{n}")
+
+
+# --- ADVISE ---
+
+def advise(conn, params, min_speedup):
+    shapes = [s for s in SHAPES if columns_of(conn, "public", s.table)]
+    missing = [s.name for s in SHAPES if s not in shapes]
+    if missing:
+        print(f"  ⚠ Tables missing, skipped: {', '.join(missing)}")
+
+    print(f"⏱  Baseline: {len(shapes)} queries x {len(params)} parameter sets x {REPEAT}")
+    baseline = {}
+    for s in shapes:
+        baseline[s.name] = measure(conn, s, params)
+    slow = [s for s in shapes if needs_index(s, baseline[s.name][1])]
+    trgm = bool(conn.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'").fetchone())
+    cands = candidates(conn, slow, trgm)
+    print(f"🔍 {len(slow)} queries scan or sort; trying {len(cands)} candidate indexes")
+
+    trials = {}   # candidate -> {shape: ms}
+    for cand, names in cands.items():
+        # every query on the table, so a candidate also gets credit for queries it wasn't built for
+        on_table = [s for s in shapes if s.table == cand[0]]
+        timings, size = with_indexes(conn, cand[1:], lambda: {s.name: measure(conn, s, params)[0] for s in on_table})
+        trials[cand] = (timings, size)
+        best = max(baseline[n][0] / max(timings[n], 1e-6) for n in names)
+        print(f"  {best:>6.1f}x  {size / 1024:>8.0f} KB  {'; '.join(cand[1:])}")
+
+    # Per query: the candidate that serves the most queries among those within 90% of its best speed-up
+    chosen = set()
+    for s in slow:
+        scored = [(baseline[s.name][0] / max(t[s.name], 1e-6), cand) for cand, (t, _) in trials.items() if s.name in t]
+        if not scored:
+            continue
+        best = max(x for x, _ in scored)
+        if best < min_speedup:
+            continue
+        good = [cand for x, cand in scored if x >= 0.9 * best]
+        chosen.add(max(good, key=lambda c: (sum(baseline[n][0] / max(trials[c][0][n], 1e-6) >= min_speedup
+                                                    for n in trials[c][0]), -len(c))))
+
+    ddls = [d for cand in sorted(chosen) for d in cand[1:]]
+    print(f"✅ Verifying {len(ddls)} recommended indexes together")
+    if ddls:
+        final, size = with_indexes(conn, ddls, lambda: {s.name: measure(conn, s, params) for s in shapes})
+    else:
+        final, size = dict(baseline), 0
+
+    report = {"generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+              "samples": len(params), "repeat": REPEAT, "min_speedup": min_speedup,
+              "indexes": [], "queries": []}
+    for cand in sorted(chosen):
+        served = [n for n, ms in trials[cand][0].items() if baseline[n][0] / max(ms, 1e-6) >= min_speedup]
+        report["indexes"].append({"table": cand[0], "ddl": list(cand[1:]), "bytes": trials[cand][1],
+                                  "queries": served})
+    for s in shapes:
+        before, before_nodes = baseline[s.name]
+        after, after_nodes = final[s.name]
+        report["queries"].append({"query": s.name, "sql": s.sql, "before_ms": round(before, 3),
+                                  "after_ms": round(after, 3), "speedup": round(before / max(after, 1e-6), 2),
+                                  "plan_before": before_nodes, "plan_after": after_nodes})
+        observe("index_advisor_query_ms", before, query=s.name, variant="before")
+        observe("index_advisor_query_ms", after, query=s.name, variant="after")
+    report["total_index_bytes"] = size
+    return report
+
+
+def write_advice(report, sql_path, json_path):
+    lines = ["-- =============================================",
+             "-- Indexes recommended by automation_scripts/index_advisor.py",
+             f"-- {report['generated_at']}, median of {report['samples']} parameter sets x {report['repeat']} runs",
+             "-- Run this in the Supabase SQL Editor",
+             "-- =============================================", ""]
+    speedups = {q["query"]: q for q in report["queries"]}
+    for idx in report["indexes"]:
+        for name in idx["queries"]:
+            q = speedups[name]
+            lines.append(f"-- {name}: {q['before_ms']:.2f} -> {q['after_ms']:.2f} ms ({q['speedup']:.1f}x)")
+        lines.append(f"-- {idx['bytes'] / 1024:.0f} KB on the seeded data")
+        lines += [d.replace("CREATE INDEX ", "CREATE INDEX IF NOT EXISTS ") + ";" for d in idx["ddl"]]
+        lines.append("")
+    lines.append("NOTIFY pgrst, 'reload schema';")
+    sql_path.write_text("\n".join(lines) + "\n")
+    json_path.write_text(json.dumps(report, indent=2))
+
+
+def print_report(report):
+    print(f"\n{'query':<30}{'before ms':>11}{'after ms':>10}{'speedup':>9}  plan after")
+    for q in sorted(report["queries"], key=lambda q: -q["before_ms"]):
+        plan = " <- ".join(q["plan_after"][:3])
+        print(f"{q['query']:<30}{q['before_ms']:>11.2f}{q['after_ms']:>10.2f}{q['speedup']:>8.1f}x  {plan[:70]}")
+    print(f"\n{len(report['indexes'])} indexes recommended, {report['total_index_bytes'] / 1024 / 1024:.1f} MB on the seeded data:")
+    for idx in report["indexes"]:
+        for d in idx["ddl"]:
+            print(f"  {d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the app's queries on a local Postgres and recommend indexes.")
+    parser.add_argument("--dsn", required=True, help="Connection string of an EMPTY scratch database")
+    parser.add_argument("--reuse", action="store_true", help="Schema and data are already loaded (an earlier run)")
+    parser.add_argument("--rows", type=int, default=20000, help="Rows per content table (mirror rows count)")
+    parser.add_argument("--users", type=int, default=20000, help="Users (profiles, purchases, orders, tokens scale)")
+    parser.add_argument("--synthetic", action="store_true", help="Don't use rows from the SQLite mirror")
+    parser.add_argument("--samples", type=int, default=SAMPLES, help="Parameter sets per query")
+    parser.add_argument("--min-speedup", type=float, default=MIN_SPEEDUP)
+    parser.add_argument("--sql-out", type=Path, default=ADVICE_SQL)
+    parser.add_argument("--json-out", type=Path, default=ADVICE_JSON)
+    args = parser.parse_args()
+
+    try:
+        import psycopg
+    except ImportError:
+        sys.exit("❌ index_advisor needs psycopg: pip install -e 'automation_scripts[postgres]'")
+
+    start_run("index_advisor")
+    rng = random.Random(1337)
+    with psycopg.connect(args.dsn, autocommit=True) as conn:
+        print(f"🐘 {conn.execute('SHOW server_version').fetchone()[0]}")
+        loaded = conn.execute("SELECT to_regclass('public.pyq')").fetchone()[0]
+        if args.reuse and not loaded:
+            sys.exit("❌ --reuse, but public.pyq doesn't exist: run once without it")
+        if not args.reuse:
+            if loaded:
+                sys.exit("❌ public.pyq already exists - use an empty scratch database, or --reuse")
+            load_schema(conn)
+            seed(conn, args.rows, args.users, not args.synthetic, rng)
+        report = advise(conn, sample_params(conn, args.samples, rng), args.min_speedup)
+
+    print_report(report)
+    write_advice(report, args.sql_out, args.json_out)
+    print(f"\n✅ Wrote {args.sql_out.name} and {args.json_out.name}")
+
+
+if __name__ == "__main__":
+    main()
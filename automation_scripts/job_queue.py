@@ -0,0 +1,246 @@
+"""A small lease-based job queue on SQLite, shared by coordinator and workers.
+
+Jobs are rows: a kind ('link', 'download', 'upload', 'verify', ...), a JSON
+payload and a status. A worker *leases* the oldest runnable job for a
+visibility timeout; while it works, a heartbeat keeps extending the lease. A
+worker that dies simply stops heartbeating, the lease expires and another
+worker picks the job up again. Failures go back to the queue with exponential
+backoff until max_attempts, after which the job is parked as 'dead'.
+
+Every worker - threads, processes, or other machines - just opens the same
+database file. On a network share (NFS/SMB) SQLite's WAL mode doesn't work, so
+set JOB_QUEUE_JOURNAL=DELETE there.
+"""
+
+import os
+import json
+import time
+import random
+import socket
+import sqlite3
+import threading
+import traceback
+from pathlib import Path
+
+QUEUE_PATH = Path(os.environ.get("JOB_QUEUE", Path(__file__).parent / "job_queue.sqlite3"))
+JOURNAL_MODE = os.environ.get("JOB_QUEUE_JOURNAL", "WAL")
+VISIBILITY = 120       # seconds a lease lasts without a heartbeat
+MAX_ATTEMPTS = 3
+BACKOFF = 5            # seconds, doubled per attempt (+ jitter)
+POLL = 1.0             # idle worker sleep
+
+
+def connect(path=QUEUE_PATH):
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)  # explicit transactions only
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA journal_mode = {JOURNAL_MODE}")
+    conn.execute("PRAGMA busy_timeout = 30000")
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id            INTEGER PRIMARY KEY,
+            kind          TEXT NOT NULL,
+            key           TEXT UNIQUE,            -- dedupe key; re-enqueueing the same key is a no-op
+            payload       TEXT NOT NULL,
+            status        TEXT NOT NULL DEFAULT 'queued',   -- queued | leased | done | dead
+            attempts      INTEGER NOT NULL DEFAULT 0,
+            max_attempts  INTEGER NOT NULL,
+            available_at  REAL NOT NULL,
+            lease_owner   TEXT,
+            lease_expires REAL,
+            result        TEXT,
+            error         TEXT,
+            created_at    REAL NOT NULL,
+            updated_at    REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_runnable ON jobs (status, kind, available_at);
+        CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs (status, lease_expires);
+    """)
+    return conn
+
+
+def enqueue(conn, kind, payload, key=None, max_attempts=MAX_ATTEMPTS, delay=0):
+    """Add a job. Returns True if it was new, False if `key` was already queued."""
+    now = time.time()
+    cur = conn.execute(
+        """INSERT OR IGNORE INTO jobs (kind, key, payload, max_attempts, available_at, created_at, updated_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        (kind, key, json.dumps(payload), max_attempts, now + delay, now, now),
+    )
+    return cur.rowcount == 1
+
+
+def enqueue_many(conn, jobs, max_attempts=MAX_ATTEMPTS):
+    """jobs: iterable of (kind, payload, key). Returns how many were new."""
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        added = 0
+        for kind, payload, key in jobs:
+            added += conn.execute(
+                """INSERT OR IGNORE INTO jobs (kind, key, payload, max_attempts, available_at, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (kind, key, json.dumps(payload), max_attempts, now, now, now),
+            ).rowcount
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return added
+
+
+def lease(conn, owner, kinds=None, visibility=VISIBILITY):
+    """Claim one runnable job (queued and due, or leased with an expired lease).
+    Returns a dict with id/kind/payload/attempts, or None if nothing is runnable."""
+    now = time.time()
+    kind_sql = f" AND kind IN ({','.join('?' for _ in kinds)})" if kinds else ""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Expired leases that already used their last attempt are dead, not runnable
+        conn.execute(
+            "UPDATE jobs SET status = 'dead', error = COALESCE(error, 'lease expired'), updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+            (now, now),
+        )
+        row = conn.execute(
+            f"""SELECT id, kind, payload, attempts FROM jobs
+                WHERE ((status = 'queued' AND available_at <= ?) OR (status = 'leased' AND lease_expires < ?)){kind_sql}
+                ORDER BY available_at, id LIMIT 1""",
+            (now, now, *(kinds or ())),
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? "
+            "WHERE id = ?",
+            (owner, now + visibility, now, row["id"]),
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return {"id": row["id"], "kind": row["kind"], "payload": json.loads(row["payload"]), "attempts": row["attempts"] + 1}
+
+
+def heartbeat(conn, job_id, owner, visibility=VISIBILITY):
+    """Extend a lease. False means the lease was lost (expired and taken by someone else)."""
+    return conn.execute(
+        "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+        (time.time() + visibility, time.time(), job_id, owner),
+    ).rowcount == 1
+
+
+def complete(conn, job_id, owner, result=None):
+    return conn.execute(
+        "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+        "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+        (json.dumps(result), time.time(), job_id, owner),
+    ).rowcount == 1
+
+
+def fail(conn, job_id, owner, error):
+    """Requeue with backoff, or park as dead once max_attempts is used up."""
+    row = conn.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    now = time.time()
+    if row["attempts"] >= row["max_attempts"]:
+        status, available_at = "dead", now
+    else:
+        status, available_at = "queued", now + BACKOFF * 2 ** (row["attempts"] - 1) * random.uniform(0.5, 1.5)
+    return conn.execute(
+        "UPDATE jobs SET status = ?, available_at = ?, error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+        "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+        (status, available_at, error, now, job_id, owner),
+    ).rowcount == 1
+
+
+def requeue_dead(conn, kinds=None):
+    kind_sql = f" AND kind IN ({','.join('?' for _ in kinds)})" if kinds else ""
+    return conn.execute(
+        f"UPDATE jobs SET status = 'queued', attempts = 0, available_at = ?, updated_at = ? WHERE status = 'dead'{kind_sql}",
+        (time.time(), time.time(), *(kinds or ())),
+    ).rowcount
+
+
+def stats(conn):
+    """{kind: {status: count}}, with leases past their expiry reported as 'expired'."""
+    out = {}
+    for row in conn.execute(
+        "SELECT kind, CASE WHEN status = 'leased' AND lease_expires < ? THEN 'expired' ELSE status END AS st, COUNT(*) AS n "
+        "FROM jobs GROUP BY kind, st", (time.time(),)
+    ):
+        out.setdefault(row["kind"], {})[row["st"]] = row["n"]
+    return out
+
+
+def results(conn, kind):
+    return [json.loads(r["result"]) for r in conn.execute(
+        "SELECT result FROM jobs WHERE kind = ? AND status = 'done' ORDER BY id", (kind,)
+    )]
+
+
+# --- WORKER ---
+
+def worker_id(index=0):
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+class _Heartbeat(threading.Thread):
+    """Keeps a lease alive while a handler runs (own connection - sqlite3 objects are per-thread)."""
+
+    def __init__(self, path, job_id, owner, visibility):
+        super().__init__(daemon=True)
+        self.path, self.job_id, self.owner, self.visibility = path, job_id, owner, visibility
+        self.stopped = threading.Event()
+        self.lost = False
+
+    def run(self):
+        conn = connect(self.path)
+        while not self.stopped.wait(self.visibility / 3):
+            if not heartbeat(conn, self.job_id, self.owner, self.visibility):
+                self.lost = True
+                break
+        conn.close()
+
+
+def run_worker(handlers, path=QUEUE_PATH, index=0, kinds=None, visibility=VISIBILITY, exit_when_idle=False):
+    """Lease and run jobs until stopped (or, with exit_when_idle, until nothing is runnable).
+
+    handlers: {kind: fn(payload, conn) -> JSON-able result}. A handler may enqueue
+    follow-up jobs through `conn`; raising marks the attempt as failed.
+    """
+    conn = connect(path)
+    owner = worker_id(index)
+    kinds = kinds or list(handlers)
+    done = 0
+    while True:
+        job = lease(conn, owner, kinds, visibility)
+        if job is None:
+            if exit_when_idle and not _pending(conn, kinds):
+                return done
+            time.sleep(POLL)
+            continue
+
+        beat = _Heartbeat(path, job["id"], owner, visibility)
+        beat.start()
+        try:
+            result = handlers[job["kind"]](job["payload"], conn)
+        except Exception as e:
+            beat.stopped.set()
+            beat.join()
+            print(f"  ❌ [{owner}] {job['kind']} #{job['id']} attempt {job['attempts']}: {e}")
+            fail(conn, job["id"], owner, "".join(traceback.format_exception_only(type(e), e)).strip())
+            continue
+        beat.stopped.set()
+        beat.join()
+        if beat.lost or not complete(conn, job["id"], owner, result):
+            print(f"  ⚠ [{owner}] lease on {job['kind']} #{job['id']} was lost; result discarded")
+            continue
+        done += 1
+
+
+def _pending(conn, kinds):
+    """Anything still queued (maybe backing off) or leased by someone else?"""
+    return conn.execute(
+        f"SELECT 1 FROM jobs WHERE status IN ('queued', 'leased') AND kind IN ({','.join('?' for _ in kinds)}) LIMIT 1",
+        kinds,
+    ).fetchone() is not None
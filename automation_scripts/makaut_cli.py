@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Single entry point for the automation scripts.
+
+    pip install -e automation_scripts          # or: pip install -e "automation_scripts[pdf]"
+    makaut --help
+    makaut upload-pyqs
+    makaut mirror pyq syllabus --full-diff
+    makaut pipeline --list
+
+Each subcommand runs the matching script exactly as `python <script>.py ...`
+would, with the remaining arguments passed through. Nothing but the chosen
+script is imported, so `makaut --help` and `makaut commands` don't pay for
+requests or PyMuPDF (see bench_startup.py).
+"""
+
+import sys
+import runpy
+import argparse
+
+# subcommand -> (module, one-line description)
+COMMANDS = {
+    "download-pyqs": ("smart_download_pyqs", "Scrape makaut.com PYQs, verify subjects and save locally"),
+    "download-common": ("download_pyqs", "Download first-year and ECE SEM8 papers"),
+    "extract-subjects": ("extract", "Scrape subject names per department into scraped_subjects.json"),
+    "match-subjects": ("subject_name_matcher", "Match local subject folders against syllabus names (--apply to rename)"),
+    "standardize": ("standardize_folders", "Merge sem_N folders into SEMN"),
+    "inventory": ("corpus_inventory", "Refresh the local PYQ corpus inventory"),
+    "upload-pyqs": ("upload_pyqs_to_supabase", "Upload local PYQs to storage and the pyq table"),
+    "upload-syllabus": ("upload_syllabus", "Scrape and upload CSE syllabus PDFs"),
+    "upload-all-syllabus": ("upload_all_syllabus", "Scrape and upload syllabus PDFs for the other departments"),
+    "upload-missing-sem7": ("upload_missing_sem7", "Upload the missing CSE SEM7 syllabus PDFs"),
+    "upload-notes": ("upload_notes_units", "Split notes PDFs by unit and upload them as notes rows"),
+    "verify-pdfs": ("pdf_metadata_verifier", "Compare table subjects against the text of their PDFs"),
+    "find-duplicate-pdfs": ("pdf_duplicates", "Group near-duplicate PYQ PDFs (local + bucket) and propose which to keep"),
+    "previews": ("pdf_previews", "Render first-page previews + page counts for table PDFs"),
+    "text-index": ("fulltext_index", "Build / query the per-page full-text index of PYQ + syllabus PDFs"),
+    "segment-questions": ("question_segmenter", "Split local PYQ PDFs into question-level JSONL (--upload to pyq_questions)"),
+    "repeated-questions": ("repeated_questions", "Cluster questions repeated across years (MinHash + LSH)"),
+    "publish-catalog": ("publish_catalog", "Publish per-department catalog bundles + manifest to storage"),
+    "search-index": ("search_index", "Sync the trigram search_documents table (bench: local Postgres timings)"),
+    "index-advisor": ("index_advisor", "Replay the app's queries on a local Postgres and recommend indexes"),
+    "bulk-load": ("bulk_load", "Rebuild/verify subjects_bundle after bulk imports (bench: local Postgres)"),
+    "compare-tables": ("compare_supa_tables", "Compare subjects between the pyq and syllabus tables"),
+    "find-duplicate-codes": ("find_duplicate_codes", "Find paper codes shared by several syllabus subjects"),
+    "process-syllabus": ("process_syllabus", "Report duplicate paper codes in syllabus_data.json"),
+    "mirror": ("supabase_mirror", "Sync Supabase tables into the local SQLite mirror"),
+    "reconcile": ("reconcile_storage", "Find orphaned objects and dangling rows"),
+    "cleanup-storage": ("cleanup_storage_only", "Delete non-kept department folders from storage"),
+    "cleanup-non-cse": ("cleanup_non_cse_pyqs", "Delete non-CSE pyq rows and their objects"),
+    "pipeline": ("pipeline", "Run the incremental ingestion pipeline"),
+    "queue": ("crawl_queue", "Enqueue crawl/upload/verify jobs or run queue workers"),
+    "stub-server": ("http_stub_server", "Serve recorded sites and a fake Supabase locally"),
+    "bench": ("bench_hot_paths", "Micro-benchmarks for matching and parsing"),
+    "bench-ingest": ("bench_ingest", "End-to-end ingestion benchmark against local stubs"),
+    "bench-startup": ("bench_startup", "Import-time / startup benchmark for this CLI"),
+}
+
+VERSION = "0.1.0"
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="makaut",
+        description="Makaut Scholar content automation.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(f"  {name:<22} {help_}" for name, (_, help_) in COMMANDS.items())
+               + "\n\nRun `makaut <command> --help` for a command's own options.",
+    )
+    parser.add_argument("--version", action="version", version=f"%(prog)s {VERSION}")
+    parser.add_argument("command", choices=[*COMMANDS, "commands"], metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args = build_parser().parse_args(argv)
+
+    if args.command == "commands":
+        for name, (module, _) in COMMANDS.items():
+            print(f"{name:<22} {module}.py")
+        return
+
+    module, _ = COMMANDS[args.command]
+    sys.argv = [f"makaut {args.command}", *args.args]
+    runpy.run_module(module, run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
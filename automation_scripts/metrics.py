@@ -0,0 +1,235 @@
+"""Counters, histograms and timers for the automation scripts.
+
+    from metrics import count, observe, timer, start_run
+
+    start_run("smart_download_pyqs")          # in main(); writes the outputs at exit
+
+    @timer("pdf_extract")                     # every call is timed
+    def extract_subject_from_pdf(content): ...
+
+    with timer("http_request", target="makaut", op="page"):
+        html = fetch(url)
+    count("pdf_saved", dept=dept)
+    observe("pdf_bytes", len(content))
+
+At exit a JSON summary (count/sum/min/max/p50/p90/p99 per histogram) and a
+Prometheus textfile (for node_exporter's textfile collector) are written to
+METRICS_DIR as <job>.json / <job>.prom.
+
+Profiling is switched on per timer name from the environment, no code changes:
+
+    METRICS_CPROFILE=pdf_extract,subject_match     -> <job>.<name>.prof (pstats)
+    METRICS_TRACEMALLOC=pdf_extract                -> <name>_alloc_peak_bytes histogram
+                                                      + top allocation sites in the JSON
+    (`all` profiles every timer)
+
+tracemalloc's peak is process-wide, so allocation numbers are only exact when
+the traced stage isn't running on several threads at once. Likewise only one
+cProfile runs at a time (Python 3.12+ allows one per process): a profiled timer
+entered while another is active - nested, or on another thread - isn't
+profiled separately; nested calls show up in the outer timer's profile.
+"""
+
+import os
+import json
+import time
+import atexit
+import threading
+import functools
+import tracemalloc
+from pathlib import Path
+
+METRICS_DIR = Path(os.environ.get("METRICS_DIR", Path(__file__).parent / "metrics"))
+PREFIX = "makaut_"
+QUANTILES = (0.5, 0.9, 0.99)
+TOP_ALLOCATIONS = 15
+
+
+def _names(var):
+    return {n.strip() for n in os.environ.get(var, "").split(",") if n.strip()}
+
+
+CPROFILE = _names("METRICS_CPROFILE")
+TRACEMALLOC = _names("METRICS_TRACEMALLOC")
+
+_lock = threading.Lock()
+_counters = {}    # (name, labels) -> float
+_histograms = {}  # (name, labels) -> [values]
+_profiles = {}    # timer name -> pstats.Stats
+_profiling = []   # the active cProfile.Profile, if any
+_run = {"job": None, "started": None}
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def count(name, n=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + n
+
+
+def observe(name, value, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _histograms.setdefault(key, []).append(value)
+
+
+class timer:
+    """Context manager / decorator recording `<name>_seconds` with a status label."""
+
+    def __init__(self, name, **labels):
+        self.name = name
+        self.labels = labels
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timer(self.name, **self.labels):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        self._profile = None
+        if self.name in CPROFILE or "all" in CPROFILE:
+            self._profile = _start_profile()
+        self._traced = self.name in TRACEMALLOC or "all" in TRACEMALLOC
+        if self._traced:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._alloc_start = tracemalloc.get_traced_memory()[0]
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        observe(f"{self.name}_seconds", elapsed, status="error" if exc_type else "ok", **self.labels)
+        if self._traced:
+            observe(f"{self.name}_alloc_peak_bytes", tracemalloc.get_traced_memory()[1] - self._alloc_start, **self.labels)
+        if self._profile:
+            self._profile.disable()
+            import pstats
+            with _lock:
+                _profiling.clear()
+                if self.name in _profiles:
+                    _profiles[self.name].add(self._profile)
+                else:
+                    _profiles[self.name] = pstats.Stats(self._profile)
+        return False
+
+
+def _start_profile():
+    """A running cProfile.Profile, or None when one is already active."""
+    import cProfile
+    with _lock:
+        if _profiling:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:   # another profiling tool (3.12+ sys.monitoring) holds the slot
+            return None
+        _profiling.append(profile)
+    return profile
+
+
+# --- EXPORT ---
+
+def _quantile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summary():
+    """Everything recorded so far as a JSON-able dict."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: sorted(v) for k, v in _histograms.items()}
+    out = {
+        "job": _run["job"],
+        "started_at": _run["started"],
+        "duration_seconds": time.time() - _run["started"] if _run["started"] else None,
+        "counters": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(counters.items())],
+        "histograms": [
+            {"name": n, "labels": dict(l), "count": len(v), "sum": sum(v), "min": v[0], "max": v[-1],
+             **{f"p{int(q * 100)}": _quantile(v, q) for q in QUANTILES}}
+            for (n, l), v in sorted(histograms.items())
+        ],
+    }
+    if tracemalloc.is_tracing():
+        stats = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCATIONS]
+        out["top_allocations"] = [{"where": str(s.traceback), "bytes": s.size, "blocks": s.count} for s in stats]
+    return out
+
+
+def _prom_labels(labels):
+    if not labels:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+def prometheus_text():
+    """Prometheus exposition format: counters as *_total, histograms as summaries."""
+    job = (("job", _run["job"] or "unknown"),)
+    lines = []
+    with _lock:
+        counters = dict(_counters)
+        histograms = {k: sorted(v) for k, v in _histograms.items()}
+
+    for name in sorted({n for n, _ in counters}):
+        lines.append(f"# TYPE {PREFIX}{name}_total counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{PREFIX}{name}_total{_prom_labels(job + labels)} {value}")
+
+    for name in sorted({n for n, _ in histograms}):
+        lines.append(f"# TYPE {PREFIX}{name} summary")
+        for (n, labels), values in sorted(histograms.items()):
+            if n != name:
+                continue
+            for q in QUANTILES:
+                lines.append(f"{PREFIX}{name}{_prom_labels(job + labels + (('quantile', str(q)),))} {_quantile(values, q)}")
+            lines.append(f"{PREFIX}{name}_sum{_prom_labels(job + labels)} {sum(values)}")
+            lines.append(f"{PREFIX}{name}_count{_prom_labels(job + labels)} {len(values)}")
+
+    if _run["started"]:
+        lines.append(f"# TYPE {PREFIX}run_finished_timestamp_seconds gauge")
+        lines.append(f"{PREFIX}run_finished_timestamp_seconds{_prom_labels(job)} {time.time():.0f}")
+        lines.append(f"# TYPE {PREFIX}run_duration_seconds gauge")
+        lines.append(f"{PREFIX}run_duration_seconds{_prom_labels(job)} {time.time() - _run['started']:.3f}")
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path, text):
+    # node_exporter may read the textfile at any moment
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(text)
+    tmp.replace(path)
+
+
+def write_outputs(job=None):
+    job = job or _run["job"] or "run"
+    if not _counters and not _histograms:
+        return None
+    METRICS_DIR.mkdir(parents=True, exist_ok=True)
+    _write_atomic(METRICS_DIR / f"{job}.json", json.dumps(summary(), indent=2))
+    _write_atomic(METRICS_DIR / f"{job}.prom", prometheus_text())
+    with _lock:
+        for name, stats in _profiles.items():
+            stats.dump_stats(METRICS_DIR / f"{job}.{name}.prof")
+    return METRICS_DIR
+
+
+def start_run(job):
+    """Name this run and write the JSON / Prometheus outputs when the process exits."""
+    _run["job"] = job
+    _run["started"] = time.time()
+
+    def _finish():
+        out = write_outputs(job)
+        if out:
+            print(f"📊 Metrics written to {out}/{job}.json (+ .prom)")
+
+    atexit.register(_finish)
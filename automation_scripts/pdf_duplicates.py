@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""Find PYQ papers stored more than once - byte-identical or just content-identical.
+
+The same paper turns up under several names: -V1 / -OLD / -S1 slugs, a
+neighbouring year, or re-downloaded and saved with different bytes. Every PDF
+in the local tree and in the pyqs_pdf bucket is fingerprinted once per
+content hash:
+
+  * page count, size and text length
+  * a MinHash signature over the normalised text (word 3-shingles, the same
+    scheme repeated_questions.py uses for single questions)
+
+Fingerprints are cached in pdf_fingerprints.sqlite3. Bucket objects the
+same size as the local file at their path reuse its hash; the rest are
+downloaded once and remembered by eTag.
+
+Groups:
+  exact  same SHA-256 under several paths
+  text   signatures agree on >= THRESHOLD and page counts differ by <= 1
+  weak   no text layer (scans): same subject folder, same page count, size within 2%
+
+For every group one copy is proposed to keep: a text layer, the year from
+its name printed on the paper, no variant suffix, more pages, fewer bytes.
+Nothing is deleted; the report lists what each other copy should become.
+
+    python pdf_duplicates.py                 # local tree + bucket
+    python pdf_duplicates.py --local-only
+    python pdf_duplicates.py --dept CSE --threshold 0.95
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import argparse
+import multiprocessing
+from array import array
+from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from corpus_inventory import BASE_DIR, open_inventory, files, ensure_hashes, parse_attributes
+from repeated_questions import signature, similarity, find, NUM_PERM, BANDS
+from metrics import count, observe, start_run
+
+BUCKET = "pyqs_pdf"
+STATE_PATH = Path(__file__).parent / "pdf_fingerprints.sqlite3"
+OUTPUT = Path(__file__).parent / "pdf_duplicates.json"
+WORKERS = os.cpu_count() or 4
+
+THRESHOLD = 0.9          # estimated Jaccard of the whole text
+WEAK_SIZE_RATIO = 0.02
+VARIANT_RE = re.compile(r'[-_](?:V\d|S\d|OLD|O|COPY|\(\d\))(?=[-_.])', re.I)
+
+
+def connect(path=STATE_PATH):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS fingerprints (
+            sha256 TEXT PRIMARY KEY,
+            size   INTEGER,
+            pages  INTEGER,
+            chars  INTEGER,                -- normalised text length; 0 = no text layer
+            years  TEXT,                   -- JSON list of years printed on page 1
+            sig    BLOB
+        );
+        -- Bucket objects: eTag -> hash, so they're downloaded once
+        CREATE TABLE IF NOT EXISTS objects (
+            path   TEXT PRIMARY KEY,
+            etag   TEXT,
+            sha256 TEXT
+        );
+    """)
+    return conn
+
+
+# --- FINGERPRINTING (runs in the worker processes) ---
+
+def fingerprint(task):
+    """task: (local path or None, url). Returns the fingerprint row - or an error."""
+    import fitz  # PyMuPDF, imported on first use
+    local_path, url = task
+    start = time.perf_counter()
+    try:
+        if local_path:
+            data = Path(local_path).read_bytes()
+        else:
+            from supabase_client import supabase
+            resp = supabase.download(url, op="pdf")
+            if resp.status_code != 200:
+                return {"error": f"download failed: {resp.status_code}"}
+            data = resp.content
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            pages = [page.get_text("text") for page in doc]
+        text = " ".join(" ".join(p.split()) for p in pages)
+        sig = signature(text)
+        years = sorted(set(re.findall(r'\b(20[0-4]\d)\b', pages[0]))) if pages else []
+        return {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data), "pages": len(pages),
+                "chars": len(text), "years": json.dumps(years), "sig": sig.tobytes() if sig is not None else None,
+                "seconds": time.perf_counter() - start}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def fingerprint_all(conn, tasks, workers):
+    """tasks: {key: (local path or None, url)} for PDFs whose hash isn't fingerprinted yet.
+    Returns {key: sha256} for the ones that worked."""
+    hashes = {}
+    if not tasks:
+        return hashes
+    print(f"🖐 Fingerprinting {len(tasks)} PDFs...")
+    # spawn, not fork: children must not inherit the parent's pooled HTTP connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(fingerprint, task): key for key, task in tasks.items()}
+        for n, fut in enumerate(as_completed(futures), 1):
+            key, fp = futures[fut], fut.result()
+            if "error" in fp:
+                count("fingerprints", outcome="failed")
+                print(f"  ❌ {key}: {fp['error']}")
+                continue
+            observe("fingerprint_seconds", fp.pop("seconds"))
+            count("fingerprints", outcome="computed")
+            conn.execute("INSERT OR REPLACE INTO fingerprints (sha256, size, pages, chars, years, sig) "
+                         "VALUES (:sha256, :size, :pages, :chars, :years, :sig)", fp)
+            hashes[key] = fp["sha256"]
+            if n % 100 == 0:
+                conn.commit()
+                print(f"  {n}/{len(tasks)}")
+    conn.commit()
+    return hashes
+
+
+# --- COPIES ---
+
+def local_copies(conn, depts):
+    inv = open_inventory()
+    rows = files(inv, depts)
+    ensure_hashes(inv, "path IN (SELECT value FROM json_each(?))", (json.dumps([r["path"] for r in rows]),))
+    rows = files(inv, depts)
+    known = {r["sha256"] for r in conn.execute("SELECT sha256 FROM fingerprints")}
+    tasks = {f"local:{r['path']}": (str(BASE_DIR / r["path"]), None)
+             for r in rows if r["sha256"] not in known}
+    # One task per hash is enough
+    seen = set()
+    for r in rows:
+        key = f"local:{r['path']}"
+        if key in tasks and r["sha256"] in seen:
+            del tasks[key]
+        seen.add(r["sha256"])
+    return [{"source": "local", "path": r["path"], "sha256": r["sha256"], "dept": r["dept"], "sem": r["sem"],
+             "subject": r["subject"], "year": r["year"], "rows": [], "size": r["size"]} for r in rows], tasks
+
+
+def bucket_copies(conn, depts, local_hashes):
+    from cleanup_storage_only import walk_bucket
+    from supabase_mirror import fetch_pages
+    from supabase_client import supabase
+
+    rows_by_path = defaultdict(list)
+    for page in fetch_pages("pyq", "select=id,department,semester,subject,year,file_url&order=id.asc"):
+        for row in page:
+            path = supabase.object_path(BUCKET, row["file_url"])
+            if path:
+                rows_by_path[path].append(row)
+
+    cached = {r["path"]: (r["etag"], r["sha256"]) for r in conn.execute("SELECT * FROM objects")}
+    skip = (lambda p: p.count("/") == 0 and p not in depts) if depts else (lambda p: False)
+    copies, tasks = [], {}
+    for path, item in walk_bucket(BUCKET, skip=skip):
+        if not path.lower().endswith(".pdf"):
+            continue  # previews and other sidecars
+        etag = (item.get("metadata") or {}).get("eTag")
+        attrs = parse_attributes(path)
+        rows = rows_by_path.get(path, [])
+        first = rows[0] if rows else {}
+        copy = {"source": "bucket", "path": path, "sha256": None, "etag": etag,
+                "dept": first.get("department", attrs["dept"]), "sem": first.get("semester", attrs["sem"]),
+                "subject": first.get("subject", attrs["subject"]), "year": str(first.get("year", attrs["year"])),
+                "rows": [r["id"] for r in rows], "size": (item.get("metadata") or {}).get("size")}
+        if path in cached and cached[path][0] == etag:
+            copy["sha256"] = cached[path][1]
+        elif path in local_hashes and local_hashes[path][0] == copy["size"]:
+            copy["sha256"] = local_hashes[path][1]   # uploaded from the local tree
+        else:
+            # Not cached, and not the local file's bytes: fingerprint what the bucket holds
+            tasks[f"bucket:{path}"] = (None, supabase.public_url(BUCKET, path))
+        copies.append(copy)
+    return copies, tasks
+
+
+# --- GROUPING ---
+
+def group_documents(fps, copies, threshold):
+    """Union-find over content hashes: exact copies, LSH text matches, weak scan matches."""
+    hashes = sorted(fps)
+    index = {h: i for i, h in enumerate(hashes)}
+    parent = list(range(len(hashes)))
+    kind = {}
+
+    def union(a, b, how):
+        ra, rb = find(parent, index[a]), find(parent, index[b])
+        if ra != rb:
+            parent[rb] = ra
+            kind[ra] = max(kind.get(ra, "exact"), kind.pop(rb, "exact"), how, key=["exact", "text", "weak"].index)
+
+    rows_per_band = NUM_PERM // BANDS
+    buckets = defaultdict(list)
+    for h in hashes:
+        sig = fps[h]["sig"]
+        if sig is not None:
+            for band in range(BANDS):
+                buckets[(band, sig[band * rows_per_band:(band + 1) * rows_per_band].tobytes())].append(h)
+    for members in buckets.values():
+        anchor = members[0]
+        for h in members[1:]:
+            a, b = fps[anchor], fps[h]
+            if abs(a["pages"] - b["pages"]) <= 1 and similarity(a["sig"], b["sig"]) >= threshold:
+                union(anchor, h, "text")
+
+    # Scans: only within one subject folder, where a false match is cheap to eyeball
+    scans = defaultdict(set)
+    for c in copies:
+        fp = fps.get(c["sha256"])
+        if fp and fp["sig"] is None:
+            scans[(c["dept"], c["sem"], c["subject"], fp["pages"])].add(c["sha256"])
+    for members in scans.values():
+        members = sorted(members, key=lambda h: fps[h]["size"])
+        for a, b in zip(members, members[1:]):
+            if fps[b]["size"] - fps[a]["size"] <= fps[b]["size"] * WEAK_SIZE_RATIO:
+                union(a, b, "weak")
+
+    by_root = defaultdict(list)
+    for c in copies:
+        if c["sha256"] in index:
+            by_root[find(parent, index[c["sha256"]])].append(c)
+    return [(kind.get(root, "exact"), members) for root, members in by_root.items()
+            if len(members) > 1]
+
+
+def merge_copies(copies):
+    """The local tree mirrors the bucket: a path present in both with the same bytes is one copy."""
+    merged = {}
+    for c in copies:
+        key = (c["path"], c["sha256"])
+        if key not in merged:
+            merged[key] = dict(c)
+            continue
+        m = merged[key]
+        m["source"] = "local+bucket"
+        if c["rows"]:   # the table's dept/sem/subject win over the folder names
+            m.update({k: c[k] for k in ("dept", "sem", "subject", "year", "rows")})
+    return list(merged.values())
+
+
+def keep_score(copy, fp):
+    name = copy["path"].rsplit("/", 1)[-1]
+    years = json.loads(fp["years"] or "[]")
+    return (
+        fp["chars"] > 0,
+        copy["year"] in years,
+        not VARIANT_RE.search(name),
+        "bucket" in copy["source"] and bool(copy["rows"]),   # already what students see
+        fp["pages"],
+        -fp["size"],
+        -len(copy["path"]),
+    )
+
+
+def propose(kind, members, fps):
+    keep = max(members, key=lambda c: keep_score(c, fps[c["sha256"]]))
+    same_subject = lambda c: (c["dept"], c["sem"], c["subject"]) == (keep["dept"], keep["sem"], keep["subject"])
+    others, reclaim = [], {"bucket": 0, "local": 0}
+    for c in members:
+        if c is keep:
+            continue
+        size = fps[c["sha256"]]["size"]
+        actions = []
+        if "bucket" in c["source"]:
+            if "bucket" not in keep["source"]:
+                actions.append("upload kept copy first")
+            elif same_subject(c):
+                actions.append("delete rows + object")
+                reclaim["bucket"] += size
+            else:
+                # Another department's row may legitimately show the same paper
+                actions.append("repoint rows, delete object")
+                reclaim["bucket"] += size
+        if "local" in c["source"]:
+            if same_subject(c):
+                actions.append("delete local file")
+                reclaim["local"] += size
+            else:
+                actions.append("keep local file (other subject folder)")
+        others.append({**{k: c[k] for k in ("source", "path", "sha256", "year", "rows")}, "action": "; ".join(actions)})
+    return {
+        "kind": kind,
+        "subject": f"{keep['dept']} SEM{keep['sem']} {keep['subject']}",
+        "keep": {k: keep[k] for k in ("source", "path", "sha256", "year", "rows")},
+        "others": others,
+        "reclaim_bucket_bytes": reclaim["bucket"],
+        "reclaim_local_bytes": reclaim["local"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Group near-duplicate PYQ PDFs and propose which copy to keep.")
+    parser.add_argument("--dept", nargs="+", help="Departments to include (default: all)")
+    parser.add_argument("--local-only", action="store_true", help="Skip the bucket")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Estimated text Jaccard for a text match")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Fingerprinting processes")
+    parser.add_argument("--output", default=str(OUTPUT), help="Report JSON")
+    args = parser.parse_args()
+
+    start_run("pdf_duplicates")
+    conn = connect()
+    copies, tasks = local_copies(conn, args.dept)
+    fingerprint_all(conn, tasks, args.workers)
+    if not args.local_only:
+        local_hashes = {c["path"]: (c["size"], c["sha256"]) for c in copies}
+        remote, tasks = bucket_copies(conn, args.dept, local_hashes)
+        hashes = fingerprint_all(conn, tasks, args.workers)
+        for c in remote:
+            key = f"bucket:{c['path']}"
+            if key in hashes:
+                c["sha256"] = hashes[key]
+                conn.execute("INSERT OR REPLACE INTO objects (path, etag, sha256) VALUES (?, ?, ?)",
+                             (c["path"], c["etag"], c["sha256"]))
+        conn.commit()
+        copies += [c for c in remote if c["sha256"]]
+        print(f"📦 {len(remote)} bucket PDFs")
+    print(f"📁 {sum(c['source'] == 'local' for c in copies)} local PDFs")
+
+    needed = {c["sha256"] for c in copies}
+    fps = {}
+    for r in conn.execute("SELECT * FROM fingerprints"):
+        if r["sha256"] in needed:
+            fps[r["sha256"]] = {**dict(r), "sig": array("Q", r["sig"]) if r["sig"] else None}
+    copies = merge_copies([c for c in copies if c["sha256"] in fps])
+
+    groups = [propose(kind, members, fps) for kind, members in group_documents(fps, copies, args.threshold)]
+    groups.sort(key=lambda g: (g["kind"], -g["reclaim_bucket_bytes"], -g["reclaim_local_bytes"]))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(groups, f, ensure_ascii=False, indent=2)
+
+    for kind in ("exact", "text", "weak"):
+        found = [g for g in groups if g["kind"] == kind]
+        if not found:
+            continue
+        print(f"\n{kind}: {len(found)} groups, reclaimable "
+              f"{sum(g['reclaim_bucket_bytes'] for g in found) / 1024 / 1024:.1f} MB in {BUCKET}, "
+              f"{sum(g['reclaim_local_bytes'] for g in found) / 1024 / 1024:.1f} MB locally")
+        for g in found[:5]:
+            print(f"  {g['subject']}: keep {g['keep']['source']}:{g['keep']['path']}")
+            for o in g["others"]:
+                print(f"    {o['action']:<40} {o['source']}:{o['path']}")
+    print(f"\n✅ {len(groups)} duplicate groups -> {args.output} (nothing was changed)")
+
+
+if __name__ == "__main__":
+    main()
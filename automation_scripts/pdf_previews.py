@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""First-page previews and page counts for the PDFs behind pyq / syllabus / notes.
+
+For every row without a preview_url the PDF is read (from the local PYQ tree
+when it's there, otherwise from storage), hashed, and its first page rendered
+PREVIEW_WIDTH px wide in a process pool. The image is uploaded next to the PDF
+(<name>.<hash>.preview.webp, so it can be cached for a year) and the row gets
+preview_url + page_count, plus content_hash / file_size.
+
+Content hashes that already have a preview are never rendered again: rows
+sharing a hash (the same PDF uploaded twice) just get the existing preview.
+
+    python pdf_previews.py                      # pyq, syllabus and notes
+    python pdf_previews.py pyq --dry-run
+    python pdf_previews.py notes --format png --width 480 --workers 8
+    python pdf_previews.py --force              # re-render everything
+
+WebP needs Pillow (pip install pillow); PNG and JPEG come straight from
+PyMuPDF. Requires Supabase/pdf_preview_migration.sql (which also lets the
+syllabus and notes buckets accept images).
+"""
+
+import os
+import time
+import hashlib
+import argparse
+import threading
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from supabase_client import supabase
+from supabase_mirror import fetch_pages
+from corpus_inventory import BASE_DIR
+from metrics import count, observe, start_run
+
+TABLE_BUCKETS = {
+    "pyq": "pyqs_pdf",
+    "syllabus": "syllabus_pdf",
+    "notes": "notes_pdf",
+}
+LOCAL_ROOTS = {"pyqs_pdf": BASE_DIR}   # buckets mirrored on disk, read instead of downloaded
+
+PREVIEW_WIDTH = 360       # px; list tiles are ~100 dp wide, 3x for dense screens
+QUALITY = 60
+WORKERS = os.cpu_count() or 4
+UPLOAD_WORKERS = 8
+CACHE_CONTROL = "max-age=31536000"   # preview paths carry the content hash
+CONTENT_TYPES = {"webp": "image/webp", "png": "image/png", "jpg": "image/jpeg"}
+
+
+# --- RENDERING (runs in the worker processes) ---
+
+def encode(pix, fmt, quality):
+    if fmt == "png":
+        return pix.tobytes("png")
+    if fmt == "jpg":
+        return pix.tobytes("jpg", jpg_quality=quality)
+    import io
+    from PIL import Image
+    buf = io.BytesIO()
+    Image.frombytes("RGB", (pix.width, pix.height), pix.samples).save(buf, "WEBP", quality=quality, method=6)
+    return buf.getvalue()
+
+
+def render_first_page(task):
+    """task: (url, local_path or None, fmt, width, quality).
+    Returns sha256/size of the PDF, its page count and the encoded first page - or an error."""
+    import fitz  # PyMuPDF, imported on first use
+    url, local_path, fmt, width, quality = task
+    start = time.perf_counter()
+    try:
+        if local_path:
+            data = Path(local_path).read_bytes()
+        else:
+            resp = supabase.download(url, op="pdf")
+            if resp.status_code != 200:
+                return {"error": f"download failed: {resp.status_code}"}
+            data = resp.content
+        sha256 = hashlib.sha256(data).hexdigest()
+        doc = fitz.open(stream=data, filetype="pdf")
+        if doc.page_count == 0:
+            return {"error": "no pages", "sha256": sha256, "size": len(data)}
+        page = doc[0]
+        zoom = width / page.rect.width
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        image = encode(pix, fmt, quality)
+        return {"sha256": sha256, "size": len(data), "page_count": doc.page_count, "image": image,
+                "seconds": time.perf_counter() - start}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+# --- PLANNING ---
+
+def load_rows(table):
+    rows = []
+    for page in fetch_pages(table, "select=id,file_url,content_hash,preview_url,page_count&order=id.asc"):
+        rows.extend(page)
+    return rows
+
+
+def plan(rows, bucket, force=False):
+    """(rendered {hash: values}, reuse {hash: [ids]}, jobs [{ids, url, path}], foreign row count)."""
+    rendered = {}
+    if not force:
+        for r in rows:
+            if r.get("preview_url") and r.get("content_hash") and r.get("page_count"):
+                rendered[r["content_hash"]] = {"preview_url": r["preview_url"], "page_count": r["page_count"]}
+
+    reuse, jobs, foreign = {}, {}, 0
+    for r in rows:
+        if r.get("preview_url") and not force:
+            continue
+        path = supabase.object_path(bucket, r.get("file_url"))
+        if path is None:
+            foreign += 1
+            continue
+        h = r.get("content_hash")
+        if h and h in rendered:
+            reuse.setdefault(h, []).append(str(r["id"]))
+            continue
+        # One render per known hash; rows without a hash are grouped by object
+        job = jobs.setdefault(h or f"path:{path}", {"ids": [], "url": r["file_url"], "path": path})
+        job["ids"].append(str(r["id"]))
+    return rendered, reuse, list(jobs.values()), foreign
+
+
+def preview_path(pdf_path, sha256, fmt):
+    base = pdf_path[:-4] if pdf_path.lower().endswith(".pdf") else pdf_path
+    return f"{base}.{sha256[:12]}.preview.{fmt}"
+
+
+def record(table, ids, values):
+    resp = supabase.update(table, {"id": f"in.({','.join(ids)})"}, values, op="preview")
+    if resp.status_code in (200, 204):
+        return True
+    print(f"  ⚠ Row update failed for {len(ids)} {table} row(s): {resp.status_code} {resp.text[:200]}")
+    return False
+
+
+# --- RUN ---
+
+def process_table(table, args):
+    bucket = TABLE_BUCKETS[table]
+    rows = load_rows(table)
+    rendered, reuse, jobs, foreign = plan(rows, bucket, args.force)
+    if args.limit:
+        jobs = jobs[:args.limit]
+    print(f"\n📄 {table}: {len(rows)} rows, {sum(len(v) for v in reuse.values())} reuse an existing preview, "
+          f"{len(jobs)} PDFs to render" + (f", {foreign} rows outside {bucket}" if foreign else ""))
+
+    if args.dry_run:
+        for job in jobs[:10]:
+            print(f"  would render {job['path']} ({len(job['ids'])} row(s))")
+        return
+
+    for h, ids in reuse.items():
+        if record(table, ids, {**rendered[h], "content_hash": h}):
+            count("previews", table=table, outcome="reused", n=len(ids))
+
+    lock = threading.Lock()
+    done = failed = 0
+
+    def publish(job, result):
+        # Another path may turn out to hold the same bytes
+        with lock:
+            existing = rendered.get(result["sha256"])
+        if existing:
+            ok = record(table, job["ids"], {**existing, "content_hash": result["sha256"], "file_size": result["size"]})
+            count("previews", table=table, outcome="reused" if ok else "failed")
+            return ok
+        target = preview_path(job["path"], result["sha256"], args.format)
+        resp, _, _ = supabase.upload(bucket, target, data=result["image"], content_type=CONTENT_TYPES[args.format],
+                                     cache_control=CACHE_CONTROL, op="preview_upload")
+        if resp.status_code not in (200, 201):
+            print(f"  ⚠ Preview upload failed for {target}: {resp.status_code} {resp.text[:200]}")
+            count("previews", table=table, outcome="failed")
+            return False
+        values = {"preview_url": supabase.public_url(bucket, target), "page_count": result["page_count"]}
+        with lock:
+            rendered[result["sha256"]] = values
+        ok = record(table, job["ids"], {**values, "content_hash": result["sha256"], "file_size": result["size"]})
+        count("previews", table=table, outcome="rendered" if ok else "failed")
+        observe("preview_bytes", len(result["image"]), format=args.format)
+        return ok
+
+    local_root = LOCAL_ROOTS.get(bucket)
+    tasks = {}
+    # spawn, not fork: children must not inherit the parent's pooled HTTP connections
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as pool, \
+            ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as uploads:
+        for job in jobs:
+            local = local_root / job["path"] if local_root else None
+            task = (job["url"], str(local) if local and local.is_file() else None, args.format, args.width, args.quality)
+            tasks[pool.submit(render_first_page, task)] = job
+        published = []
+        for fut in as_completed(tasks):
+            job, result = tasks[fut], fut.result()
+            if "error" in result:
+                failed += 1
+                count("previews", table=table, outcome="failed")
+                print(f"  ❌ {job['path']}: {result['error']}")
+                continue
+            observe("preview_render_seconds", result["seconds"], table=table)
+            published.append(uploads.submit(publish, job, result))
+            done += 1
+            if done % 50 == 0:
+                print(f"  rendered {done}/{len(jobs)}")
+        failed += sum(not f.result() for f in published)
+
+    print(f"  ✅ {len(jobs) - failed}/{len(jobs)} previews published" + (f", {failed} failed" if failed else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render first-page previews + page counts for table PDFs.")
+    parser.add_argument("tables", nargs="*", help=f"Tables to process (default: {' '.join(TABLE_BUCKETS)})")
+    parser.add_argument("--format", choices=list(CONTENT_TYPES), default="webp")
+    parser.add_argument("--width", type=int, default=PREVIEW_WIDTH, help="Preview width in px")
+    parser.add_argument("--quality", type=int, default=QUALITY, help="WebP/JPEG quality")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Render processes")
+    parser.add_argument("--limit", type=int, help="Render at most N PDFs per table")
+    parser.add_argument("--force", action="store_true", help="Re-render rows that already have a preview")
+    parser.add_argument("--dry-run", action="store_true", help="Only show what would be rendered")
+    args = parser.parse_args()
+    unknown = set(args.tables) - set(TABLE_BUCKETS)
+    if unknown:
+        parser.error(f"unknown table(s): {', '.join(sorted(unknown))}")
+
+    if args.format == "webp":
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            print("⚠ Pillow not installed (pip install pillow); writing PNG previews instead of WebP.")
+            args.format = "png"
+
+    start_run("pdf_previews")
+    for table in args.tables or TABLE_BUCKETS:
+        process_table(table, args)
+    supabase.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Run the PYQ ingestion scripts as one incremental pipeline.
+
+    extract ─┐
+    download:<DEPT> (one per department, in parallel)
+             └─> match ─> standardize ─> upload ─┬─> verify
+                                                  └─> catalog
+
+Every stage declares the inputs it reads. Before a stage runs, those inputs
+are fingerprinted (file hashes, local tree totals from corpus_inventory,
+row count + newest updated_at of Supabase tables, or a time bucket for
+scraped websites). A stage whose fingerprint matches the checkpoint from its
+last successful run is skipped. Stages run as subprocesses so independent ones
+execute side by side.
+
+    python pipeline.py                  # incremental run
+    python pipeline.py --list           # show stages and whether they're stale
+    python pipeline.py --force upload   # re-run a stage regardless
+    python pipeline.py --only download:ECE
+"""
+
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from corpus_inventory import connect, refresh, INVENTORY_PATH
+from supabase_client import supabase
+
+SCRIPTS_DIR = Path(__file__).parent
+STATE_PATH = SCRIPTS_DIR / "pipeline_state.json"
+LOG_DIR = SCRIPTS_DIR / "pipeline_logs"
+
+DOWNLOAD_DEPARTMENTS = ["ECE", "IT", "ME", "EE", "CE"]   # smart_download_pyqs.DEPARTMENTS
+UPLOAD_DEPARTMENTS = ["CSE", "IT", "ECE", "EE", "ME", "CE"]  # upload_pyqs_to_supabase.TARGET_DEPARTMENTS
+
+
+class Stage:
+    def __init__(self, name, command, inputs, after=()):
+        self.name = name
+        self.command = command      # argv, run from SCRIPTS_DIR
+        self.inputs = inputs        # fingerprint keys, see fingerprint()
+        self.after = list(after)    # stage names (or prefixes ending in ':') that must finish first
+
+
+def build_stages(apply_renames=False):
+    py = sys.executable
+    downloads = [
+        Stage(f"download:{d}", [py, "smart_download_pyqs.py", "--dept", d],
+              ["table:syllabus", "ttl:24", "file:smart_download_pyqs.py"])
+        for d in DOWNLOAD_DEPARTMENTS
+    ]
+    return [
+        Stage("extract", [py, "extract.py"], ["ttl:24", "file:extract.py"]),
+        *downloads,
+        Stage("match", [py, "subject_name_matcher.py"] + (["--apply"] if apply_renames else []),
+              ["tree", "table:syllabus"], after=["download:"]),
+        Stage("standardize", [py, "standardize_folders.py"], ["tree"], after=["match"]),
+        Stage("upload", [py, "upload_pyqs_to_supabase.py"],
+              [f"tree:{d}" for d in UPLOAD_DEPARTMENTS] + ["table:pyq"], after=["standardize"]),
+        Stage("verify", [py, "pdf_metadata_verifier.py"], ["table:pyq", "table:syllabus"], after=["upload"]),
+        Stage("catalog", [py, "publish_catalog.py"],
+              ["table:pyq", "table:syllabus", "table:notes", "table:important_questions", "table:subjects_bundle",
+               "file:publish_catalog.py"],
+              after=["upload"]),
+        Stage("search", [py, "search_index.py", "sync"],
+              ["table:pyq", "table:syllabus", "table:notes", "table:important_questions", "table:subjects_bundle",
+               "file:search_index.py"],
+              after=["upload"]),
+    ]
+
+
+# --- FINGERPRINTS ---
+
+def _file_fp(name):
+    path = SCRIPTS_DIR / name
+    if not path.exists():
+        return None
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _tree_fp(dept=None):
+    conn = connect(INVENTORY_PATH)
+    refresh(conn)
+    sql = "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(MAX(mtime_ns), 0) FROM files"
+    row = conn.execute(sql + (" WHERE dept = ?" if dept else ""), (dept,) if dept else ()).fetchone()
+    conn.close()
+    return list(row)
+
+
+def _table_fp(table):
+    # Row count catches deletes; the newest updated_at (bumped by a trigger, see
+    # content_updated_at_migration.sql) catches inserts and in-place updates
+    resp = supabase.select(table, "updated_at", order="updated_at.desc.nullslast", limit=1, count="exact",
+                           op="fingerprint")
+    if resp.status_code not in (200, 206):
+        return None  # unknown (or migration not run) -> always stale
+    rows = resp.json()
+    return [resp.headers.get("Content-Range", "").split("/")[-1], rows[0]["updated_at"] if rows else None]
+
+
+def fingerprint(key):
+    kind, _, arg = key.partition(":")
+    if kind == "file":
+        return _file_fp(arg)
+    if kind == "tree":
+        return _tree_fp(arg or None)
+    if kind == "table":
+        return _table_fp(arg)
+    if kind == "ttl":
+        # Scraped sites can't be fingerprinted cheaply; re-run once per `arg` hours
+        return int(time.time() // (float(arg) * 3600))
+    raise ValueError(f"Unknown input kind: {key}")
+
+
+_fp_lock = threading.Lock()  # one inventory refresh at a time
+
+
+def stage_fingerprint(stage):
+    with _fp_lock:
+        return {key: fingerprint(key) for key in stage.inputs}
+
+
+# --- RUNNER ---
+
+def load_state():
+    if STATE_PATH.exists():
+        return json.loads(STATE_PATH.read_text())
+    return {}
+
+
+def save_state(state):
+    STATE_PATH.write_text(json.dumps(state, indent=2))
+
+
+def is_fresh(stage, state, fp):
+    saved = state.get(stage.name)
+    return bool(saved) and None not in fp.values() and saved.get("fingerprint") == fp
+
+
+def run_stage(stage):
+    LOG_DIR.mkdir(exist_ok=True)
+    log_path = LOG_DIR / f"{stage.name.replace(':', '_')}.log"
+    start = time.time()
+    with open(log_path, "w") as log:
+        proc = subprocess.run(stage.command, cwd=SCRIPTS_DIR, stdout=log, stderr=subprocess.STDOUT)
+    return proc.returncode, time.time() - start, log_path
+
+
+def dependencies(stage, stages):
+    deps = set()
+    for ref in stage.after:
+        deps.update(s.name for s in stages if s.name == ref or (ref.endswith(":") and s.name.startswith(ref)))
+    return deps
+
+
+def run(stages, force=(), jobs=4):
+    state = load_state()
+    names = {s.name for s in stages}
+    deps = {s.name: dependencies(s, stages) & names for s in stages}
+    done, failed, timings = set(), set(), {}
+    by_name = {s.name: s for s in stages}
+
+    def check_and_run(stage):
+        fp = stage_fingerprint(stage)
+        if stage.name not in force and "all" not in force and is_fresh(stage, state, fp):
+            return stage.name, "skipped", 0.0, None
+        code, elapsed, log_path = run_stage(stage)
+        if code != 0:
+            return stage.name, f"failed ({code}) — see {log_path}", elapsed, None
+        # Fingerprint again: stages like standardize change their own inputs
+        return stage.name, "ran", elapsed, stage_fingerprint(stage)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        pending = {}
+        while True:
+            # Anything downstream of a failure is blocked, however deep
+            blocked = True
+            while blocked:
+                blocked = {n for n in names - done - failed if deps[n] & failed}
+                failed |= blocked
+                timings.update({n: ("blocked", 0.0) for n in blocked})
+            for name in names - done - failed - set(pending.values()):
+                if deps[name] <= done:
+                    print(f"▶ {name}")
+                    pending[pool.submit(check_and_run, by_name[name])] = name
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                del pending[fut]
+                name, status, elapsed, fp = fut.result()
+                timings[name] = (status, elapsed)
+                print(f"  {'✅' if status in ('ran', 'skipped') else '❌'} {name}: {status} ({elapsed:.1f}s)")
+                if status.startswith("failed"):
+                    failed.add(name)
+                    continue
+                done.add(name)
+                if fp is not None:
+                    state[name] = {"fingerprint": fp, "finished_at": time.time(), "seconds": round(elapsed, 1)}
+                    save_state(state)
+
+    print(f"\n{'='*60}")
+    print(f"{'Stage':<16} {'Status':<12} {'Time':>8}")
+    print(f"{'-'*60}")
+    for s in stages:
+        status, elapsed = timings.get(s.name, ("-", 0.0))
+        print(f"{s.name:<16} {status.split(' ')[0]:<12} {elapsed:>7.1f}s")
+    print(f"{'='*60}")
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental PYQ ingestion pipeline.")
+    parser.add_argument("--list", action="store_true", help="Show stages and whether they would run")
+    parser.add_argument("--only", nargs="+", help="Run just these stages (dependencies are not pulled in)")
+    parser.add_argument("--force", nargs="+", default=[], help="Stage names to run even if fresh ('all' for every stage)")
+    parser.add_argument("--jobs", type=int, default=4, help="Stages to run at once")
+    parser.add_argument("--apply-renames", action="store_true", help="Pass --apply to subject_name_matcher")
+    args = parser.parse_args()
+
+    stages = build_stages(apply_renames=args.apply_renames)
+    if args.only:
+        unknown = set(args.only) - {s.name for s in stages}
+        if unknown:
+            parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+        stages = [s for s in stages if s.name in args.only]
+
+    if args.list:
+        state = load_state()
+        for s in stages:
+            fresh = is_fresh(s, state, stage_fingerprint(s))
+            deps = ", ".join(s.after) or "-"
+            print(f"{s.name:<16} {'fresh' if fresh else 'STALE':<6} after: {deps}")
+        return
+
+    sys.exit(0 if run(stages, force=set(args.force), jobs=args.jobs) else 1)
+
+
+if __name__ == "__main__":
+    main()
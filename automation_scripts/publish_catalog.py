@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""Publish per-department catalog bundles for the app's browse screens.
+
+The semester / subject / year screens currently query pyq, syllabus, notes
+and subjects_bundle column by column and count on the device. This compiles
+everything those screens show into one JSON document per department:
+
+    {"schema": 1, "department": "CSE", "semesters": [
+        {"semester": 5, "subjects": [
+            {"subject": "Operating System", "paper_code": "PCC-CS502",
+             "pyq": [{"id": .., "year": "2023", "file_url": .., ...}, ...],
+             "syllabus": [...], "notes": [...], "important_questions": [...]}]}]}
+
+(empty lists are left out). Bundles are stored gzip'd - and brotli'd when
+the brotli module is installed - under a content-derived version, so they can
+be cached for a year:
+
+    catalog/CSE.<version>.json.gz
+    catalog/manifest.json          {"departments": {"CSE": {"version", "files", ...}}}
+
+The manifest is tiny and cached for a minute; the app reads it, then fetches
+the one bundle it needs. Departments whose bundle didn't change keep their
+version. Bundles no longer referenced by the new or the previous manifest
+are deleted.
+
+    python publish_catalog.py                  # publish
+    python publish_catalog.py --dry-run --out /tmp/catalog   # just build + write locally
+
+Requires Supabase/catalog_bucket.sql.
+"""
+
+import gzip
+import json
+import hashlib
+import argparse
+from pathlib import Path
+from datetime import datetime, timezone
+from collections import defaultdict
+
+from supabase_client import supabase
+from supabase_mirror import fetch_pages
+from metrics import count, observe, start_run
+
+BUCKET = "catalog"
+MANIFEST = "manifest.json"
+SCHEMA = 1
+BUNDLE_CACHE = "max-age=31536000, immutable"   # names carry the version
+MANIFEST_CACHE = "max-age=60"
+CONTENT_TYPES = {"gz": "application/gzip", "br": "application/x-brotli"}
+
+# table -> (fields copied into the bundle when the row has them, sort key; lists are newest first)
+TABLES = {
+    "pyq": (["id", "year", "file_url", "preview_url", "page_count"],
+            lambda r: (str(r.get("year") or ""), str(r.get("uploaded_at") or ""))),
+    "syllabus": (["id", "title", "file_url", "preview_url", "page_count"],
+                 lambda r: str(r.get("uploaded_at") or "")),
+    "notes": (["id", "unit", "title", "file_url", "is_premium", "price", "preview_url", "page_count"],
+              lambda r: (-(r.get("unit") or 0), str(r.get("uploaded_at") or ""))),   # unit ascending
+    "important_questions": (["id", "title", "file_url"],
+                            lambda r: str(r.get("uploaded_at") or "")),
+}
+
+
+# --- BUILD ---
+
+def load():
+    """{table: rows} for the content tables plus subjects_bundle."""
+    data = {}
+    for table in [*TABLES, "subjects_bundle"]:
+        data[table] = [row for page in fetch_pages(table, "select=*&order=department.asc,semester.asc,id.asc")
+                       for row in page]
+        print(f"  {table}: {len(data[table])} rows")
+    return data
+
+
+def build_bundles(data):
+    """{department: bundle dict}."""
+    tree = defaultdict(lambda: defaultdict(dict))   # dept -> sem -> subject -> entry
+
+    def entry(row):
+        return tree[row["department"]][row["semester"]].setdefault(row["subject"], {"subject": row["subject"]})
+
+    for row in data["subjects_bundle"]:
+        if row.get("paper_code"):
+            entry(row)["paper_code"] = row["paper_code"]
+        else:
+            entry(row)
+    for table, (fields, key) in TABLES.items():
+        for row in sorted(data[table], key=key, reverse=True):
+            if not (row.get("department") and row.get("semester") and row.get("subject")):
+                continue
+            item = {f: row[f] for f in fields if row.get(f) is not None}
+            entry(row).setdefault(table, []).append(item)
+
+    bundles = {}
+    for dept, sems in tree.items():
+        bundles[dept] = {
+            "schema": SCHEMA,
+            "department": dept,
+            "semesters": [
+                {"semester": sem, "subjects": [subjects[name] for name in sorted(subjects)]}
+                for sem, subjects in sorted(sems.items())
+            ],
+        }
+    return bundles
+
+
+def encode(bundle):
+    """(version, {"json": raw, "gz": ..., "br": ...}). Deterministic, so unchanged data keeps its version."""
+    raw = json.dumps(bundle, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode()
+    out = {"json": raw, "gz": gzip.compress(raw, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+        out["br"] = brotli.compress(raw, quality=11)
+    except ImportError:
+        pass
+    return hashlib.sha256(raw).hexdigest()[:16], out
+
+
+# --- PUBLISH ---
+
+def current_manifest():
+    resp = supabase.download(supabase.public_url(BUCKET, MANIFEST), op="manifest")
+    if resp.status_code != 200:
+        return {}
+    try:
+        return resp.json()
+    except ValueError:
+        return {}
+
+
+def bundle_path(dept, version, ext):
+    return f"{dept}.{version}.json.{ext}"
+
+
+def publish(bundles, dry_run=False, out_dir=None):
+    previous = current_manifest() if not dry_run else {}
+    old = previous.get("departments", {})
+    manifest = {"schema": SCHEMA, "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "departments": {}}
+    changed = 0
+    for dept in sorted(bundles):
+        version, blobs = encode(bundles[dept])
+        rows = sum(len(s.get(t, [])) for sem in bundles[dept]["semesters"] for s in sem["subjects"] for t in TABLES)
+        files = {ext: supabase.public_url(BUCKET, bundle_path(dept, version, ext)) for ext in blobs if ext != "json"}
+        manifest["departments"][dept] = {"version": version, "rows": rows, "files": files,
+                                          "bytes": {ext: len(b) for ext, b in blobs.items()}}
+        sizes = ", ".join(f"{ext} {len(b) / 1024:.1f} KB" for ext, b in blobs.items())
+        unchanged = old.get(dept, {}).get("version") == version
+        print(f"  {dept:<6} {rows:>6} rows  v{version}  {sizes}" + ("  (unchanged)" if unchanged else ""))
+        observe("catalog_bundle_bytes", len(blobs["gz"]), department=dept, encoding="gz")
+
+        if out_dir:
+            for ext, blob in blobs.items():
+                (out_dir / bundle_path(dept, version, ext)).write_bytes(blob)
+        if dry_run or unchanged:
+            continue
+        for ext in files:
+            path = bundle_path(dept, version, ext)
+            resp, _, _ = supabase.upload(BUCKET, path, data=blobs[ext], content_type=CONTENT_TYPES[ext],
+                                         cache_control=BUNDLE_CACHE, op="catalog_upload")
+            if resp.status_code not in (200, 201):
+                raise RuntimeError(f"Upload of {path} failed: {resp.status_code} {resp.text[:200]}")
+        changed += 1
+        count("catalog_bundles", department=dept, outcome="published")
+
+    body = json.dumps(manifest, ensure_ascii=False, indent=1).encode()
+    if out_dir:
+        (out_dir / MANIFEST).write_bytes(body)
+    if dry_run:
+        return
+    # Bundles first, manifest last: a client never sees a version that isn't there yet
+    resp, _, _ = supabase.upload(BUCKET, MANIFEST, data=body, content_type="application/json",
+                                 cache_control=MANIFEST_CACHE, op="catalog_manifest")
+    if resp.status_code not in (200, 201):
+        raise RuntimeError(f"Manifest upload failed: {resp.status_code} {resp.text[:200]}")
+    print(f"✅ Published {changed} changed bundles, manifest lists {len(manifest['departments'])} departments")
+    prune(manifest, previous)
+
+
+def prune(manifest, previous):
+    """Delete bundles referenced by neither manifest (the previous one may still be in client caches)."""
+    keep = {bundle_path(d, info["version"], ext)
+            for m in (manifest, previous) for d, info in m.get("departments", {}).items()
+            for ext in CONTENT_TYPES}
+    stale, offset = [], 0
+    while True:
+        resp = supabase.list(BUCKET, "", offset=offset, op="catalog_list")
+        if resp.status_code != 200:
+            print(f"  ⚠ Could not list {BUCKET}: {resp.status_code}")
+            return
+        items = resp.json()
+        stale += [i["name"] for i in items if i.get("id") and i["name"] != MANIFEST and i["name"] not in keep]
+        if len(items) < 1000:
+            break
+        offset += 1000
+    if stale:
+        resp = supabase.remove(BUCKET, stale, op="catalog_prune")
+        print(f"  🗑 Removed {len(stale)} old bundles" if resp.status_code == 200
+              else f"  ⚠ Prune failed: {resp.status_code} {resp.text[:200]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile and publish per-department catalog bundles.")
+    parser.add_argument("--dry-run", action="store_true", help="Build and report sizes, upload nothing")
+    parser.add_argument("--out", help="Also write the bundles and manifest to this directory")
+    args = parser.parse_args()
+
+    start_run("publish_catalog")
+    print("📚 Loading tables...")
+    bundles = build_bundles(load())
+    out_dir = Path(args.out) if args.out else None
+    if out_dir:
+        out_dir.mkdir(parents=True, exist_ok=True)
+    publish(bundles, args.dry_run, out_dir)
+    if not args.dry_run:
+        supabase.report()
+
+
+if __name__ == "__main__":
+    main()
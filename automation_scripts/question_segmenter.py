@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""Split the local PYQ PDFs into individual questions.
+
+MAKAUT papers follow one layout: GROUP - A/B/C headers with a type line
+("(Multiple Choice Type Questions)") and a marks scheme ("10 x 1 = 10"),
+numbered questions, roman-numbered MCQ items with a) .. d) options, and marks
+printed at the right margin. PyMuPDF's line boxes are regrouped into visual
+rows so right-margin marks can be told apart from question text, then a small
+state machine walks the rows.
+
+Every question becomes one JSON line shaped like a pyq_questions row (see
+Supabase/pyq_questions_schema.sql), tagged with dept/sem/subject/year from the
+inventory. Results are cached per content hash in question_cache/, so only new
+or changed PDFs are segmented again; bump SEGMENTER_VERSION when the rules
+change.
+
+    python question_segmenter.py                    # whole tree -> pyq_questions.jsonl
+    python question_segmenter.py --dept CSE --sem 5
+    python question_segmenter.py --upload           # also upsert into pyq_questions
+
+Scanned papers have no text layer and yield no questions; they are listed at
+the end of the run.
+"""
+
+import os
+import re
+import json
+import time
+import argparse
+from pathlib import Path
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from corpus_inventory import BASE_DIR, open_inventory, files, ensure_hashes
+from metrics import count, observe, start_run
+
+SEGMENTER_VERSION = 1
+CACHE_DIR = Path(__file__).parent / "question_cache"
+OUTPUT = Path(__file__).parent / "pyq_questions.jsonl"
+WORKERS = os.cpu_count() or 4
+BATCH_SIZE = 500
+CONFLICT_KEY = "department,semester,subject,content_hash,question_group,number,part"
+
+ROW_TOLERANCE = 3        # pt; lines whose centres are this close form one visual row
+CHUNK_GAP = 15           # pt; wider gaps inside a row separate text from marks
+MARGIN_RATIO = 0.65      # chunks starting right of this share of the width can be marks
+
+GROUP_RE = re.compile(r'^(?:GROUP|SECTION)\s*[-–—:]?\s*([A-E])\b', re.I)
+TYPES = [
+    (re.compile(r'multiple\s*choice|objective', re.I), "mcq"),
+    (re.compile(r'short\s*answer', re.I), "short"),
+    (re.compile(r'long\s*answer', re.I), "long"),
+]
+SCHEME_RE = re.compile(r'(\d+)\s*[x×X*]\s*(\d+(?:\.\d+)?)\s*=\s*(\d+)')
+QUESTION_RE = re.compile(r'^(\d{1,2})\s*[.)]\s*(.*)$')
+ITEM_RE = re.compile(r'^\(?([ivx]{1,5})\)\s*(.*)$')
+OPTION_RE = re.compile(r'(?:^|(?<=\s))\(?([a-dA-D])\)\s*')
+SUBPART_RE = re.compile(r'^\(?(?:[a-h]|[ivx]{1,4})\)')
+MARKS_RE = re.compile(r'^[\[(]?\s*(\d{1,2}(?:\s*\+\s*\d{1,2})*)\s*[\])]?$')
+NOISE = [re.compile(p, re.I) for p in (
+    r'^\[?\s*turn\s+over\s*\]?$',
+    r'time\s+allott?ed',
+    r'full\s+marks',
+    r'figures\s+in\s+the\s+margin',
+    r'candidates\s+are\s+required',
+    r'maulana\s+abul\s+kalam|west\s+bengal\s+university\s+of\s+technology',
+    r'^(?:name|roll\s*no|paper\s*code|semester)\b.*:',
+    r'^[A-Z]{2,5}\s*/\s*B\.?\s*TECH',      # running header: CS/B.TECH/CSE/ODD/SEM-5/...
+    r'^www\.|^https?://',
+    r'^[=_\-\s]{4,}$',
+)]
+
+ROMAN = {r: n for n, r in enumerate(
+    "i ii iii iv v vi vii viii ix x xi xii xiii xiv xv xvi xvii xviii xix xx".split(), 1)}
+
+
+# --- LAYOUT ---
+
+def layout_rows(doc):
+    """Visual rows in reading order: {page, width, chunks: [(x0, text)]}.
+    Spans on one baseline are merged into chunks unless a wide gap separates them."""
+    rows = []
+    for pno, page in enumerate(doc, 1):
+        spans = []
+        for block in page.get_text("dict")["blocks"]:
+            for line in block.get("lines", []):
+                for span in line["spans"]:
+                    if span["text"].strip():
+                        x0, y0, x1, y1 = span["bbox"]
+                        spans.append(((y0 + y1) / 2, x0, x1, span["text"]))
+        spans.sort()
+        current, row_y = [], None
+        for y, x0, x1, text in spans:
+            if current and abs(y - row_y) > ROW_TOLERANCE:
+                rows.append({"page": pno, "width": page.rect.width, "chunks": _chunks(current)})
+                current = []
+            if not current:
+                row_y = y
+            current.append((x0, x1, text))
+        if current:
+            rows.append({"page": pno, "width": page.rect.width, "chunks": _chunks(current)})
+    return rows
+
+
+def _chunks(spans):
+    chunks = []
+    for x0, x1, text in sorted(spans):
+        if chunks and x0 - chunks[-1][1] <= CHUNK_GAP:
+            chunks[-1] = (chunks[-1][0], x1, chunks[-1][2] + text)
+        else:
+            chunks.append((x0, x1, text))
+    return [(x0, re.sub(r'\s+', ' ', text).strip()) for x0, _, text in chunks]
+
+
+def running_headers(rows):
+    """Row texts repeated on at least half of the pages (2+): headers/footers."""
+    pages = {r["page"] for r in rows}
+    if len(pages) < 2:
+        return set()
+    seen = Counter({(" ".join(t for _, t in r["chunks"]), r["page"]) for r in rows})
+    per_text = Counter(text for text, _ in seen)
+    return {t for t, n in per_text.items() if n >= max(2, len(pages) / 2)}
+
+
+# --- SEGMENTATION ---
+
+def _number(text):
+    value = float(text)
+    return int(value) if value.is_integer() else value
+
+
+def split_options(text):
+    """'a) x b) y c) z' -> ['x', 'y', 'z'] when the letters run a, b, c... in order; else None."""
+    marks = list(OPTION_RE.finditer(text))
+    if not marks or marks[0].start() != 0:
+        return None
+    letters = [ord(m.group(1).lower()) for m in marks]
+    if any(b != a + 1 for a, b in zip(letters, letters[1:])):
+        return None
+    return [text[m.end():(marks[i + 1].start() if i + 1 < len(marks) else len(text))].strip()
+            for i, m in enumerate(marks)]
+
+
+class Segmenter:
+    def __init__(self):
+        self.questions = []
+        self.group = ""
+        self.qtype = None
+        self.group_marks = None      # per-question marks from the group's "n x m = t" line
+        self.item_marks = None       # per-item marks from an MCQ question's own scheme
+        self.last_number = 0
+        self.question = None
+        self.item = None
+        self.last_item = 0
+        self.after_header = False
+
+    def unit(self):
+        return self.item or self.question
+
+    def _new_unit(self, number, part, text, page):
+        return {"number": number, "part": part, "lines": [text] if text else [], "options": [],
+                "marks": [], "page": page}
+
+    def _emit(self, unit, default_marks):
+        text = ""
+        for line in unit["lines"]:
+            sep = "\n" if text and SUBPART_RE.match(line) else " "
+            text = f"{text}{sep}{line}" if text else line
+        text = text.strip()
+        if not text:
+            return
+        marks = sum(unit["marks"]) if unit["marks"] else default_marks
+        self.questions.append({
+            "question_group": self.group, "question_type": self.qtype,
+            "number": unit["number"], "part": unit["part"], "marks": marks,
+            "question_text": text, "options": unit["options"] or None, "page": unit["page"],
+        })
+
+    def close_item(self):
+        if self.item:
+            self._emit(self.item, self.item_marks)
+            self.item = None
+
+    def close_question(self):
+        self.close_item()
+        q = self.question
+        if q and not q.get("has_items"):
+            self._emit(q, self.group_marks)
+        self.question = None
+        self.item_marks = None
+
+    def feed(self, text, marks, page):
+        if text:
+            self._feed(text, page)
+        # After the text: marks on a question's first row belong to that question
+        if marks and self.unit():
+            self.unit()["marks"].extend(marks)
+
+    def _feed(self, text, page):
+
+        m = GROUP_RE.match(text)
+        if m:
+            self.close_question()
+            self.group, self.qtype, self.group_marks = m.group(1).upper(), None, None
+            self.after_header = True
+            text = text[m.end():].strip(" -–—:")
+            if not text:
+                return
+
+        scheme = SCHEME_RE.search(text)
+        if self.after_header:
+            # Lines between a group header and its first question describe the group
+            for pattern, qtype in TYPES:
+                if pattern.search(text):
+                    self.qtype = qtype
+            if scheme:
+                self.group_marks = _number(scheme.group(2))
+            if not QUESTION_RE.match(text):
+                return
+
+        m = QUESTION_RE.match(text)
+        if m and (int(m.group(1)) == self.last_number + 1 or (self.after_header and int(m.group(1)) == 1)
+                  or (self.last_number == 0 and not self.group)):
+            self.close_question()
+            self.after_header = False
+            self.last_number = int(m.group(1))
+            self.question = self._new_unit(self.last_number, "", "", page)
+            self.last_item = 0
+            text = m.group(2).strip()
+            if not text:
+                return
+
+        if not self.question:
+            return  # cover page / instructions
+
+        if self.qtype == "mcq":
+            if scheme and not self.item:
+                self.item_marks = _number(scheme.group(2))
+            m = ITEM_RE.match(text)
+            if m and ROMAN.get(m.group(1)) == self.last_item + 1:
+                self.close_item()
+                self.question["has_items"] = True
+                self.last_item += 1
+                self.item = self._new_unit(self.question["number"], m.group(1), "", page)
+                text = m.group(2).strip()
+                inline = OPTION_RE.search(text)
+                if inline and inline.group(1).lower() == "a":
+                    self.item["lines"].append(text[:inline.start()].strip())
+                    self.item["options"].extend(split_options(text[inline.start():]) or [])
+                    return
+                if text:
+                    self.item["lines"].append(text)
+                return
+            options = split_options(text)
+            unit = self.unit()
+            if options is not None and (unit["options"] or OPTION_RE.match(text).group(1).lower() == "a"):
+                unit["options"].extend(options)
+                return
+            if unit["options"]:
+                unit["options"][-1] = f"{unit['options'][-1]} {text}"   # wrapped option
+                return
+
+        self.unit()["lines"].append(text)
+
+    def finish(self):
+        self.close_question()
+        return self.questions
+
+
+def segment(doc):
+    rows = layout_rows(doc)
+    headers = running_headers(rows)
+    seg = Segmenter()
+    for row in rows:
+        chunks = list(row["chunks"])
+        marks = []
+        # Right-margin marks: "5", "[5]", "(5)", "5 + 10"
+        while len(chunks) > 1 or (chunks and chunks[0][0] > row["width"] * MARGIN_RATIO):
+            x0, text = chunks[-1]
+            m = MARKS_RE.match(text)
+            if not (m and x0 > row["width"] * MARGIN_RATIO):
+                break
+            marks.insert(0, sum(int(n) for n in re.findall(r'\d+', m.group(1))))
+            chunks.pop()
+        text = " ".join(t for _, t in chunks).strip()
+        if text in headers or any(p.search(text) for p in NOISE) or re.fullmatch(r'\d{1,2}', text):
+            text = ""
+        seg.feed(text, marks, row["page"])
+    return seg.finish()
+
+
+# --- WORKER (runs in the pool) ---
+
+def cache_path(sha256):
+    return CACHE_DIR / f"{sha256}.json"
+
+
+def load_cached(sha256):
+    try:
+        cached = json.loads(cache_path(sha256).read_text())
+    except (OSError, ValueError):
+        return None
+    return cached["questions"] if cached.get("version") == SEGMENTER_VERSION else None
+
+
+def segment_document(task):
+    """task: (absolute path, sha256). Segments, writes the cache entry and returns the questions."""
+    import fitz  # PyMuPDF, imported on first use
+    path, sha256 = task
+    start = time.perf_counter()
+    try:
+        with fitz.open(path) as doc:
+            questions = segment(doc)
+        target = cache_path(sha256)
+        tmp = target.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"version": SEGMENTER_VERSION, "questions": questions}, ensure_ascii=False))
+        tmp.replace(target)
+        return {"questions": questions, "seconds": time.perf_counter() - start}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+# --- RUN ---
+
+def segment_all(rows, workers=WORKERS, force=False, limit=None):
+    """{sha256: questions} for the inventory rows, from cache where possible."""
+    CACHE_DIR.mkdir(exist_ok=True)
+    results, todo = {}, {}
+    for row in rows:
+        h = row["sha256"]
+        if h in results or h in todo:
+            continue
+        cached = None if force else load_cached(h)
+        if cached is not None:
+            results[h] = cached
+        else:
+            todo[h] = str(BASE_DIR / row["path"])
+    items = list(todo.items())[:limit] if limit else list(todo.items())
+    print(f"{len(results)} documents cached, {len(items)} to segment")
+    count("segmented_documents", len(results), outcome="cached")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(segment_document, (path, h)): (h, path) for h, path in items}
+        for n, fut in enumerate(as_completed(futures), 1):
+            (h, path), result = futures[fut], fut.result()
+            if "error" in result:
+                count("segmented_documents", outcome="failed")
+                print(f"  ❌ {Path(path).relative_to(BASE_DIR)}: {result['error']}")
+                continue
+            results[h] = result["questions"]
+            count("segmented_documents", outcome="segmented")
+            observe("segment_seconds", result["seconds"])
+            if n % 100 == 0:
+                print(f"  {n}/{len(items)}")
+    return results
+
+
+def records(rows, results):
+    """pyq_questions rows: every question of every inventory file, tagged with the file's attributes."""
+    seen = set()
+    for row in rows:
+        for q in results.get(row["sha256"], []):
+            rec = {"department": row["dept"], "semester": row["sem"], "subject": row["subject"],
+                   "year": row["year"], "content_hash": row["sha256"], **q,
+                   "question_group": q.get("question_group") or ""}
+            # Groups may each restart at 1, so the group is part of a question's identity
+            key = tuple(rec[k] for k in CONFLICT_KEY.split(","))
+            if key not in seen:   # same paper twice under one subject
+                seen.add(key)
+                yield rec
+
+
+def upload(recs):
+    from supabase_client import supabase
+    ok = failed = 0
+    for i in range(0, len(recs), BATCH_SIZE):
+        batch = recs[i:i + BATCH_SIZE]
+        resp = supabase.upsert("pyq_questions", batch, on_conflict=CONFLICT_KEY, op="questions")
+        if resp.status_code in (200, 201, 204):
+            ok += len(batch)
+        else:
+            failed += len(batch)
+            print(f"  ⚠ Batch {i // BATCH_SIZE + 1} failed: {resp.status_code} {resp.text[:200]}")
+    print(f"⬆ Upserted {ok} questions" + (f", {failed} failed" if failed else ""))
+    supabase.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Segment local PYQ PDFs into question-level JSONL.")
+    parser.add_argument("--dept", nargs="+", help="Departments to include (default: all)")
+    parser.add_argument("--sem", type=int, help="Only this semester")
+    parser.add_argument("--subject", help="Only this subject folder")
+    parser.add_argument("--output", default=str(OUTPUT), help="JSONL output path")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Segmentation processes")
+    parser.add_argument("--limit", type=int, help="Segment at most N uncached documents")
+    parser.add_argument("--force", action="store_true", help="Ignore the cache")
+    parser.add_argument("--upload", action="store_true", help="Upsert the questions into pyq_questions")
+    args = parser.parse_args()
+
+    start_run("question_segmenter")
+    conn = open_inventory()
+    rows = files(conn, args.dept, args.sem, args.subject)
+    hashed = ensure_hashes(conn, "path IN (SELECT value FROM json_each(?))", (json.dumps([r["path"] for r in rows]),))
+    if hashed:
+        print(f"Hashed {hashed} new files.")
+        rows = files(conn, args.dept, args.sem, args.subject)
+    print(f"📄 {len(rows)} PYQ files")
+
+    results = segment_all(rows, args.workers, args.force, args.limit)
+    recs = list(records(rows, results))
+
+    output = Path(args.output)
+    tmp = output.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for rec in recs:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    tmp.replace(output)
+
+    by_type = Counter(r["question_type"] or "untyped" for r in recs)
+    empty = sorted({r["path"] for r in rows if results.get(r["sha256"]) == []})
+    print(f"✅ {len(recs)} questions from {sum(1 for r in rows if results.get(r['sha256']))} files -> {output}")
+    print("   " + ", ".join(f"{t}: {n}" for t, n in by_type.most_common()))
+    for t, n in by_type.items():
+        count("questions", n, type=t)
+    if empty:
+        print(f"⚠ {len(empty)} files gave no questions (scanned or unusual layout), e.g.:")
+        for path in empty[:10]:
+            print(f"   {path}")
+
+    if args.upload:
+        upload(recs)
+
+
+if __name__ == "__main__":
+    main()
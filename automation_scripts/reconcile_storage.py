@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Reconcile storage buckets against the tables that reference them.
+
+For each bucket/table pair the table's `file_url`s are decoded to storage
+paths and held in a dict; the bucket is then streamed with walk_bucket and
+every object is checked off against it in the same pass:
+
+  orphans  - objects in the bucket no row points to
+  dangling - rows whose file_url has no object behind it
+  foreign  - rows whose file_url isn't a public URL in this bucket
+
+Objects a row's preview_url points to count as referenced; missing previews
+are only reported, never a reason to delete the row.
+
+Only the referenced paths are kept in memory; bucket listings are streamed.
+If any folder can't be listed, dangling rows and missing previews are not
+reported (their objects may sit in that folder) and --purge-dangling is
+refused; orphans found in the folders that were listed are still real.
+
+    python reconcile_storage.py                      # report on all buckets
+    python reconcile_storage.py pyqs_pdf --purge-orphans
+"""
+
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from cleanup_storage_only import walk_bucket, pipelined_delete
+from supabase_mirror import fetch_pages
+from supabase_client import supabase
+
+# bucket -> table whose file_url points into it
+BUCKET_TABLES = {
+    "pyqs_pdf": "pyq",
+    "syllabus_pdf": "syllabus",
+    "notes_pdf": "notes",
+}
+
+DB_BATCH = 200
+SAMPLE = 10
+
+
+def storage_path_from_url(file_url, bucket):
+    """Decoded object path for a public URL in `bucket`, or None if it points elsewhere."""
+    return supabase.object_path(bucket, file_url)
+
+
+def load_references(table, bucket):
+    """{storage_path: [row ids]} for every row of `table`, the rows that point elsewhere,
+    and {preview_path: [row ids]}."""
+    refs = {}
+    previews = {}
+    foreign = []
+    for page in fetch_pages(table, "select=id,file_url,preview_url&order=id.asc"):
+        for row in page:
+            path = storage_path_from_url(row.get("file_url"), bucket)
+            if path is None:
+                foreign.append(row)
+            else:
+                refs.setdefault(path, []).append(str(row["id"]))
+            # First-page previews (pdf_previews.py) live in the same bucket
+            preview = storage_path_from_url(row.get("preview_url"), bucket)
+            if preview is not None:
+                previews.setdefault(preview, []).append(str(row["id"]))
+    return refs, foreign, previews
+
+
+def delete_rows(table, ids):
+    resp = supabase.delete(table, {"id": f"in.({','.join(ids)})"})
+    if resp.status_code in (200, 204):
+        return len(ids)
+    print(f"  DB batch delete failed ({len(ids)} ids): {resp.status_code} {resp.text[:200]}")
+    return 0
+
+
+def reconcile(bucket, purge_orphans=False, purge_dangling=False):
+    table = BUCKET_TABLES[bucket]
+    print(f"\n{'='*60}")
+    print(f"🔎 {bucket} ↔ {table}")
+    print(f"{'='*60}")
+
+    refs, foreign, previews = load_references(table, bucket)
+    print(f"  {sum(len(v) for v in refs.values())} rows reference {len(refs)} paths ({len(foreign)} foreign URLs)")
+
+    stats = {"objects": 0, "object_bytes": 0, "matched": 0, "matched_bytes": 0}
+    orphan_sample = []
+    unlisted = []   # prefixes whose listing failed
+
+    def orphans():
+        for path, item in walk_bucket(bucket, failed=unlisted):
+            size = (item.get("metadata") or {}).get("size", 0)
+            stats["objects"] += 1
+            stats["object_bytes"] += size
+            if refs.pop(path, None) is not None or previews.pop(path, None) is not None:
+                stats["matched"] += 1
+                stats["matched_bytes"] += size
+                continue
+            if len(orphan_sample) < SAMPLE:
+                orphan_sample.append(path)
+            yield path, item
+
+    # Without a purge this is just a counting pass over the same stream
+    orphan_count, orphan_bytes, failed = pipelined_delete(orphans(), bucket, dry_run=not purge_orphans)
+
+    # Whatever wasn't checked off while walking has no object behind it - if the walk saw everything
+    complete = not unlisted
+    dangling = refs if complete else {}
+    dangling_ids = [i for ids in dangling.values() for i in ids]
+    if not complete:
+        previews = {}
+
+    mb = lambda n: f"{n / 1024 / 1024:.1f} MB"
+    print(f"  Objects:  {stats['objects']} ({mb(stats['object_bytes'])})")
+    print(f"  Matched:  {stats['matched']} ({mb(stats['matched_bytes'])})")
+    print(f"  Orphans:  {orphan_count} ({mb(orphan_bytes)})" + (" — purged" if purge_orphans else ""))
+    for path in orphan_sample:
+        print(f"    - {path}")
+    if complete:
+        print(f"  Dangling: {len(dangling)} paths / {len(dangling_ids)} rows")
+        for path in sorted(dangling)[:SAMPLE]:
+            print(f"    - {path}")
+    else:
+        print(f"  ⚠ {len(unlisted)} folders could not be listed ({', '.join(sorted(unlisted)[:SAMPLE]) or '/'}): "
+              "dangling rows not checked" + (", --purge-dangling refused" if purge_dangling else ""))
+    if previews:
+        # The row itself is fine; pdf_previews.py --force renders these again
+        print(f"  Missing previews: {len(previews)}")
+    if failed:
+        print(f"  ⚠ {failed} orphan delete batches failed")
+
+    deleted_rows = 0
+    if purge_dangling and dangling_ids:
+        batches = [dangling_ids[i:i + DB_BATCH] for i in range(0, len(dangling_ids), DB_BATCH)]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            deleted_rows = sum(pool.map(lambda ids: delete_rows(table, ids), batches))
+        print(f"  Deleted {deleted_rows}/{len(dangling_ids)} dangling rows")
+
+    return {
+        "bucket": bucket,
+        "table": table,
+        "complete": complete,
+        "unlisted_prefixes": sorted(unlisted),
+        **stats,
+        "orphans": orphan_count,
+        "orphan_bytes": orphan_bytes,
+        "orphan_sample": orphan_sample,
+        "dangling_paths": sorted(dangling),
+        "dangling_rows": len(dangling_ids) if complete else None,
+        "foreign_urls": [r.get("file_url") for r in foreign],
+        "missing_previews": sorted(previews),
+        "deleted_dangling_rows": deleted_rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find storage objects and table rows that don't match up.")
+    parser.add_argument("buckets", nargs="*", help=f"Buckets to check (default: {', '.join(BUCKET_TABLES)})")
+    parser.add_argument("--purge-orphans", action="store_true", help="Batch-delete unreferenced objects")
+    parser.add_argument("--purge-dangling", action="store_true", help="Delete rows whose file is missing")
+    parser.add_argument("--report", help="Write the full results as JSON to this file")
+    args = parser.parse_args()
+    unknown = set(args.buckets) - set(BUCKET_TABLES)
+    if unknown:
+        parser.error(f"unknown bucket(s): {', '.join(sorted(unknown))}")
+
+    results = [reconcile(b, args.purge_orphans, args.purge_dangling) for b in args.buckets or BUCKET_TABLES]
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nReport saved to {args.report}")
+    supabase.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""Find questions that repeat across years: MinHash + LSH over pyq_questions.jsonl.
+
+Each question (text + MCQ options) is normalised, cut into word 3-shingles and
+reduced to a NUM_PERM-value MinHash signature. Signatures are split into
+BANDS bands; questions of the same subject that share any band land in the
+same bucket and become candidates, and a candidate joins a cluster when the
+signatures agree on at least THRESHOLD of their values (estimated Jaccard
+similarity). Nothing is ever compared pairwise across a whole subject.
+
+Signatures are kept in repeated_questions.sqlite3, so a normal run only
+hashes papers (content hashes) it hasn't seen, and forgets papers that left
+the JSONL. Clustering itself is cheap and redone every time.
+
+    python question_segmenter.py && python repeated_questions.py
+    python repeated_questions.py --dept CSE --top 5
+    python repeated_questions.py --threshold 0.7 --full    # re-hash everything
+
+Output: repeated_questions.json - per subject, clusters ranked by how many
+distinct years they appeared in.
+"""
+
+import os
+import re
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import argparse
+from array import array
+from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from metrics import count, observe, start_run
+
+INPUT = Path(__file__).parent / "pyq_questions.jsonl"
+OUTPUT = Path(__file__).parent / "repeated_questions.json"
+STATE_PATH = Path(__file__).parent / "repeated_questions.sqlite3"
+
+NUM_PERM = 64
+BANDS = 16               # 16 bands x 4 rows: pairs above ~0.5 similarity usually share a band
+THRESHOLD = 0.6          # estimated Jaccard needed to join a cluster
+SHINGLE = 3              # words per shingle
+SEED = 1
+WORKERS = os.cpu_count() or 4
+CHUNK = 2000             # questions per worker task
+
+PRIME = (1 << 61) - 1
+_rng = random.Random(SEED)
+PERMS = [(_rng.randrange(1, PRIME), _rng.randrange(0, PRIME)) for _ in range(NUM_PERM)]
+
+SCOPE = ("department", "semester", "subject")
+QUESTION_KEY = ("content_hash", "question_group", "number", "part")   # groups may restart at 1
+
+
+# --- MINHASH ---
+
+def shingles(text):
+    words = re.findall(r'[a-z0-9]+', text.lower())
+    if len(words) < SHINGLE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE]) for i in range(len(words) - SHINGLE + 1)}
+
+
+def signature(text):
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little") % PRIME
+              for s in shingles(text)]
+    if not hashes:
+        return None
+    return array("Q", [min([(a * h + b) % PRIME for h in hashes]) for a, b in PERMS])
+
+
+def signatures(texts):
+    """Worker task: signature bytes (or None) for a chunk of texts."""
+    sigs = (signature(t) for t in texts)
+    return [s.tobytes() if s is not None else None for s in sigs]
+
+
+def question_text(q):
+    return " ".join([q["question_text"], *(q.get("options") or [])])
+
+
+# --- STATE ---
+
+def connect(path=STATE_PATH):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(questions)")}
+    if columns and "question_group" not in columns:
+        conn.execute("DROP TABLE questions")   # state from before the group was part of the key
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS questions (
+            department   TEXT NOT NULL,
+            semester     INTEGER NOT NULL,
+            subject      TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            question_group TEXT NOT NULL,
+            number       INTEGER NOT NULL,
+            part         TEXT NOT NULL,
+            year         TEXT,
+            marks        REAL,
+            text         TEXT NOT NULL,
+            sig          BLOB,                 -- NULL: nothing left after normalising
+            PRIMARY KEY (department, semester, subject, content_hash, question_group, number, part)
+        );
+        CREATE INDEX IF NOT EXISTS idx_questions_hash ON questions (content_hash);
+    """)
+    return conn
+
+
+def params_changed(conn):
+    """Signatures are only comparable under the same permutations and shingling."""
+    current = json.dumps({"num_perm": NUM_PERM, "shingle": SHINGLE, "seed": SEED})
+    row = conn.execute("SELECT value FROM meta WHERE key = 'params'").fetchone()
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('params', ?)", (current,))
+    return row is not None and row["value"] != current
+
+
+def load_questions(path, depts=None):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            q = json.loads(line)
+            if not depts or q["department"] in depts:
+                yield q
+
+
+def update(conn, questions, workers=WORKERS, full=False, depts=None):
+    """Hash questions of papers not in the state yet; drop papers that are gone. Returns (hashed, removed).
+    With `depts`, `questions` only covers those departments: other departments' papers are left alone."""
+    where, params = "", []
+    if depts:
+        where, params = f" WHERE department IN ({','.join('?' for _ in depts)})", list(depts)
+    if params_changed(conn):
+        conn.execute("DELETE FROM questions")   # every signature is stale, whatever the scope
+    elif full:
+        conn.execute("DELETE FROM questions" + where, params)
+    by_paper = defaultdict(list)
+    for q in questions:
+        by_paper[(*(q[k] for k in SCOPE), q["content_hash"])].append(q)
+
+    known = {tuple(r) for r in conn.execute(
+        f"SELECT DISTINCT {', '.join(SCOPE)}, content_hash FROM questions{where}", params)}
+    gone = known - set(by_paper)
+    for key in gone:
+        conn.execute("DELETE FROM questions WHERE department = ? AND semester = ? AND subject = ? AND content_hash = ?", key)
+    new = [q for key, qs in by_paper.items() if key not in known for q in qs]
+
+    texts = [question_text(q) for q in new]
+    chunks = [texts[i:i + CHUNK] for i in range(0, len(texts), CHUNK)]
+    start = time.perf_counter()
+    if len(chunks) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            sigs = [s for part in pool.map(signatures, chunks) for s in part]
+    else:
+        sigs = [s for chunk in chunks for s in signatures(chunk)]
+    if new:
+        observe("minhash_seconds_per_1k", (time.perf_counter() - start) / len(new) * 1000)
+
+    conn.executemany(
+        "INSERT OR REPLACE INTO questions (department, semester, subject, content_hash, question_group, number, part, "
+        "year, marks, text, sig) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [(*(q[k] for k in SCOPE), *(q[k] for k in QUESTION_KEY), q.get("year"), q.get("marks"), question_text(q), sig)
+         for q, sig in zip(new, sigs)],
+    )
+    conn.commit()
+    count("minhash_questions", len(new))
+    return len(new), len(gone)
+
+
+# --- CLUSTERING ---
+
+def similarity(a, b):
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_subject(rows, threshold=THRESHOLD):
+    """Clusters (lists of row indexes) of near-duplicates among one subject's questions."""
+    sigs = [array("Q", r["sig"]) if r["sig"] else None for r in rows]
+    rows_per_band = NUM_PERM // BANDS
+    buckets = defaultdict(list)
+    for i, sig in enumerate(sigs):
+        if sig is None:
+            continue
+        for band in range(BANDS):
+            buckets[(band, sig[band * rows_per_band:(band + 1) * rows_per_band].tobytes())].append(i)
+
+    parent = list(range(len(rows)))
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        # Compare against the bucket's first member only: linear per bucket, and
+        # union-find carries the transitivity
+        anchor = members[0]
+        for i in members[1:]:
+            if find(parent, i) != find(parent, anchor) and similarity(sigs[anchor], sigs[i]) >= threshold:
+                parent[find(parent, i)] = find(parent, anchor)
+
+    groups = defaultdict(list)
+    for i in range(len(rows)):
+        if sigs[i] is not None:
+            groups[find(parent, i)].append(i)
+    return [g for g in groups.values() if len({rows[i]["content_hash"] for i in g}) > 1]
+
+
+def clusters(conn, threshold=THRESHOLD, depts=None):
+    """{(dept, sem, subject): [cluster, ...]} ranked by distinct years, then papers."""
+    sql = "SELECT * FROM questions"
+    params = []
+    if depts:
+        sql += f" WHERE department IN ({','.join('?' for _ in depts)})"
+        params = list(depts)
+    by_subject = defaultdict(list)
+    for r in conn.execute(sql + f" ORDER BY {', '.join(SCOPE)}, year, content_hash, question_group, number, part", params):
+        by_subject[tuple(r[k] for k in SCOPE)].append(r)
+
+    result = {}
+    for scope, rows in by_subject.items():
+        found = []
+        for group in cluster_subject(rows, threshold):
+            members = [rows[i] for i in group]
+            years = sorted({m["year"] for m in members if m["year"]})
+            # Most recent wording represents the cluster
+            rep = max(members, key=lambda m: (m["year"] or "", len(m["text"])))
+            found.append({
+                "question": rep["text"],
+                "years": years,
+                "times_asked": len(years),
+                "papers": len({m["content_hash"] for m in members}),
+                "marks": sorted({m["marks"] for m in members if m["marks"] is not None}),
+                "members": [{"year": m["year"], "group": m["question_group"], "number": m["number"], "part": m["part"],
+                             "content_hash": m["content_hash"]} for m in members],
+            })
+        if found:
+            found.sort(key=lambda c: (-c["times_asked"], -c["papers"], c["question"]))
+            result[scope] = found
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cluster repeated PYQ questions with MinHash + LSH.")
+    parser.add_argument("--input", default=str(INPUT), help="pyq_questions JSONL (question_segmenter.py)")
+    parser.add_argument("--output", default=str(OUTPUT), help="Ranked clusters JSON")
+    parser.add_argument("--dept", nargs="+", help="Departments to include (default: all)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="Estimated Jaccard to join a cluster")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="Hashing processes")
+    parser.add_argument("--full", action="store_true", help="Forget stored signatures and re-hash everything")
+    parser.add_argument("--top", type=int, default=3, help="Clusters to print per subject")
+    args = parser.parse_args()
+
+    start_run("repeated_questions")
+    conn = connect()
+    start = time.perf_counter()
+    hashed, removed = update(conn, load_questions(args.input, args.dept), args.workers, args.full, args.dept)
+    total = conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+    print(f"🔑 Hashed {hashed} new questions ({total} stored, {removed} papers dropped) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    result = clusters(conn, args.threshold, args.dept)
+    print(f"🧩 {sum(len(c) for c in result.values())} repeated questions across {len(result)} subjects "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump([{"department": d, "semester": s, "subject": sub, "clusters": found}
+                   for (d, s, sub), found in result.items()], f, ensure_ascii=False, indent=2)
+    print(f"✅ Wrote {args.output}")
+
+    for (dept, sem, subject), found in result.items():
+        print(f"\n{dept} SEM{sem} {subject}")
+        for c in found[:args.top]:
+            print(f"  {c['times_asked']}x ({', '.join(c['years'])}): {c['question'][:100]}")
+
+
+if __name__ == "__main__":
+    main()
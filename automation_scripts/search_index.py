@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""Build and maintain search_documents, the trigram-indexed table behind search.
+
+SearchService.search runs one `ilike '%query%'` query per content table
+(notes, syllabus, pyq, important_questions). A leading wildcard can't use a
+btree index - and pyq has none besides its primary key - so every search
+scans all four tables. search_documents keeps one row per content row with
+
+    search_text      normalised subject + title + paper code + aliases
+    paper_code_norm  the paper code without separators ("pcccs502")
+
+both behind pg_trgm GIN indexes (Supabase/search_documents_migration.sql),
+plus the source row itself as payload. Normalising = lower-case, every run of
+non [a-z0-9] folded into one space; the query must be normalised the same way.
+Aliases are what people type instead of the full name: subject initials
+("os", "daa"), a trailing roman numeral as a digit ("mathematics 3") and
+short paper-code forms ("cs502", "cs 502").
+
+    python search_index.py sync                # upsert changed documents, delete orphaned ones
+    python search_index.py sync --dry-run
+    python search_index.py show "Mathematics - III" --code BS-M301
+    python search_index.py bench --dsn postgresql://postgres@localhost/scratch
+
+The uploaders add documents for the rows they insert (Pending, BATCH at a
+time), so `sync` mostly catches renames and deletes made elsewhere.
+
+`bench` needs the postgres extra (psycopg) and an EMPTY scratch database. It
+creates the four content tables, fills them with synthetic rows, times the
+app's current queries, applies the migration, fills search_documents and
+times the same searches against it.
+"""
+
+import re
+import sys
+import json
+import time
+import uuid
+import atexit
+import random
+import hashlib
+import argparse
+import statistics
+from pathlib import Path
+
+from supabase_client import supabase
+from supabase_mirror import fetch_pages
+from metrics import count, observe, start_run
+
+TABLE = "search_documents"
+SOURCES = ["notes", "syllabus", "pyq", "important_questions"]   # SearchService order
+BATCH = 500               # documents per upsert
+ID_BATCH = 200            # ids per `source_id=in.(...)` delete
+MIGRATION = Path(__file__).parent.parent / "Supabase" / "search_documents_migration.sql"
+SCRIPTS_DIR = Path(__file__).parent
+
+STOPWORDS = {"and", "of", "the", "in", "for", "to", "with", "a", "an", "on"}
+ROMAN = {"i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7, "viii": 8}
+SHORT_CODE_RE = re.compile(r'([a-z]{1,4}) ?(\d{3}[a-z]?)$')   # "pcc cs502" -> cs, 502
+
+
+# --- DOCUMENTS ---
+
+def normalise(text):
+    return re.sub(r'[^a-z0-9]+', ' ', (text or "").lower()).strip()
+
+
+def compact(text):
+    return re.sub(r'[^a-z0-9]+', '', (text or "").lower())
+
+
+def subject_aliases(subject):
+    """["mathematics 3"] for "Mathematics - III", ["daa"] for "Design and Analysis of Algorithms"."""
+    words = normalise(subject).split()
+    out = []
+    if len(words) > 1 and words[-1] in ROMAN:
+        words = [*words[:-1], str(ROMAN[words[-1]])]
+        out.append(" ".join(words))
+    letters = [w for w in words if w not in STOPWORDS and not w.isdigit()]
+    if len(letters) >= 2:
+        out.append("".join(w[0] for w in letters) + (words[-1] if words[-1].isdigit() else ""))
+    return out
+
+
+def code_aliases(paper_code):
+    """["pcccs502", "cs502", "cs 502"] for "PCC-CS502" (minus its plain normalised form)."""
+    norm = normalise(paper_code)
+    if not norm:
+        return []
+    out = [compact(paper_code)]
+    m = SHORT_CODE_RE.search(norm)
+    if m:
+        out += [m.group(1) + m.group(2), f"{m.group(1)} {m.group(2)}"]
+    return [a for a in dict.fromkeys(out) if a != norm]
+
+
+def indexable(row):
+    return bool(row.get("id") and row.get("department") and row.get("semester") and row.get("subject"))
+
+
+def document(table, row, paper_code=None):
+    """The search_documents row for one content row. paper_code fills in for rows without their own."""
+    code = row.get("paper_code") or paper_code
+    title = row.get("title")
+    aliases = list(dict.fromkeys(subject_aliases(row["subject"]) + code_aliases(code)))
+    parts = [row["subject"]]
+    if title and normalise(title) != normalise(row["subject"]):
+        parts.append(title)
+    doc = {
+        "source_table": table,
+        "source_id": str(row["id"]),
+        "department": row["department"],
+        "semester": row["semester"],
+        "subject": row["subject"],
+        "title": title,
+        "paper_code": code,
+        "aliases": aliases,
+        "search_text": normalise(" ".join([*parts, code or "", *aliases])),
+        "paper_code_norm": compact(code) or None,
+        "payload": row,
+    }
+    doc["doc_hash"] = hashlib.sha1(json.dumps(doc, sort_keys=True, default=str).encode()).hexdigest()
+    return doc
+
+
+def bundle_codes(rows=None):
+    """{(dept, sem, subject): paper_code} from subjects_bundle - all of it, or the dept/sems of rows."""
+    query = "select=department,semester,subject,paper_code&paper_code=not.is.null&order=id.asc"
+    if rows is not None:
+        depts = sorted({r["department"] for r in rows})
+        sems = sorted({str(r["semester"]) for r in rows})
+        query += f"&department=in.({','.join(depts)})&semester=in.({','.join(sems)})"
+    return {(r["department"], r["semester"], r["subject"]): r["paper_code"]
+            for page in fetch_pages("subjects_bundle", query) for r in page}
+
+
+# --- WRITES ---
+
+def write(docs, op="search_upsert"):
+    """Upsert documents BATCH at a time. Returns how many were written."""
+    written = 0
+    for i in range(0, len(docs), BATCH):
+        batch = docs[i:i + BATCH]
+        resp = supabase.upsert(TABLE, batch, on_conflict="source_table,source_id", op=op)
+        if resp.status_code not in (200, 201, 204):
+            print(f"  ⚠ {TABLE} upsert failed: {resp.status_code} {resp.text[:200]}")
+            count("search_documents", len(batch), outcome="failed")
+            continue
+        written += len(batch)
+        count("search_documents", len(batch), outcome="written")
+    return written
+
+
+def delete(keys):
+    """Delete (source_table, source_id) documents, ID_BATCH ids per request."""
+    by_table = {}
+    for table, source_id in keys:
+        by_table.setdefault(table, []).append(source_id)
+    for table, ids in by_table.items():
+        for i in range(0, len(ids), ID_BATCH):
+            batch = ids[i:i + ID_BATCH]
+            resp = supabase.delete(TABLE, {"source_table": f"eq.{table}", "source_id": f"in.({','.join(batch)})"},
+                                   op="search_delete")
+            if resp.status_code not in (200, 204):
+                print(f"  ⚠ {TABLE} delete failed: {resp.status_code} {resp.text[:200]}")
+                continue
+            count("search_documents", len(batch), outcome="deleted")
+
+
+def index_rows(pairs):
+    """Write documents for freshly inserted (table, row) pairs. Rows without a paper
+    code borrow their subject's from subjects_bundle."""
+    rows = [row for _, row in pairs if indexable(row)]
+    if not rows:
+        return 0
+    codes = {}
+    if any(not r.get("paper_code") for r in rows):
+        try:
+            codes = bundle_codes(rows)
+        except RuntimeError as e:
+            print(f"  ⚠ No paper codes from subjects_bundle: {e}")
+    docs = [document(table, row, codes.get((row["department"], row["semester"], row["subject"])))
+            for table, row in pairs if indexable(row)]
+    return write(docs, op="search_incremental")
+
+
+class Pending:
+    """Rows an uploader just inserted, indexed BATCH at a time (and whatever is left at exit).
+
+        search = Pending()
+        resp = supabase.insert("pyq", row, returning="representation")
+        search.add("pyq", resp.json())
+        ...
+        search.flush()
+
+    A failed write only costs freshness: the next `search_index.py sync` catches up.
+    """
+
+    def __init__(self, batch=BATCH):
+        self.batch = batch
+        self.pairs = []
+        atexit.register(self.flush)
+
+    def add(self, table, rows):
+        self.pairs += [(table, r) for r in (rows if isinstance(rows, list) else [rows])]
+        if len(self.pairs) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        pairs, self.pairs = self.pairs, []
+        if pairs:
+            index_rows(pairs)
+
+
+# --- SYNC ---
+
+def sync(dry_run=False):
+    """Rebuild every document from the content tables; write only those whose hash changed."""
+    codes = bundle_codes()
+    wanted = {}
+    for table in SOURCES:
+        n = 0
+        for page in fetch_pages(table, "select=*&order=id.asc"):
+            for row in page:
+                if indexable(row):
+                    doc = document(table, row, codes.get((row["department"], row["semester"], row["subject"])))
+                    wanted[(table, doc["source_id"])] = doc
+                    n += 1
+        print(f"  {table}: {n} rows")
+
+    existing = {(r["source_table"], r["source_id"]): r["doc_hash"]
+                for page in fetch_pages(TABLE, "select=source_table,source_id,doc_hash&order=source_table.asc,source_id.asc")
+                for r in page}
+    changed = [doc for key, doc in wanted.items() if existing.get(key) != doc["doc_hash"]]
+    orphaned = sorted(key for key in existing if key not in wanted)
+    print(f"🔎 {len(wanted)} documents: {len(changed)} new or changed, {len(orphaned)} orphaned, "
+          f"{len(wanted) - len(changed)} unchanged")
+    if dry_run:
+        return
+    written = write(changed)
+    delete(orphaned)
+    print(f"✅ Wrote {written} documents, removed {len(orphaned)}")
+
+
+# --- BENCH ---
+
+# SearchService's queries, as SQL
+BEFORE_SQL = {
+    "notes": "SELECT * FROM public.notes WHERE paper_code ILIKE %(like)s OR "
+             "(department = %(dept)s AND (subject ILIKE %(like)s OR title ILIKE %(like)s)) LIMIT %(limit)s",
+    "syllabus": "SELECT * FROM public.syllabus WHERE paper_code ILIKE %(like)s OR "
+                "(department = %(dept)s AND (subject ILIKE %(like)s OR title ILIKE %(like)s)) LIMIT %(limit)s",
+    "pyq": "SELECT * FROM public.pyq WHERE paper_code ILIKE %(like)s OR "
+           "(department = %(dept)s AND subject ILIKE %(like)s) LIMIT %(limit)s",
+    "important_questions": "SELECT * FROM public.important_questions WHERE paper_code ILIKE %(like)s OR "
+                           "(department = %(dept)s AND (subject ILIKE %(like)s OR title ILIKE %(like)s)) LIMIT %(limit)s",
+}
+# The same four tabs against search_documents (normalised term, one query per tab as before)
+AFTER_SQL = ("SELECT source_table, source_id, payload FROM public.search_documents "
+             "WHERE source_table = %(table)s AND (paper_code_norm LIKE %(code)s OR "
+             "(department = %(dept)s AND search_text LIKE %(text)s)) LIMIT %(limit)s")
+
+BENCH_DDL = """
+DO $$ BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN CREATE ROLE anon NOLOGIN; END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN CREATE ROLE authenticated NOLOGIN; END IF;
+END $$;
+""" + "".join(f"""
+CREATE TABLE public.{t} (
+  id uuid PRIMARY KEY, department text NOT NULL, semester int NOT NULL, subject text NOT NULL,
+  title text, year text, unit int, paper_code text, file_url text NOT NULL,
+  uploaded_at timestamptz DEFAULT now()
+);""" for t in SOURCES)
+BENCH_COLUMNS = ["id", "department", "semester", "subject", "title", "year", "unit", "paper_code", "file_url"]
+DOC_COLUMNS = ["source_table", "source_id", "department", "semester", "subject", "title", "paper_code",
+               "aliases", "search_text", "paper_code_norm", "payload", "doc_hash"]
+CODE_PREFIXES = ["PCC", "ESC", "BS", "HSMC", "PEC", "OEC"]
+
+
+def bench_subjects():
+    """[(dept, sem, subject, paper_code)] from the scraped subject lists, with made-up codes."""
+    scraped = json.loads((SCRIPTS_DIR / "scraped_subjects.json").read_text())
+    other = json.loads((SCRIPTS_DIR / "other_depts_syllabus.json").read_text())
+    names = {(d, int(s), n) for d, sems in scraped.items() for s, subs in sems.items() for n in subs}
+    names |= {(d, int(s), x["subject"]) for d, sems in other.items() for s, subs in sems.items() for x in subs}
+    out = []
+    for i, (dept, sem, subject) in enumerate(sorted(names)):
+        code = f"{CODE_PREFIXES[i % len(CODE_PREFIXES)]}-{dept[:2]}{sem}{i % 100:02d}"
+        out.append((dept, sem, subject, code))
+    return out
+
+
+def bench_rows(table, subjects, n, rng):
+    rows = []
+    for _ in range(n):
+        dept, sem, subject, code = rng.choice(subjects)
+        year = str(rng.randint(2010, 2024))
+        unit = rng.randint(1, 6)
+        title = {"notes": f"{subject} - Unit {unit}", "syllabus": f"{subject} Syllabus",
+                 "important_questions": f"{subject} Important Questions"}.get(table)
+        rows.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128))), "department": dept, "semester": sem,
+            "subject": subject, "title": title, "year": year if table == "pyq" else None,
+            "unit": unit if table == "notes" else None,
+            "paper_code": code if rng.random() < 0.6 else None,   # many rows predate paper codes
+            "file_url": f"https://example.invalid/{table}/{dept}/{sem}/{uuid.UUID(int=rng.getrandbits(128))}.pdf",
+        })
+    return rows
+
+
+def bench_terms(subjects, n, rng):
+    """What people type: a word of a subject, its start, initials, a full or partial paper code."""
+    terms = []
+    for _ in range(n):
+        dept, _, subject, code = rng.choice(subjects)
+        words = [w for w in normalise(subject).split() if len(w) > 3] or [normalise(subject)]
+        kind = rng.randrange(5)
+        term = (rng.choice(words) if kind == 0 else
+                subject[:rng.randint(4, max(4, len(subject)))] if kind == 1 else
+                (subject_aliases(subject) or [subject])[-1] if kind == 2 else
+                code if kind == 3 else code[-5:])
+        terms.append((dept, term))
+    return terms
+
+
+def timed(conn, sql, params_list, repeat):
+    """Median seconds per search (all tabs) for each term."""
+    out = []
+    for params in params_list:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for sql_, p in zip(sql, params):
+                conn.execute(sql_, p).fetchall()
+            samples.append(time.perf_counter() - start)
+        out.append(statistics.median(samples))
+    return out
+
+
+def pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def bench(dsn, rows, n_terms, repeat, keep):
+    try:
+        import psycopg
+        from psycopg.types.json import Jsonb
+    except ImportError:
+        sys.exit("❌ bench needs psycopg: pip install -e 'automation_scripts[postgres]'")
+
+    rng = random.Random(1337)
+    subjects = bench_subjects()
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        if conn.execute("SELECT to_regclass('public.pyq')").fetchone()[0]:
+            sys.exit("❌ public.pyq already exists - point --dsn at an empty scratch database")
+        print(f"🐘 {conn.execute('SHOW server_version').fetchone()[0]}, {len(subjects)} subjects, {rows} rows per table")
+        try:
+            conn.execute(BENCH_DDL)
+            for table in SOURCES:
+                with conn.cursor().copy(f"COPY public.{table} ({', '.join(BENCH_COLUMNS)}) FROM STDIN") as copy:
+                    for row in bench_rows(table, subjects, rows, rng):
+                        copy.write_row([row[c] for c in BENCH_COLUMNS])
+            conn.execute("ANALYZE")
+
+            terms = [(d, t) for d, t in bench_terms(subjects, n_terms, rng) if normalise(t)]
+            before_params = [[{"like": f"%{t}%", "dept": d, "limit": 10} for _ in SOURCES] for d, t in terms]
+            after_params = [[{"table": table, "code": f"%{compact(t)}%", "text": f"%{normalise(t)}%",
+                              "dept": d, "limit": 10} for table in SOURCES] for d, t in terms]
+            print("⏱  Current queries (ilike on the content tables)...")
+            before = timed(conn, [BEFORE_SQL[t] for t in SOURCES], before_params, repeat)
+
+            start = time.perf_counter()
+            conn.execute(MIGRATION.read_text())
+            with conn.cursor().copy(f"COPY public.{TABLE} ({', '.join(DOC_COLUMNS)}) FROM STDIN") as copy:
+                for table in SOURCES:
+                    for (row,) in conn.execute(f"SELECT row_to_json(t) FROM public.{table} t").fetchall():
+                        doc = document(table, row)
+                        doc["payload"] = Jsonb(doc["payload"])
+                        copy.write_row([doc[c] for c in DOC_COLUMNS])
+            conn.execute(f"ANALYZE public.{TABLE}")
+            print(f"🏗  Migration + {rows * len(SOURCES)} documents in {time.perf_counter() - start:.1f}s")
+            print("⏱  search_documents queries...")
+            after = timed(conn, [AFTER_SQL] * len(SOURCES), after_params, repeat)
+
+            # Recall: everything the old queries found (without LIMIT) must still be found
+            missed = total = 0
+            for (d, t), bp, ap in zip(terms, before_params, after_params):
+                old = {(table, str(r[0])) for table, p in zip(SOURCES, bp)
+                       for r in conn.execute(BEFORE_SQL[table].replace("LIMIT %(limit)s", ""), p).fetchall()}
+                new = {(r[0], str(r[1])) for p in ap
+                       for r in conn.execute(AFTER_SQL.replace("LIMIT %(limit)s", ""), p).fetchall()}
+                total += len(old)
+                missed += len(old - new)
+
+            plan = conn.execute("EXPLAIN ANALYZE " + AFTER_SQL, after_params[0][2]).fetchall()
+        finally:
+            if not keep:
+                conn.execute(f"DROP TABLE IF EXISTS public.{TABLE}, {', '.join(f'public.{t}' for t in SOURCES)}")
+
+    print(f"\n{'':<22}{'p50':>10}{'p95':>10}{'max':>10}   (ms per search, {len(SOURCES)} queries, "
+          f"{len(terms)} terms x {repeat})")
+    for label, values in (("ilike on tables", before), ("search_documents", after)):
+        print(f"{label:<22}" + "".join(f"{pct(values, q) * 1000:>10.2f}" for q in (0.5, 0.95, 1.0)))
+    print(f"speed-up at p50: {pct(before, 0.5) / max(pct(after, 0.5), 1e-9):.1f}x")
+    print(f"recall vs the old queries: {total - missed}/{total} matches still found")
+    print("plan (pyq tab, first term):")
+    for (line,) in plan:
+        if "Scan" in line or "Execution" in line:
+            print(f"  {line.strip()}")
+    observe("search_bench_p50_ms", pct(before, 0.5) * 1000, variant="before")
+    observe("search_bench_p50_ms", pct(after, 0.5) * 1000, variant="after")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build / maintain the search_documents table.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("sync", help="Reconcile search_documents with the content tables")
+    p.add_argument("--dry-run", action="store_true", help="Only count what would change")
+    p = sub.add_parser("show", help="Print the normalised form and aliases of a subject")
+    p.add_argument("subject")
+    p.add_argument("--code", help="Paper code")
+    p = sub.add_parser("bench", help="Time the app's searches before/after on a local Postgres")
+    p.add_argument("--dsn", required=True, help="Connection string of an EMPTY scratch database")
+    p.add_argument("--rows", type=int, default=20000, help="Synthetic rows per content table")
+    p.add_argument("--terms", type=int, default=200, help="Search terms to time")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--keep", action="store_true", help="Leave the tables behind for inspection")
+    args = parser.parse_args()
+
+    if args.cmd == "show":
+        doc = document("syllabus", {"id": "-", "department": "-", "semester": 0, "subject": args.subject,
+                                    "paper_code": args.code})
+        print(f"search_text:     {doc['search_text']}")
+        print(f"paper_code_norm: {doc['paper_code_norm']}")
+        print(f"aliases:         {', '.join(doc['aliases']) or '-'}")
+        return
+
+    start_run(f"search_index_{args.cmd}")
+    if args.cmd == "sync":
+        sync(args.dry_run)
+        if not args.dry_run:
+            supabase.report()
+    else:
+        bench(args.dsn, args.rows, args.terms, args.repeat, args.keep)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,20 @@
-import os
-from pathlib import Path
+from corpus_inventory import BASE_DIR, open_inventory, dirs, refresh
 
-BASE_DIR = Path("/Users/ankurbag/Documents/GitHub/Makaut_Scholar/PYQ questions/Departments")
 DEPARTMENTS = ["IT", "ECE", "EE", "ME", "CE"]
 
 def standardize():
+    inventory = open_inventory()
     for dept in DEPARTMENTS:
-        dept_path = BASE_DIR / dept
-        if not dept_path.exists():
+        sem_dirs = dirs(inventory, depth=2, parent=dept)
+        if not sem_dirs:
             continue
+        dept_path = BASE_DIR / dept
         
         print(f"Standardizing {dept}...")
-        for item in dept_path.iterdir():
-            if item.is_dir() and item.name.startswith("sem_"):
-                new_name = item.name.replace("sem_", "SEM")
+        for sem_row in sem_dirs:
+            if sem_row['name'].startswith("sem_"):
+                item = BASE_DIR / sem_row['path']
+                new_name = sem_row['name'].replace("sem_", "SEM")
                 new_path = dept_path / new_name
                 print(f"  Renaming {item.name} to {new_name}")
                 
@@ -37,5 +38,8 @@ def standardize():
                 else:
                     item.rename(new_path)
 
+    # Pick up the moves so the next script sees the new layout
+    refresh(inventory)
+
 if __name__ == "__main__":
     standardize()
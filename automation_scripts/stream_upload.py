@@ -0,0 +1,45 @@
+"""Hash a local PDF in chunks, or while it is streamed into storage (see SupabaseClient.upload)."""
+
+import os
+import hashlib
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+class HashingReader:
+    """File-like wrapper that updates a SHA-256 digest and byte count as requests reads it.
+
+    requests sends any object with `read` + `__len__` as a streamed body with a
+    Content-Length header, so the PDF never has to be fully loaded into memory.
+    """
+
+    def __init__(self, f):
+        self._f = f
+        self._len = os.fstat(f.fileno()).st_size
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+
+    def __len__(self):
+        return self._len
+
+    def read(self, n=-1):
+        chunk = self._f.read(n)
+        self._sha256.update(chunk)
+        self.size += len(chunk)
+        return chunk
+
+    @property
+    def sha256(self):
+        return self._sha256.hexdigest()
+
+
+def hash_file(file_path):
+    """Hash a file in chunks without uploading it. Returns (sha256, size)."""
+    sha256 = hashlib.sha256()
+    size = 0
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            sha256.update(chunk)
+            size += len(chunk)
+    return sha256.hexdigest(), size
+
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Mirror Supabase content tables into a local SQLite file.
+
+Incremental: each table is pulled from its last (`updated_at`, id) watermark;
+every UPDATE bumps updated_at (Supabase/content_updated_at_migration.sql), so
+rows changed in place are re-pulled too. Every ID_DIFF_HOURS (or with
+--full-diff) the full id set is compared as well, which removes rows deleted
+upstream and back-fills rows whose watermark column is NULL.
+
+    python supabase_mirror.py                 # sync all tables
+    python supabase_mirror.py pyq syllabus    # sync some
+    python supabase_mirror.py --sql "select department, count(*) from pyq group by 1"
+
+Analysis scripts call `select()` which reads from the mirror when it exists.
+"""
+
+import json
+import time
+import sqlite3
+import argparse
+from pathlib import Path
+from urllib.parse import quote
+
+from metrics import start_run
+from supabase_client import supabase
+
+MIRROR_PATH = Path(__file__).parent / "supabase_mirror.sqlite3"
+
+# table -> watermark column (bumped on update, not just on insert)
+TABLES = {
+    "pyq": "updated_at",
+    "syllabus": "updated_at",
+    "notes": "updated_at",
+    "important_questions": "updated_at",
+    "mock_test_questions": "updated_at",
+}
+MIGRATION = "Supabase/content_updated_at_migration.sql"
+
+PAGE_SIZE = 1000          # PostgREST max-rows on Supabase
+ID_BATCH = 200
+ID_DIFF_HOURS = 24
+
+
+def connect(path=MIRROR_PATH):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS _sync_state (
+            table_name   TEXT PRIMARY KEY,
+            watermark    TEXT,
+            last_id_diff REAL,
+            synced_at    REAL
+        )
+    """)
+    return conn
+
+
+def ensure_table(conn, table, columns):
+    """Create the mirror table / add columns on first sight. Everything is stored loosely typed."""
+    conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" (id TEXT PRIMARY KEY)')
+    existing = {r[1] for r in conn.execute(f'PRAGMA table_info("{table}")')}
+    for col in columns:
+        if col not in existing:
+            conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{col}"')
+
+
+def to_sqlite(value):
+    # Arrays (mock_test_questions.options) and JSON columns are stored as JSON text
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def upsert_rows(conn, table, rows):
+    if not rows:
+        return
+    columns = sorted({k for r in rows for k in r})
+    ensure_table(conn, table, columns)
+    col_sql = ", ".join(f'"{c}"' for c in columns)
+    placeholders = ", ".join("?" for _ in columns)
+    conn.executemany(
+        f'INSERT OR REPLACE INTO "{table}" ({col_sql}) VALUES ({placeholders})',
+        [[to_sqlite(r.get(c)) for c in columns] for r in rows],
+    )
+
+
+def fetch_pages(table, query):
+    """GET rest/v1/{table}?{query} page by page."""
+    offset = 0
+    while True:
+        url = f"{supabase.rest_url(table)}?{query}&limit={PAGE_SIZE}&offset={offset}"
+        resp = supabase.request("GET", url, "page", table)
+        if resp.status_code != 200:
+            raise RuntimeError(f"Error fetching {table}: {resp.status_code} {resp.text[:200]}")
+        page = resp.json()
+        yield page
+        if len(page) < PAGE_SIZE:
+            return
+        offset += PAGE_SIZE
+
+
+def parse_watermark(value):
+    """(updated_at, id) from _sync_state. Watermarks saved before the id was kept are a bare timestamp."""
+    if not value:
+        return None
+    try:
+        ts, last_id = json.loads(value)
+        return ts, last_id
+    except ValueError:
+        return value, None
+
+
+def sync_incremental(conn, table, wm_col, watermark):
+    """Keyset-page everything after the (wm_col, id) watermark, so rows sharing a
+    timestamp (a bulk insert, the migration's back-fill) are pulled once, not every sync."""
+    cursor = parse_watermark(watermark)
+    fetched = 0
+    while True:
+        query = f"select=*&order={wm_col}.asc,id.asc&limit={PAGE_SIZE}"
+        if cursor and cursor[1] is None:
+            query += f"&{wm_col}=gte.{quote(cursor[0])}"
+        elif cursor:
+            ts, last_id = cursor
+            query += "&or=" + quote(f'({wm_col}.gt."{ts}",and({wm_col}.eq."{ts}",id.gt."{last_id}"))')
+        resp = supabase.request("GET", f"{supabase.rest_url(table)}?{query}", "page", table)
+        if resp.status_code != 200:
+            if f"{wm_col} does not exist" in resp.text:
+                raise RuntimeError(f"{table}.{wm_col} is missing - run {MIGRATION} in the SQL Editor")
+            raise RuntimeError(f"Error fetching {table}: {resp.status_code} {resp.text[:200]}")
+        page = resp.json()
+        upsert_rows(conn, table, page)
+        fetched += len(page)
+        stamped = [r for r in page if r.get(wm_col)]  # NULLs sort last; the id diff back-fills them
+        if stamped:
+            cursor = (stamped[-1][wm_col], stamped[-1]["id"])
+        if not stamped or len(page) < PAGE_SIZE:
+            break
+    return fetched, json.dumps(cursor) if cursor else None
+
+
+def sync_id_diff(conn, table):
+    """Drop local rows that no longer exist upstream; pull rows we never saw."""
+    remote_ids = set()
+    for page in fetch_pages(table, "select=id&order=id.asc"):
+        remote_ids.update(str(r["id"]) for r in page)
+    ensure_table(conn, table, [])
+    local_ids = {r[0] for r in conn.execute(f'SELECT id FROM "{table}"')}
+
+    deleted = list(local_ids - remote_ids)
+    for i in range(0, len(deleted), ID_BATCH):
+        batch = deleted[i:i + ID_BATCH]
+        conn.execute(f'DELETE FROM "{table}" WHERE id IN ({",".join("?" for _ in batch)})', batch)
+
+    missing = sorted(remote_ids - local_ids)
+    for i in range(0, len(missing), ID_BATCH):
+        ids = ",".join(missing[i:i + ID_BATCH])
+        for page in fetch_pages(table, f"select=*&id=in.({ids})"):
+            upsert_rows(conn, table, page)
+    return len(deleted), len(missing)
+
+
+def sync_table(conn, table, full_diff=False):
+    wm_col = TABLES[table]
+    state = conn.execute("SELECT * FROM _sync_state WHERE table_name = ?", (table,)).fetchone()
+    watermark = state["watermark"] if state else None
+    last_diff = (state["last_id_diff"] or 0) if state else 0
+
+    start = time.time()
+    fetched, watermark = sync_incremental(conn, table, wm_col, watermark)
+    msg = f"  {table:<22} {fetched:>6} rows pulled"
+
+    if full_diff or not state or time.time() - last_diff > ID_DIFF_HOURS * 3600:
+        deleted, backfilled = sync_id_diff(conn, table)
+        last_diff = time.time()
+        msg += f", {deleted} deleted, {backfilled} back-filled"
+
+    conn.execute(
+        "INSERT OR REPLACE INTO _sync_state (table_name, watermark, last_id_diff, synced_at) VALUES (?, ?, ?, ?)",
+        (table, watermark, last_diff, time.time()),
+    )
+    conn.commit()
+    print(f"{msg} ({time.time() - start:.1f}s)")
+
+
+def select(table, columns="*", path=MIRROR_PATH):
+    """Rows of a mirrored table as a list of dicts (like the REST API), or None if not mirrored.
+
+    `columns` takes the same comma-separated form as PostgREST's `select=`.
+    """
+    if not Path(path).exists():
+        return None
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        state = conn.execute("SELECT synced_at FROM _sync_state WHERE table_name = ?", (table,)).fetchone()
+        if not state:
+            return None
+        col_sql = "*" if columns == "*" else ", ".join(f'"{c.strip()}"' for c in columns.split(","))
+        rows = [dict(r) for r in conn.execute(f'SELECT {col_sql} FROM "{table}"')]
+    finally:
+        conn.close()
+    age_min = (time.time() - state["synced_at"]) / 60
+    print(f"Using local mirror for {table} ({len(rows)} rows, synced {age_min:.0f} min ago)")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync Supabase content tables into a local SQLite mirror.")
+    parser.add_argument("tables", nargs="*", help=f"Tables to sync (default: all of {', '.join(TABLES)})")
+    parser.add_argument("--full-diff", action="store_true", help="Force an id-set diff to catch deletes")
+    parser.add_argument("--db", type=Path, default=MIRROR_PATH)
+    parser.add_argument("--sql", help="Run a query against the mirror instead of syncing")
+    args = parser.parse_args()
+    unknown = set(args.tables) - set(TABLES)
+    if unknown:
+        parser.error(f"unknown table(s): {', '.join(sorted(unknown))}")
+
+    conn = connect(args.db)
+    if args.sql:
+        cur = conn.execute(args.sql)
+        print(" | ".join(d[0] for d in cur.description or []))
+        for row in cur:
+            print(" | ".join("" if v is None else str(v) for v in row))
+        return
+
+    start_run("supabase_mirror")
+    print(f"Syncing into {args.db}...")
+    for table in args.tables or TABLES:
+        sync_table(conn, table, full_diff=args.full_diff)
+    print("✅ Mirror up to date.")
+
+
+if __name__ == "__main__":
+    main()
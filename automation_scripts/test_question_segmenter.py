@@ -0,0 +1,48 @@
+"""Groups that restart their numbering must survive records()' dedup.
+
+    python -m pytest test_question_segmenter.py     (or: python test_question_segmenter.py)
+"""
+
+from question_segmenter import Segmenter, records
+
+PAPER = [
+    "GROUP - B",
+    "(Short Answer Type Questions)",
+    "Answer any three of the following. 3 x 5 = 15",
+    "1. Define a deadlock.",
+    "2. What is paging?",
+    "GROUP - C",
+    "(Long Answer Type Questions)",
+    "Answer any three of the following. 3 x 15 = 45",
+    "1. Explain the banker's algorithm.",
+    "2. Compare FCFS and SJF scheduling.",
+]
+
+
+def segment_lines(lines):
+    seg = Segmenter()
+    for line in lines:
+        seg.feed(line, [], 1)
+    return seg.finish()
+
+
+def test_groups_restarting_at_one_are_kept():
+    questions = segment_lines(PAPER)
+    assert [(q["question_group"], q["number"]) for q in questions] == [("B", 1), ("B", 2), ("C", 1), ("C", 2)]
+
+    row = {"dept": "CSE", "sem": 5, "subject": "Operating System", "year": "2023", "sha256": "ab" * 32}
+    recs = list(records([row], {row["sha256"]: questions}))
+    assert [(r["question_group"], r["number"], r["marks"]) for r in recs] == [
+        ("B", 1, 5), ("B", 2, 5), ("C", 1, 15), ("C", 2, 15)]
+
+
+def test_same_paper_twice_is_deduplicated():
+    questions = segment_lines(PAPER)
+    row = {"dept": "CSE", "sem": 5, "subject": "Operating System", "year": "2023", "sha256": "ab" * 32}
+    assert len(list(records([row, dict(row)], {row["sha256"]: questions}))) == 4
+
+
+if __name__ == "__main__":
+    test_groups_restarting_at_one_are_kept()
+    test_same_paper_twice_is_deduplicated()
+    print("✅ ok")
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Split whole-subject notes PDFs into one PDF per unit and upload them as notes rows.
+
+The app shows notes per unit, but a compilation PDF makes every unit download
+the whole subject. Unit boundaries are taken from the PDF outline when it has
+"Unit N" / "Module N" entries, otherwise from headings: a line starting with
+"UNIT N" set noticeably larger (or bolder) than the page's body text. Pages
+before the first unit (cover, contents) are left out.
+
+Each unit is written as its own compact PDF (linearised where the installed
+PyMuPDF still supports it), uploaded to notes_pdf and inserted in one batch.
+Units whose bytes are already in the table (same content_hash) are skipped.
+
+    python upload_notes_units.py OS_notes.pdf --dept CSE --sem 5 --subject "Operating System" --dry-run
+    python upload_notes_units.py OS_notes.pdf --dept CSE --sem 5 --subject "Operating System"
+    python upload_notes_units.py *.pdf --dept IT --sem 3 --subject "Data Structures" --premium --price 49
+    python upload_notes_units.py OS_notes.pdf ... --replace     # drop older rows for the same units
+
+Requires Supabase/pdf_preview_migration.sql (notes.content_hash, file_size, page_count).
+"""
+
+import re
+import hashlib
+import argparse
+from pathlib import Path
+from statistics import median
+
+from supabase_client import supabase
+from search_index import Pending, delete as delete_documents
+from metrics import count, observe, start_run
+
+BUCKET = "notes_pdf"
+TABLE = "notes"
+MAX_UNIT = 6              # notes.unit CHECK (unit >= 1 AND unit <= 6)
+HEADING_RATIO = 1.15      # heading font size vs the page's median size
+MAX_SIZE = 10 * 1024 * 1024   # bucket file_size_limit
+
+search = Pending()  # search_documents for the rows inserted here
+
+WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6}
+ROMAN = {"i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6}
+UNIT_RE = re.compile(r'^\s*(?:unit|module)\s*[-–—:.]?\s*(\d{1,2}|[ivx]{1,4}|one|two|three|four|five|six)\b\W*(.*)$', re.I)
+
+
+def unit_number(token):
+    token = token.lower()
+    if token.isdigit():
+        return int(token)
+    return WORDS.get(token) or ROMAN.get(token)
+
+
+# --- BOUNDARIES ---
+
+def from_outline(doc):
+    """[(unit, first page index, title)] from "Unit N ..." outline entries."""
+    found = {}
+    for level, title, page in doc.get_toc(simple=True):
+        m = UNIT_RE.match(title)
+        if m and page >= 1:
+            n = unit_number(m.group(1))
+            if n and n not in found:
+                found[n] = (page - 1, title.strip())
+    return [(n, page, title) for n, (page, title) in sorted(found.items())]
+
+
+def from_headings(doc):
+    """[(unit, first page index, title)] from "UNIT N" lines set larger or bolder than body text."""
+    found = {}
+    for pno, page in enumerate(doc):
+        lines = []
+        for block in page.get_text("dict")["blocks"]:
+            for line in block.get("lines", []):
+                spans = [s for s in line["spans"] if s["text"].strip()]
+                if spans:
+                    lines.append(("".join(s["text"] for s in spans).strip(),
+                                  max(s["size"] for s in spans),
+                                  all(s["flags"] & 16 for s in spans)))   # 16 = bold
+        if not lines:
+            continue
+        body = median(size for _, size, _ in lines)
+        for text, size, bold in lines:
+            m = UNIT_RE.match(text)
+            if m and (size >= body * HEADING_RATIO or bold):
+                n = unit_number(m.group(1))
+                if n and n not in found:
+                    found[n] = (pno, text)
+                break
+    return [(n, page, title) for n, (page, title) in sorted(found.items())]
+
+
+def plan_units(doc):
+    """[(unit, first page, last page, title)] plus where the boundaries came from - or a reason why not."""
+    for source, finder in (("outline", from_outline), ("headings", from_headings)):
+        found = finder(doc)
+        # Units must be 1..MAX_UNIT and start on strictly increasing pages
+        if len(found) < 2 or any(n > MAX_UNIT for n, _, _ in found):
+            continue
+        if any(b[1] <= a[1] for a, b in zip(found, found[1:])):
+            continue
+        ends = [page - 1 for _, page, _ in found[1:]] + [doc.page_count - 1]
+        return [(n, start, end, title) for (n, start, title), end in zip(found, ends)], source
+    return None, "no unit boundaries found in the outline or headings"
+
+
+def unit_pdf(doc, start, end):
+    """Pages start..end as a standalone, compacted PDF. Byte-stable (no fresh /ID), so
+    re-running on the same input yields the same content_hash."""
+    import fitz  # PyMuPDF, imported on first use
+    part = fitz.open()
+    part.insert_pdf(doc, from_page=start, to_page=end)
+    try:
+        return part.tobytes(garbage=4, deflate=True, clean=True, linear=True, no_new_id=True)
+    except Exception:
+        # MuPDF 1.22+ dropped linearisation; object streams still shrink the file
+        return part.tobytes(garbage=4, deflate=True, clean=True, use_objstms=1, no_new_id=True)
+
+
+# --- UPLOAD ---
+
+def existing_rows(dept, sem, subject):
+    resp = supabase.select(TABLE, "id,unit,content_hash",
+                           {"department": f"eq.{dept}", "semester": f"eq.{sem}", "subject": f"eq.{subject}"})
+    resp.raise_for_status()
+    return resp.json()
+
+
+def slug(text):
+    return re.sub(r'[^A-Za-z0-9]+', '_', text).strip("_")
+
+
+def process(pdf_path, args):
+    import fitz  # PyMuPDF, imported on first use
+    doc = fitz.open(pdf_path)
+    total = Path(pdf_path).stat().st_size
+    units, source = plan_units(doc)
+    print(f"\n📘 {pdf_path} ({doc.page_count} pages, {total / 1024 / 1024:.1f} MB)")
+    if not units:
+        print(f"  ⚠ {source}; skipped")
+        count("notes_units", outcome="unsplit")
+        return
+    print(f"  {len(units)} units from the {source}" + (f", {units[0][1]} front-matter pages dropped" if units[0][1] else ""))
+
+    existing = existing_rows(args.dept, args.sem, args.subject) if not args.dry_run else []
+    known_hashes = {r.get("content_hash") for r in existing}
+    rows, sizes = [], []
+    for n, start, end, heading in units:
+        data = unit_pdf(doc, start, end)
+        sha256 = hashlib.sha256(data).hexdigest()
+        sizes.append(len(data))
+        title = f"{args.title or args.subject} - Unit {n}"
+        print(f"  Unit {n}: pages {start + 1}-{end + 1}, {len(data) / 1024:.0f} KB  ({heading[:60]})")
+        if args.dry_run:
+            continue
+        if sha256 in known_hashes:
+            print("    already uploaded, skipped")
+            count("notes_units", outcome="unchanged")
+            continue
+        if len(data) > MAX_SIZE:
+            print(f"    ⚠ larger than the bucket limit ({MAX_SIZE // 1024 // 1024} MB), skipped")
+            count("notes_units", outcome="too_large")
+            continue
+        path = f"{args.dept}/SEM{args.sem}/{args.subject}/{slug(args.title or args.subject)}_Unit{n}.{sha256[:12]}.pdf"
+        resp, _, _ = supabase.upload(BUCKET, path, data=data, op="notes_upload")
+        if resp.status_code not in (200, 201):
+            print(f"    ❌ Upload failed: {resp.status_code} {resp.text[:200]}")
+            count("notes_units", outcome="failed")
+            continue
+        observe("notes_unit_bytes", len(data))
+        rows.append({
+            "department": args.dept, "semester": args.sem, "subject": args.subject, "unit": n,
+            "title": title, "file_url": supabase.public_url(BUCKET, path),
+            "is_premium": args.premium, "price": args.price,
+            "content_hash": sha256, "file_size": len(data), "page_count": end - start + 1,
+        })
+
+    if sizes:
+        print(f"  Per-unit download: avg {sum(sizes) / len(sizes) / 1024:.0f} KB instead of {total / 1024:.0f} KB")
+    if not rows:
+        return
+
+    # One request for every unit of this PDF
+    resp = supabase.insert(TABLE, rows, returning="representation", op="notes_insert")
+    if resp.status_code not in (200, 201, 204):
+        print(f"  ❌ Row insert failed: {resp.status_code} {resp.text[:200]}")
+        count("notes_units", len(rows), outcome="failed")
+        return
+    count("notes_units", len(rows), outcome="inserted")
+    search.add(TABLE, resp.json())
+    print(f"  ✅ Inserted {len(rows)} notes rows")
+
+    if args.replace:
+        units_done = {r["unit"] for r in rows}
+        old = [str(r["id"]) for r in existing if r["unit"] in units_done]
+        if old:
+            resp = supabase.delete(TABLE, {"id": f"in.({','.join(old)})"}, op="notes_replace")
+            if resp.status_code in (200, 204):
+                delete_documents([(TABLE, i) for i in old])
+                print(f"  🗑 Replaced {len(old)} older rows")
+            else:
+                print(f"  ⚠ Could not delete older rows: {resp.status_code} {resp.text[:200]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split notes PDFs by unit and upload them as notes rows.")
+    parser.add_argument("pdfs", nargs="+", help="Whole-subject notes PDFs")
+    parser.add_argument("--dept", required=True)
+    parser.add_argument("--sem", type=int, required=True)
+    parser.add_argument("--subject", required=True, help="Subject name exactly as in the notes table")
+    parser.add_argument("--title", help="Title prefix (default: the subject)")
+    parser.add_argument("--premium", action="store_true", help="Mark the units as premium")
+    parser.add_argument("--price", type=float, default=0.0)
+    parser.add_argument("--replace", action="store_true", help="Delete older rows for the uploaded units")
+    parser.add_argument("--dry-run", action="store_true", help="Only show the detected units")
+    args = parser.parse_args()
+
+    start_run("upload_notes_units")
+    for pdf_path in args.pdfs:
+        process(pdf_path, args)
+    search.flush()
+    if not args.dry_run:
+        supabase.report()
+
+
+if __name__ == "__main__":
+    main()